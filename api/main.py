@@ -1,8 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
 from api.routers.match_router import router as match_router
+from api.routers.players import router as players_router
+from api.routers.competitions import router as competitions_router
+from api.routers.jobs import router as jobs_router
+from api.routers.query import router as query_router
+from api.services.refresh import refresh_scheduler
+from api.services.warmup import warmup
+from api.utils.admission import AdmissionMiddleware, admission
+from api.utils.compression import CompressionMiddleware
+from api.utils.job_queue import job_queue
+from api.utils.responses import FastJSONResponse, fast_json
 import logging
 
 # Configurar logging
@@ -12,13 +24,31 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicia os workers da fila de tarefas, retomando as que ficaram pendentes, o
+    aquecimento dos caches em segundo plano (a API responde enquanto ele roda) e
+    a verificação periódica de dados atualizados na StatsBomb.
+    """
+    job_queue.start()
+    warmup.start()
+    refresh_scheduler.start()
+    yield
+    refresh_scheduler.stop()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Football Analysis API",
     description="API for analyzing football data using StatsBomb",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
+# Limites por faixa (LLM, consultas pesadas, demais rotas), com 503 + Retry-After na saturação
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -28,8 +58,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão negociada (zstd/brotli/gzip) para respostas acima de 1 KB
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Include routers
 app.include_router(match_router, prefix="/api/v1")
+app.include_router(players_router)
+app.include_router(competitions_router)
+app.include_router(jobs_router)
+app.include_router(query_router)
 
 @app.get("/api/v1")
 @app.get("/")
@@ -43,3 +80,26 @@ async def root():
         "docs_url": "/docs",
         "redoc_url": "/redoc"
     }
+
+@app.get("/health")
+async def health():
+    """
+    Verificação de vida: responde assim que o processo está de pé, mesmo durante o aquecimento.
+    """
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """
+    Verificação de prontidão: 200 quando o aquecimento dos caches terminou
+    (ou não foi configurado), 503 enquanto ele roda; sempre com o progresso.
+    """
+    progress = warmup.progress()
+    return fast_json(progress, status_code=200 if progress["ready"] else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Métricas de admissão (requisições em execução, fila e recusas por faixa) no formato do Prometheus.
+    """
+    return admission.metrics()
@@ -1,56 +1,76 @@
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class PlayerStatistics(BaseModel):
     """Modelo para estatísticas de um jogador"""
+    passes: int = Field(ge=0, description="Número total de passes")
     passes_completed: int = Field(ge=0, description="Número de passes completos")
+    key_passes: int = Field(ge=0, description="Passes que resultaram em chute")
+    assists: int = Field(ge=0, description="Assistências para gol")
     shots: int = Field(ge=0, description="Número total de chutes")
+    shots_on_target: int = Field(ge=0, description="Chutes no alvo")
     goals: int = Field(ge=0, description="Número de gols marcados")
     tackles: int = Field(ge=0, description="Número de desarmes")
     interceptions: int = Field(ge=0, description="Número de interceptações")
+    fouls_committed: int = Field(ge=0, description="Faltas cometidas")
+    xg: float = Field(ge=0, description="Gols esperados (xG) somados")
 
 class PlayerPosition(BaseModel):
     """Modelo para posição do jogador durante a partida"""
+    model_config = ConfigDict(populate_by_name=True)
+
     position_id: int = Field(..., description="ID da posição")
     position: str = Field(..., description="Nome da posição")
-    from_time: str = Field(..., alias="from", description="Momento de início")
+    from_time: Optional[str] = Field(None, alias="from", description="Momento de início")
     to_time: Optional[str] = Field(None, alias="to", description="Momento de fim")
-    from_period: int = Field(..., description="Período de início")
+    from_period: Optional[int] = Field(None, description="Período de início")
     to_period: Optional[int] = Field(None, description="Período de fim")
-    start_reason: str = Field(..., description="Razão da entrada")
+    start_reason: Optional[str] = Field(None, description="Razão da entrada")
     end_reason: Optional[str] = Field(None, description="Razão da saída")
+    minutes: float = Field(ge=0, description="Minutos jogados na posição")
 
 class PlayerProfile(BaseModel):
     """Modelo para o perfil do jogador baseado nos dados reais da StatsBomb"""
     player_id: int = Field(..., description="ID único do jogador")
     player_name: str = Field(..., description="Nome completo do jogador")
     player_nickname: Optional[str] = Field(None, description="Apelido do jogador")
-    jersey_number: int = Field(..., description="Número da camisa")
+    jersey_number: Optional[int] = Field(None, description="Número da camisa")
     country: Optional[str] = Field(None, description="País do jogador")
+    team: str = Field(..., description="Time do jogador")
+    position: Optional[str] = Field(None, description="Posição inicial")
+    started: bool = Field(..., description="Indica se foi titular")
+    minutes_played: float = Field(ge=0, description="Minutos jogados")
     cards: List[str] = Field(default_factory=list, description="Cartões recebidos")
     positions: List[PlayerPosition] = Field(..., description="Posições ocupadas durante a partida")
     statistics: PlayerStatistics = Field(..., description="Estatísticas do jogador na partida")
 
 class MatchEvent(BaseModel):
-    """Modelo para eventos da partida baseado nos dados reais da StatsBomb"""
-    id: int = Field(..., description="ID único do evento")
+    """
+    Modelo para eventos da partida no formato achatado do statsbombpy
+    (uma coluna por atributo; atributos específicos de cada tipo, como
+    `pass_outcome` ou `shot_statsbomb_xg`, são mantidos como campos extras)
+    """
+    model_config = ConfigDict(extra="allow")
+
+    id: str = Field(..., description="ID único do evento (UUID)")
     index: int = Field(..., description="Índice do evento na sequência da partida")
     period: int = Field(..., description="Período do jogo")
     timestamp: str = Field(..., description="Momento do evento")
     minute: int = Field(..., description="Minuto do jogo")
     second: int = Field(..., description="Segundo do jogo")
-    type: Dict[str, str] = Field(..., description="Tipo e subtipo do evento")
+    type: str = Field(..., description="Tipo do evento")
     possession: int = Field(..., description="Número da posse de bola")
-    possession_team: Dict[str, str] = Field(..., description="Time com a posse de bola")
-    play_pattern: Dict[str, str] = Field(..., description="Padrão de jogo")
-    team: Dict[str, str] = Field(..., description="Time que realizou o evento")
-    player: Optional[Dict[str, str]] = Field(None, description="Jogador que realizou o evento")
-    position: Optional[Dict[str, str]] = Field(None, description="Posição do jogador")
+    possession_team: str = Field(..., description="Time com a posse de bola")
+    play_pattern: str = Field(..., description="Padrão de jogo")
+    team: str = Field(..., description="Time que realizou o evento")
+    player: Optional[str] = Field(None, description="Jogador que realizou o evento")
+    player_id: Optional[int] = Field(None, description="ID do jogador")
+    position: Optional[str] = Field(None, description="Posição do jogador")
     location: Optional[List[float]] = Field(None, description="Coordenadas [x, y] do evento")
     duration: Optional[float] = Field(None, description="Duração do evento em segundos")
     under_pressure: Optional[bool] = Field(None, description="Indica se o jogador estava sob pressão")
-    related_events: Optional[List[int]] = Field(None, description="IDs de eventos relacionados")
+    related_events: Optional[List[str]] = Field(None, description="IDs de eventos relacionados")
 
 class MatchSummary(BaseModel):
     """Modelo para o resumo da partida baseado nos dados reais da StatsBomb"""
@@ -74,6 +94,44 @@ class MatchSummary(BaseModel):
     shot_fidelity_version: Optional[str] = Field(None, description="Versão dos dados de chutes")
     xy_fidelity_version: Optional[str] = Field(None, description="Versão dos dados de posicionamento")
 
+class MatchDataResponse(BaseModel):
+    """Modelo para os dados completos de uma partida"""
+    match_id: int = Field(..., description="ID da partida")
+    home_team: str = Field(..., description="Time mandante")
+    away_team: str = Field(..., description="Time visitante")
+    score: str = Field(..., description="Placar no formato mandante-visitante (ex.: 2-1)")
+    date: Optional[str] = Field(None, description="Data da partida")
+    stadium: Optional[str] = Field(None, description="Estádio")
+    events: List[MatchEvent] = Field(..., description="Eventos em ordem cronológica")
+    lineup: Dict[str, List[Dict[str, Any]]] = Field(..., description="Lineup de cada time")
+    key_events: Dict[str, Any] = Field(..., description="Gols, cartões e substituições")
+
+class MatchPlayersResponse(BaseModel):
+    """Modelo para os perfis dos jogadores de uma partida"""
+    match_id: int = Field(..., description="ID da partida")
+    team: Optional[str] = Field(None, description="Time filtrado, se houver")
+    players: List[PlayerProfile] = Field(..., description="Perfis dos jogadores")
+
+class MatchSummariesRequest(BaseModel):
+    """Modelo para requisição de resumos em lote"""
+    ids: List[int] = Field(..., min_length=1, description="IDs das partidas")
+
+class AnalysisJobRequest(BaseModel):
+    """Modelo para requisição de análise em segundo plano"""
+    match_id: int = Field(..., description="ID da partida")
+    player_id: Optional[int] = Field(None, description="ID do jogador (análise do jogador em vez da partida)")
+    style: str = Field(
+        'formal',
+        description="Estilo da narração (análise da partida)",
+        pattern="^(formal|humoristico|tecnico)$"
+    )
+
+class QueryRequest(BaseModel):
+    """Modelo para consulta à base analítica por template"""
+    template: str = Field(..., description="Nome do template de consulta")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parâmetros do template")
+    limit: int = Field(500, ge=1, le=5000, description="Máximo de linhas devolvidas")
+
 class NarrationRequest(BaseModel):
     """Modelo para requisição de narração"""
     match_id: int = Field(..., description="ID da partida")
@@ -89,3 +147,9 @@ class NarrationResponse(BaseModel):
     style: str = Field(..., description="Estilo usado na narração")
     narration: str = Field(..., description="Texto da narração")
     generated_at: datetime = Field(default_factory=datetime.now, description="Timestamp da geração")
+
+# Validadores pré-compilados para as listas grandes. São usados uma única vez, na
+# ingestão dos dados (antes de irem para o cache); as rotas servem os dados já
+# validados sem revalidar a cada requisição.
+MATCH_EVENTS_ADAPTER = TypeAdapter(List[MatchEvent])
+PLAYER_PROFILES_ADAPTER = TypeAdapter(List[PlayerProfile])
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any
+import logging
+from api.services.leaderboard import Leaderboard, LEADERBOARD_METRICS
+from api.services.refresh import refresh_scheduler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/competitions", tags=["competitions"])
+leaderboard_service = Leaderboard()
+
+# Síncrona para rodar no threadpool: a primeira consulta de uma temporada ingere todas as partidas
+@router.get("/{competition_id}/seasons/{season_id}/leaderboard", response_model=Dict[str, Any])
+def get_leaderboard(
+    competition_id: int,
+    season_id: int,
+    metric: str = Query("goals", description=f"Métrica do ranking: {', '.join(LEADERBOARD_METRICS)}"),
+    top: int = Query(10, ge=1, le=100, description="Número de jogadores")
+) -> Dict[str, Any]:
+    """
+    Retorna o ranking de jogadores da temporada em uma métrica.
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Métrica inválida. Use uma de: {', '.join(LEADERBOARD_METRICS)}"
+        )
+
+    leaderboard = leaderboard_service.get_leaderboard(competition_id, season_id, metric, top)
+    if not leaderboard:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Nenhum dado encontrado para a temporada {competition_id}/{season_id}"
+        )
+    return leaderboard
+
+# Síncrona para rodar no threadpool: baixa novamente as listas e as partidas alteradas
+@router.post("/refresh", response_model=Dict[str, Any])
+def refresh_competitions() -> Dict[str, Any]:
+    """
+    Verifica agora (sem esperar o agendamento) as temporadas indexadas cujo
+    `match_updated` mudou e atualiza apenas as partidas alteradas.
+    """
+    return refresh_scheduler.refresh()
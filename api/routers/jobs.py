@@ -0,0 +1,106 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, Optional
+import asyncio
+import json
+import logging
+import time
+from api.models.match_models import AnalysisJobRequest
+from api.services.match_analysis import MatchAnalyzer
+from api.utils.job_queue import job_queue, TERMINAL_STATUSES
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+analysis_service = MatchAnalyzer()
+
+# Intervalo de consulta do estado no long-poll/SSE e intervalo do keep-alive do SSE (segundos)
+POLL_INTERVAL = 0.25
+SSE_KEEPALIVE = 15.0
+
+
+def run_analysis(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Handler das tarefas de análise: o resultado fica no cache de narrativas,
+    de onde as rotas de análise passam a servi-lo.
+    """
+    match_id = params["match_id"]
+    if params.get("player_id") is not None:
+        analysis = analysis_service.analyze_player_with_llm(match_id, params["player_id"])
+        if analysis is None:
+            return None
+        return {"match_id": match_id, "player_id": params["player_id"], "analysis": analysis}
+
+    analysis = analysis_service.analyze_with_llm(match_id, params.get("style", "formal"))
+    return None if analysis is None else {"analysis": analysis}
+
+
+job_queue.register("analysis", run_analysis)
+
+
+def _get_job(job_id: str) -> Dict[str, Any]:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Tarefa {job_id} não encontrada")
+    return job
+
+
+@router.post("/analysis", status_code=202)
+async def create_analysis_job(request: AnalysisJobRequest) -> Dict[str, Any]:
+    """
+    Enfileira a análise com LLM de uma partida (ou de um jogador na partida) e
+    retorna imediatamente o ID da tarefa, a ser consultado em `/jobs/{job_id}`.
+    """
+    return job_queue.submit("analysis", request.model_dump())
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Segundos para aguardar a conclusão (long-poll)")
+) -> Dict[str, Any]:
+    """
+    Retorna o estado da tarefa (queued, running, done ou failed) e, quando
+    concluída, o resultado. Com `wait`, a resposta só sai quando a tarefa
+    terminar ou o tempo se esgotar.
+    """
+    job = _get_job(job_id)
+    deadline = time.monotonic() + wait
+    while job["status"] not in TERMINAL_STATUSES and time.monotonic() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        job = _get_job(job_id)
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str) -> StreamingResponse:
+    """
+    Acompanha a tarefa por Server-Sent Events: um evento `status` a cada mudança
+    de estado, encerrando quando a tarefa termina.
+    """
+    job = _get_job(job_id)
+
+    async def events():
+        current = job
+        last_status = None
+        last_sent = time.monotonic()
+        while True:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                last_sent = time.monotonic()
+                yield f"event: status\ndata: {json.dumps(current, default=str)}\n\n"
+                if last_status in TERMINAL_STATUSES:
+                    return
+            elif time.monotonic() - last_sent > SSE_KEEPALIVE:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(POLL_INTERVAL)
+            current = job_queue.get(job_id) or current
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
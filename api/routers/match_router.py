@@ -1,22 +1,70 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any, Optional
-from ..services.match_analysis import MatchAnalyzer
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import Dict, List, Any, Optional
+from ..models.match_models import MatchDataResponse, MatchPlayersResponse, MatchSummariesRequest
+from ..services.match_analysis import MatchAnalyzer, MAX_BATCH_SIZE
+from ..services.pitch_heatmap import PitchHeatmap, DEFAULT_BINS
+from ..services.pass_network import PassNetwork
+from ..services.shot_analysis import ShotAnalysis
+from ..services.possession_chains import PossessionChains
+from ..services.momentum import MatchMomentum
+from ..services.player_profiles import PlayerProfiles
+from ..utils.http_cache import match_etag, player_profile_etag
+from ..utils.responses import fast_json
 
 router = APIRouter()
 analysis_service = MatchAnalyzer()
+heatmap_service = PitchHeatmap()
+pass_network_service = PassNetwork()
+shot_service = ShotAnalysis()
+possession_service = PossessionChains()
+momentum_service = MatchMomentum()
+player_profiles_service = PlayerProfiles()
 
-@router.get("/matches/{match_id}")
-async def get_match_data(match_id: int) -> Dict[str, Any]:
+def _batch_summaries(match_ids: List[int]) -> Dict[str, Any]:
+    if not match_ids:
+        raise HTTPException(status_code=400, detail="Informe ao menos um ID de partida")
+    if len(set(match_ids)) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No máximo {MAX_BATCH_SIZE} partidas por requisição"
+        )
+    return fast_json(analysis_service.summarize_matches(match_ids))
+
+# As rotas que baixam dados ou calculam com pandas/numpy são síncronas (def) para
+# rodar no threadpool do FastAPI sem bloquear o event loop (e com ele /health,
+# /ready, /metrics e a fila de admissão). As de lote precisam vir antes de /matches/{match_id}
+@router.get("/matches/summaries")
+def get_match_summaries(
+    ids: str = Query(..., description="IDs das partidas separados por vírgula, ex.: 1,2,3")
+) -> Dict[str, Any]:
+    """
+    Retorna os resumos de várias partidas em uma única requisição.
+    """
+    try:
+        match_ids = [int(i) for i in ids.split(',') if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="IDs de partida inválidos")
+    return _batch_summaries(match_ids)
+
+@router.post("/matches/summaries")
+def post_match_summaries(request: MatchSummariesRequest) -> Dict[str, Any]:
+    """
+    Variante de /matches/summaries com os IDs no corpo, para listas grandes.
+    """
+    return _batch_summaries(request.ids)
+
+@router.get("/matches/{match_id}", response_model=MatchDataResponse, dependencies=[Depends(match_etag)])
+def get_match_data(match_id: int, response: Response) -> Dict[str, Any]:
     """
     Retorna os dados brutos de uma partida específica.
     """
     data = analysis_service.get_match_data(match_id)
     if not data:
         raise HTTPException(status_code=404, detail="Partida não encontrada")
-    return data
+    return fast_json(data, response)
 
-@router.get("/matches/{match_id}/summary")
-async def get_match_summary(match_id: int) -> Dict[str, Any]:
+@router.get("/matches/{match_id}/summary", dependencies=[Depends(match_etag)])
+def get_match_summary(match_id: int) -> Dict[str, Any]:
     """
     Retorna uma sumarização dos eventos principais da partida.
     """
@@ -28,8 +76,23 @@ async def get_match_summary(match_id: int) -> Dict[str, Any]:
         )
     return summary
 
-@router.get("/matches/{match_id}/player/{player_id}")
-async def get_player_profile(
+@router.get("/matches/{match_id}/players", response_model=MatchPlayersResponse, dependencies=[Depends(match_etag)])
+def get_match_players(match_id: int, response: Response, team: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retorna o perfil de todos os jogadores da partida: dados do lineup,
+    posições com minutos jogados, cartões e estatísticas.
+    """
+    players = player_profiles_service.get_players(match_id, team)
+    if not players:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Não foi possível obter os jogadores da partida {match_id}"
+        )
+    return fast_json(players, response)
+
+# Síncronas para rodar no threadpool: com include_analysis/analysis a chamada ao LLM bloqueia
+@router.get("/matches/{match_id}/player/{player_id}", dependencies=[Depends(player_profile_etag)])
+def get_player_profile(
     match_id: int, 
     player_id: float,
     include_analysis: bool = False
@@ -52,7 +115,7 @@ async def get_player_profile(
     return profile
 
 @router.get("/matches/{match_id}/analysis")
-async def get_match_analysis(
+def get_match_analysis(
     match_id: int,
     style: str = 'formal'
 ) -> Dict[str, Any]:
@@ -76,3 +139,88 @@ async def get_match_analysis(
             detail="Não foi possível gerar a análise da partida"
         )
     return {"analysis": analysis}
+
+@router.get("/matches/{match_id}/heatmap", dependencies=[Depends(match_etag)])
+def get_match_heatmap(
+    match_id: int,
+    team: Optional[str] = None,
+    player: Optional[int] = Query(None, description="ID do jogador"),
+    types: Optional[str] = Query(None, description="Tipos de evento separados por vírgula, ex.: Pass,Carry"),
+    bins: int = Query(DEFAULT_BINS, ge=2, le=120, description="Número de colunas da grade no comprimento do campo"),
+    smooth: float = Query(0.0, ge=0, le=5, description="Suavização gaussiana, em células")
+) -> Dict[str, Any]:
+    """
+    Retorna a grade de densidade (mapa de calor) das localizações dos eventos no campo 120x80.
+    """
+    event_types = [t.strip() for t in types.split(',') if t.strip()] if types else None
+    heatmap = heatmap_service.get_heatmap(match_id, team, player, event_types, bins, smooth)
+    if not heatmap:
+        raise HTTPException(
+            status_code=404,
+            detail="Não foi possível gerar o mapa de calor com os filtros informados"
+        )
+    return heatmap
+
+@router.get("/matches/{match_id}/pass-network", dependencies=[Depends(match_etag)])
+def get_match_pass_network(
+    match_id: int,
+    team: str,
+    window: int = Query(0, ge=0, description="Janela entre substituições (0 = titulares até a primeira troca)")
+) -> Dict[str, Any]:
+    """
+    Retorna a rede de passes do time: nós na posição média dos passes e arestas passador -> receptor.
+    """
+    network = pass_network_service.get_pass_network(match_id, team, window)
+    if not network:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Não foi possível gerar a rede de passes de {team} na partida {match_id}"
+        )
+    return network
+
+@router.get("/matches/{match_id}/shots", dependencies=[Depends(match_etag)])
+def get_match_shots(match_id: int, response: Response) -> Dict[str, Any]:
+    """
+    Retorna o mapa de chutes da partida (localização, xG, resultado, freeze frame)
+    com totais e curvas de xG acumulado por time e por jogador.
+    """
+    shots = shot_service.get_shots(match_id)
+    if not shots:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Não foi possível obter os chutes da partida {match_id}"
+        )
+    return fast_json(shots, response)
+
+@router.get("/matches/{match_id}/possessions", dependencies=[Depends(match_etag)])
+def get_match_possessions(match_id: int, response: Response, team: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retorna as cadeias de posse da partida (início/fim, duração, passes, chute, xG)
+    e um resumo por time.
+    """
+    possessions = possession_service.get_possessions(match_id, team)
+    if not possessions:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Não foi possível obter as posses da partida {match_id}"
+        )
+    return fast_json(possessions, response)
+
+@router.get("/matches/{match_id}/momentum", dependencies=[Depends(match_etag)])
+def get_match_momentum(
+    match_id: int,
+    window: int = Query(1, ge=1, le=15, description="Tamanho da janela em minutos"),
+    rolling: int = Query(5, ge=1, le=30, description="Número de janelas da média móvel"),
+    max_points: int = Query(120, ge=3, le=1000, description="Máximo de pontos por série (LTTB)")
+) -> Dict[str, Any]:
+    """
+    Retorna as séries de momentum por time (xG, chutes, entradas no terço final
+    e posse de bola) em janelas de tempo com média móvel.
+    """
+    momentum = momentum_service.get_momentum(match_id, window, rolling, max_points)
+    if not momentum:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Não foi possível calcular o momentum da partida {match_id}"
+        )
+    return momentum
@@ -1,7 +1,12 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
 import logging
-from api.utils.statsbomb_data import get_matches, get_match_lineup, get_player_stats
+from api.utils.statsbomb_data import get_player_stats
+from api.utils.statsbomb_handler import StatsBombHandler
+from api.utils.cache import match_cache
+from api.utils.match_index import match_index
+from api.utils.name_index import name_index
+from api.services.season_stats import season_stats
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -10,7 +15,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/players", tags=["players"])
 
 @router.get("/", response_model=List[Dict[str, Any]])
-async def list_players(
+def list_players(
     match_id: Optional[int] = Query(None, description="ID da partida para filtrar jogadores")
 ) -> List[Dict[str, Any]]:
     """
@@ -21,37 +26,34 @@ async def list_players(
             # Usar a partida Inglaterra x Colômbia como padrão
             match_id = 7585
             
-        # Obter detalhes da partida
-        matches = get_matches(43, 3)  # Copa do Mundo 2018
-        match = next((m for m in matches if m.get("match_id") == match_id), None)
-        
-        if not match:
-            raise HTTPException(status_code=404, detail=f"Partida {match_id} não encontrada")
+        def build() -> List[Dict[str, Any]]:
+            # Times pelo índice de partidas; se a partida ainda não foi indexada, vale a ordem do lineup
+            lineups = StatsBombHandler.load_lineups(match_id)
+            match = match_index.get(match_id) or {}
+            teams = [t for t in (match.get("home_team"), match.get("away_team")) if t in lineups]
+            teams += [t for t in lineups if t not in teams]
             
-        # Obter lineups de ambos os times
-        home_team = match.get("home_team")
-        away_team = match.get("away_team")
-        
-        home_lineup = get_match_lineup(match_id, home_team)
-        away_lineup = get_match_lineup(match_id, away_team)
+            # Combinar os lineups, sem duplicatas de player_id
+            unique_players = {}
+            for team in teams:
+                for player in StatsBombHandler.to_records(lineups[team]):
+                    unique_players.setdefault(player["player_id"], {**player, "team": team})
+            return list(unique_players.values())
         
-        # Combinar os lineups
-        all_players = []
-        if home_lineup:
-            all_players.extend(home_lineup)
-        if away_lineup:
-            all_players.extend(away_lineup)
+        try:
+            # Lista vinda do cache compartilhado: carrega o lineup para indexar os nomes neste processo
+            players = match_cache.get_or_compute(
+                "players_list", match_id, build, match_id=match_id,
+                on_load=lambda _: StatsBombHandler.load_lineups(match_id)
+            )
+        except Exception as e:
+            logger.error(f"Erro ao buscar lineups da partida {match_id}: {str(e)}")
+            raise HTTPException(status_code=404, detail=f"Partida {match_id} não encontrada")
             
-        if not all_players:
+        if not players:
             raise HTTPException(status_code=404, detail="Nenhum jogador encontrado")
-            
-        # Remover duplicatas baseado no player_id
-        unique_players = {
-            player["player_id"]: player 
-            for player in all_players
-        }.values()
         
-        return list(unique_players)
+        return players
         
     except HTTPException as he:
         raise he
@@ -59,8 +61,19 @@ async def list_players(
         logger.error(f"Erro ao listar jogadores: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro ao listar jogadores: {str(e)}")
 
+@router.get("/search", response_model=List[Dict[str, Any]])
+async def search_players(
+    q: str = Query(..., min_length=2, description="Nome ou parte do nome do jogador"),
+    limit: int = Query(10, ge=1, le=50, description="Número máximo de resultados")
+) -> List[Dict[str, Any]]:
+    """
+    Busca jogadores pelo nome (sem diferenciar acentos e maiúsculas), entre os
+    lineups já carregados pela API.
+    """
+    return name_index.search_players(q, limit)
+
 @router.get("/{player_id}/profile", response_model=Dict[str, Any])
-async def get_player_profile(
+def get_player_profile(
     player_id: int,
     match_id: Optional[int] = Query(None, description="ID da partida para obter estatísticas específicas")
 ) -> Dict[str, Any]:
@@ -91,3 +104,21 @@ async def get_player_profile(
             status_code=500,
             detail=f"Erro ao obter perfil do jogador: {str(e)}"
         )
+
+# Síncrona para rodar no threadpool: a primeira consulta de uma temporada ingere todas as partidas
+@router.get("/{player_id}/season", response_model=Dict[str, Any])
+def get_player_season(
+    player_id: int,
+    competition_id: int = Query(..., description="ID da competição"),
+    season_id: int = Query(..., description="ID da temporada")
+) -> Dict[str, Any]:
+    """
+    Retorna os totais e as taxas por 90 minutos de um jogador em toda a temporada.
+    """
+    season = season_stats.get_player_season(player_id, competition_id, season_id)
+    if not season:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Jogador com ID {player_id} não encontrado na temporada {competition_id}/{season_id}"
+        )
+    return season
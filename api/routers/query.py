@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any
+import logging
+from api.models.match_models import QueryRequest
+from api.utils.analytics_store import analytics_store, QueryTimeout, QUERY_TEMPLATES
+from api.utils.responses import fast_json
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/query", tags=["query"])
+
+@router.get("", response_model=Dict[str, Any])
+async def list_query_templates() -> Dict[str, Any]:
+    """
+    Lista os templates de consulta disponíveis e seus parâmetros.
+    """
+    return {
+        name: {
+            "description": spec["description"],
+            "params": {
+                param: {"type": kind.__name__, "required": default is ..., "default": None if default is ... else default}
+                for param, (kind, default) in spec["params"].items()
+            }
+        }
+        for name, spec in QUERY_TEMPLATES.items()
+    }
+
+# Síncrona para rodar no threadpool: a consulta executa no SQLite
+@router.post("", response_model=Dict[str, Any])
+def run_query(request: QueryRequest) -> Dict[str, Any]:
+    """
+    Executa um template de consulta (somente leitura) sobre os eventos, lineups e
+    partidas já carregados, com limite de linhas e de tempo de execução.
+    """
+    if request.template not in QUERY_TEMPLATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Template inválido. Use um de: {', '.join(QUERY_TEMPLATES)}"
+        )
+    try:
+        return fast_json(analytics_store.query(request.template, request.params, request.limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueryTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro ao executar a consulta {request.template}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro ao executar a consulta")
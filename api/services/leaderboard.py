@@ -0,0 +1,106 @@
+from typing import Dict, List, Any, Optional
+import logging
+import numpy as np
+from .season_stats import SeasonStats, season_stats
+from api.utils.cache import match_cache
+
+logger = logging.getLogger(__name__)
+
+# Métrica pública -> coluna da tabela de totais por jogador
+LEADERBOARD_METRICS = {
+    "goals": "goals",
+    "xg": "xg",
+    "passes": "passes_completed",
+    "tackles": "tackles",
+    "assists": "assists",
+    "shots": "shots",
+    "interceptions": "interceptions"
+}
+
+
+class Leaderboard:
+    """
+    Rankings de jogadores por temporada a partir da tabela materializada de
+    estatísticas (SeasonStats).
+
+    Apenas os N primeiros são selecionados (seleção parcial com argpartition) e
+    cada ranking fica em cache (só no processo) até a tabela da temporada mudar.
+    """
+
+    def __init__(self, stats: Optional[SeasonStats] = None):
+        self.stats = stats or season_stats
+
+    @staticmethod
+    def top_k(values: np.ndarray, k: int) -> np.ndarray:
+        """
+        Posições dos k maiores valores, em ordem decrescente.
+        """
+        if k >= len(values):
+            return np.argsort(-values, kind='stable')
+        candidates = np.argpartition(-values, k - 1)[:k]
+        return candidates[np.argsort(-values[candidates], kind='stable')]
+
+    def get_leaderboard(
+        self,
+        competition_id: int,
+        season_id: int,
+        metric: str = "goals",
+        top: int = 10
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retorna os jogadores com os maiores valores de uma métrica na temporada.
+
+        Args:
+            competition_id: ID da competição
+            season_id: ID da temporada
+            metric: Métrica do ranking (ver LEADERBOARD_METRICS)
+            top: Número de jogadores
+
+        Returns:
+            Dicionário com o ranking, ou None se a temporada não tiver dados
+        """
+        column_name = LEADERBOARD_METRICS[metric]
+        try:
+            rows, totals = self.stats.get_table(competition_id, season_id)
+        except Exception as e:
+            logger.error(f"Erro ao carregar a temporada {competition_id}/{season_id}: {str(e)}")
+            return None
+        if totals.empty:
+            return None
+
+        def build() -> Dict[str, Any]:
+            values = totals[column_name].to_numpy(dtype=float)
+            selected = Leaderboard.top_k(values, top)
+            latest = rows.drop_duplicates('player_id', keep='last').set_index('player_id')
+
+            entries = []
+            for rank, position in enumerate(selected, start=1):
+                player_id = totals.index[position]
+                total = totals.iloc[position]
+                minutes = float(total['minutes_played'])
+                value = float(values[position])
+                entries.append({
+                    "rank": rank,
+                    "player_id": int(player_id),
+                    "player_name": latest.at[player_id, 'player_name'],
+                    "team": latest.at[player_id, 'team'],
+                    "matches": int(total['matches']),
+                    "minutes_played": round(minutes, 1),
+                    "value": round(value, 4) if metric == "xg" else int(value),
+                    "per90": round(value * 90 / minutes, 3) if minutes > 0 else None
+                })
+
+            return {
+                "competition_id": competition_id,
+                "season_id": season_id,
+                "metric": metric,
+                "matches": int(rows['match_id'].nunique()),
+                "leaderboard": entries
+            }
+
+        # Chave pelo conteúdo da tabela (partidas e versões dos dados), igual em qualquer processo
+        key = (
+            competition_id, season_id, metric, top,
+            SeasonStats.table_fingerprint(competition_id, season_id, rows)
+        )
+        return match_cache.get_or_compute("leaderboard", key, build, share=False)
@@ -1,86 +1,51 @@
 from typing import Dict, List, Any, Optional
 import logging
-from .match_narrator_openai import MatchNarratorOpenAI
+from concurrent.futures import ThreadPoolExecutor
+from .match_narrator_openai import MatchNarratorOpenAI, PLAYER_ANALYSIS_ERROR
+from .match_summarizer import MatchSummarizer
+from .player_profiles import PlayerProfiles
+from .shot_analysis import ShotAnalysis
+from api.utils.cache import match_cache
+from api.utils.match_index import match_index
+from api.utils.statsbomb_handler import StatsBombHandler
 
 logger = logging.getLogger(__name__)
 
+# Limites das consultas em lote: tamanho máximo da lista e threads de carregamento
+MAX_BATCH_SIZE = 128
+SUMMARY_WORKERS = 8
+
 class MatchAnalyzer:
     def __init__(self):
         self.narrator = MatchNarratorOpenAI()
+        self.shot_analysis = ShotAnalysis()
+        self.player_profiles = PlayerProfiles()
         
     def get_match_data(self, match_id: int) -> Optional[Dict[str, Any]]:
         """
         Retorna os dados brutos de uma partida específica.
         """
         try:
-            # Simula busca de dados
-            match_info = {
-                "match_id": match_id,
-                "home_team": "Time A",
-                "away_team": "Time B",
-                "score": "2-1",
-                "date": "2023-12-18",
-                "stadium": "Estádio Principal"
-            }
-
-            # Simula eventos da partida
-            events = [
-                {
-                    "id": 1,
-                    "type": "Goal",
-                    "minute": 15,
-                    "team": "Time A",
-                    "player": "Jogador 1",
-                    "assist": "Jogador 2"
-                },
-                {
-                    "id": 2,
-                    "type": "Card",
-                    "minute": 25,
-                    "team": "Time B",
-                    "player": "Jogador 6",
-                    "card_type": "Yellow"
-                },
-                {
-                    "id": 3,
-                    "type": "Goal",
-                    "minute": 35,
-                    "team": "Time B",
-                    "player": "Jogador 3"
-                },
-                {
-                    "id": 4,
-                    "type": "Substitution",
-                    "minute": 46,
-                    "team": "Time A",
-                    "player_out": "Jogador 8",
-                    "player_in": "Jogador 9"
-                },
-                {
-                    "id": 5,
-                    "type": "Goal",
-                    "minute": 78,
-                    "team": "Time A",
-                    "player": "Jogador 4",
-                    "assist": "Jogador 5"
-                }
-            ]
+            summary = self.summarize_match(match_id)
+            if not summary:
+                return None
+            match_data = StatsBombHandler.get_match_data(match_id)
+            # Data e estádio vêm do índice de partidas, quando a temporada já foi consultada
+            metadata = match_index.get(match_id) or {}
 
             return {
-                **match_info,
-                "events": events,
+                "match_id": match_id,
+                "home_team": summary["home_team"],
+                "away_team": summary["away_team"],
+                "score": summary["score"],
+                "date": metadata.get("match_date"),
+                "stadium": metadata.get("stadium"),
+                "events": match_data["events"],
+                "lineup": match_data["lineup"],
                 "key_events": {
-                    "goals": [
-                        {"minute": 15, "scorer": "Jogador 1", "team": "Time A", "assist": "Jogador 2"},
-                        {"minute": 35, "scorer": "Jogador 3", "team": "Time B", "assist": None},
-                        {"minute": 78, "scorer": "Jogador 4", "team": "Time A", "assist": "Jogador 5"}
-                    ],
-                    "cards": [
-                        {"minute": 25, "player": "Jogador 6", "team": "Time B", "card_type": "Amarelo"}
-                    ],
-                    "substitutions": [
-                        {"minute": 46, "team": "Time A", "player_out": "Jogador 8", "player_in": "Jogador 9"}
-                    ]
+                    "goals": summary["goals"],
+                    "cards": summary["cards"],
+                    "substitutions": summary["substitutions"]
                 }
             }
 
@@ -91,72 +56,89 @@ class MatchAnalyzer:
     def summarize_match(self, match_id: int) -> Optional[Dict[str, Any]]:
         """
         Gera um resumo dos eventos principais da partida.
+        
+        O resumo é calculado uma vez por partida e servido do cache nas chamadas seguintes.
         """
-        match_data = self.get_match_data(match_id)
-        if not match_data:
-            return None
-
         try:
-            # Extrair apenas os gols e cartões do match_data
-            key_events = match_data.get("key_events", {})
-            return {
-                "match_id": match_id,
-                "goals": key_events.get("goals", []),
-                "cards": key_events.get("cards", [])
-            }
+            return self._summary(match_id)
         except Exception as e:
             logger.error(f"Erro ao gerar resumo da partida {match_id}: {str(e)}")
             return None
 
+    def _summary(self, match_id: int) -> Dict[str, Any]:
+        def build() -> Dict[str, Any]:
+            events = StatsBombHandler.load_events(match_id)
+            return {"match_id": match_id, **MatchSummarizer.summarize(events)}
+
+        return match_cache.get_or_compute("summary", match_id, build, match_id=match_id)
+
+    def summarize_matches(self, match_ids: List[int], max_workers: int = SUMMARY_WORKERS) -> Dict[str, Any]:
+        """
+        Gera os resumos de várias partidas, carregando os eventos em paralelo.
+
+        Resumos já calculados saem do cache; falhas de uma partida não interrompem
+        as demais e são devolvidas em `errors`.
+
+        Args:
+            match_ids: IDs das partidas (duplicados são ignorados)
+            max_workers: Número máximo de carregamentos simultâneos
+
+        Returns:
+            Dicionário com os resumos obtidos, na ordem pedida, e os erros por partida
+        """
+        match_ids = list(dict.fromkeys(match_ids))
+
+        def load(match_id: int) -> Dict[str, Any]:
+            try:
+                return {"match_id": match_id, "summary": self._summary(match_id)}
+            except Exception as e:
+                logger.error(f"Erro ao gerar resumo da partida {match_id}: {str(e)}")
+                return {"match_id": match_id, "error": str(e) or type(e).__name__}
+
+        if not match_ids:
+            return {"summaries": [], "errors": []}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(match_ids))) as executor:
+            results = list(executor.map(load, match_ids))
+
+        return {
+            "summaries": [r["summary"] for r in results if "summary" in r],
+            "errors": [r for r in results if "error" in r]
+        }
+
     def create_player_profile(self, match_id: int, player_id: float) -> Optional[Dict[str, Any]]:
         """
         Cria um perfil detalhado de um jogador em uma partida específica.
+        
+        Usa os perfis de todos os jogadores da partida, calculados uma vez e mantidos em cache.
         """
         try:
-            # Dados específicos para o jogador de teste (Burak Yilmaz)
-            if player_id == 11086.0:
-                return {
-                    "info": {
-                        "player_id": player_id,
-                        "player_name": "Burak Yılmaz",
-                        "team": "Turkey",
-                        "position": "Forward"
-                    },
-                    "statistics": {
-                        "passes": {
-                            "total": 14,
-                            "successful": 10
-                        },
-                        "shots": {
-                            "total": 1,
-                            "goals": 0
-                        },
-                        "tackles": 1,
-                        "interceptions": 0
-                    }
-                }
-            
-            # Para outros jogadores, retorna dados simulados
+            profile = self.player_profiles.get_player(match_id, int(player_id))
+            if not profile:
+                return None
+
+            stats = profile["statistics"]
             return {
                 "info": {
-                    "player_id": player_id,
-                    "player_name": f"Jogador {player_id}",
-                    "team": "Time A",
-                    "position": "Atacante"
+                    "player_id": profile["player_id"],
+                    "player_name": profile["player_name"],
+                    "team": profile["team"],
+                    "position": profile["position"],
+                    "jersey_number": profile["jersey_number"]
                 },
                 "statistics": {
-                    "minutes_played": 90,
+                    "minutes_played": profile["minutes_played"],
                     "passes": {
-                        "total": 45,
-                        "successful": 38
+                        "total": stats["passes"],
+                        "successful": stats["passes_completed"]
                     },
                     "shots": {
-                        "total": 5,
-                        "on_target": 3,
-                        "goals": 1
+                        "total": stats["shots"],
+                        "on_target": stats["shots_on_target"],
+                        "goals": stats["goals"]
                     },
-                    "tackles": 2,
-                    "interceptions": 3
+                    "xg": stats["xg"],
+                    "tackles": stats["tackles"],
+                    "interceptions": stats["interceptions"]
                 }
             }
         except Exception as e:
@@ -166,7 +148,26 @@ class MatchAnalyzer:
     def analyze_player_with_llm(self, match_id: int, player_id: float) -> Optional[str]:
         """
         Gera uma análise do jogador usando LLM.
+        
+        O texto fica no cache de narrativas (por partida e jogador), onde também
+        são gravados os resultados das tarefas em segundo plano. A mensagem de
+        falha da OpenAI é devolvida, mas não entra no cache.
         """
+        failures: List[str] = []
+
+        def compute() -> Optional[str]:
+            analysis = self._player_narrative(match_id, player_id)
+            if analysis == PLAYER_ANALYSIS_ERROR:
+                failures.append(analysis)
+                return None
+            return analysis
+
+        analysis = match_cache.get_or_compute(
+            "player_narrative", (int(match_id), int(player_id)), compute, match_id=match_id
+        )
+        return analysis if analysis is not None or not failures else failures[0]
+
+    def _player_narrative(self, match_id: int, player_id: float) -> Optional[str]:
         try:
             player_data = self.create_player_profile(match_id, player_id)
             if not player_data:
@@ -179,12 +180,24 @@ class MatchAnalyzer:
     def analyze_with_llm(self, match_id: int, style: str = 'formal') -> Optional[Dict[str, Any]]:
         """
         Gera uma análise narrativa da partida usando LLM.
+        
+        A análise fica no cache de narrativas (por partida e estilo): chamadas
+        seguintes, inclusive as das tarefas em segundo plano, não repetem a geração.
         """
+        return match_cache.get_or_compute(
+            "narrative", (int(match_id), style), lambda: self._narrative(match_id, style), match_id=match_id
+        )
+
+    def _narrative(self, match_id: int, style: str) -> Optional[Dict[str, Any]]:
         try:
             match_data = self.get_match_data(match_id)
             if not match_data:
                 return None
 
+            # Totais de xG já calculados (e em cache) pela análise de chutes
+            xg_totals = (self.shot_analysis.get_xg_totals(match_id) or {}).get("teams", {})
+            xg_text = '; '.join(f"{team}: {totals['xg']:.2f}" for team, totals in xg_totals.items())
+
             # Gerar uma narrativa detalhada com base no estilo
             narratives = {
                 'formal': f"""
@@ -220,6 +233,8 @@ class MatchAnalyzer:
                       {'; '.join([f"{c['minute']}' - {c['player']} ({c['team']}) - {c['card_type']}" for c in match_data['key_events']['cards']])}
                     
                     - Substituições: {len(match_data['key_events']['substitutions'])}
+                    
+                    - xG: {xg_text or 'indisponível'}
                 """
             }
 
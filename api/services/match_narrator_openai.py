@@ -6,6 +6,10 @@ from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Textos devolvidos quando a OpenAI falha (não devem ser guardados em cache)
+NARRATIVE_ERROR = "Não foi possível gerar a narrativa da partida."
+PLAYER_ANALYSIS_ERROR = "Não foi possível gerar a análise do jogador."
+
 class MatchNarratorOpenAI:
     def __init__(self):
         # Carregar variáveis de ambiente
@@ -94,7 +98,7 @@ class MatchNarratorOpenAI:
             
         except Exception as e:
             logger.error(f"Erro ao gerar narrativa: {str(e)}")
-            return "Não foi possível gerar a narrativa da partida."
+            return NARRATIVE_ERROR
 
     def generate_player_analysis(self, player_data: Dict[str, Any]) -> str:
         """
@@ -136,4 +140,4 @@ class MatchNarratorOpenAI:
             
         except Exception as e:
             logger.error(f"Erro ao gerar análise do jogador: {str(e)}")
-            return "Não foi possível gerar a análise do jogador."
+            return PLAYER_ANALYSIS_ERROR
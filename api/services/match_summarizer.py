@@ -0,0 +1,133 @@
+from typing import Dict, List, Any
+import logging
+import pandas as pd
+from api.utils.event_frame import PENALTY_SHOOTOUT_PERIOD, column
+
+logger = logging.getLogger(__name__)
+
+
+class MatchSummarizer:
+    """
+    Extrai os eventos-chave (gols, cartões e substituições) de uma partida StatsBomb.
+
+    Todas as categorias saem de uma única seleção vetorizada sobre a tabela de eventos.
+    """
+
+    @staticmethod
+    def _teams(events: pd.DataFrame) -> List[str]:
+        """
+        Retorna [mandante, visitante] pela ordem dos eventos 'Starting XI'.
+        """
+        starting = events.loc[events['type'] == 'Starting XI', 'team'].tolist()
+        teams = list(dict.fromkeys(starting + events['team'].dropna().tolist()))
+        return teams[:2]
+
+    @staticmethod
+    def _assisters(events: pd.DataFrame) -> pd.Series:
+        """
+        Mapeia id do chute -> nome do jogador que deu o passe para ele.
+
+        Usa o vínculo do passe (`pass_assisted_shot_id` com `pass_goal_assist`/
+        `pass_shot_assist`) e, na falta dele, o `shot_key_pass_id` do chute.
+        """
+        assist_flags = (
+            column(events, 'pass_goal_assist').eq(True)
+            | column(events, 'pass_shot_assist').eq(True)
+        )
+        shot_ids = column(events, 'pass_assisted_shot_id')
+        linked = events.loc[assist_flags & shot_ids.notna()]
+        by_pass_link = pd.Series(linked['player'].values, index=shot_ids[linked.index].values)
+        by_pass_link = by_pass_link[~by_pass_link.index.duplicated()]
+
+        key_pass = column(events, 'shot_key_pass_id')
+        player_by_event = pd.Series(events['player'].values, index=events['id'].values)
+        by_key_pass = key_pass.map(player_by_event)
+        by_key_pass.index = events['id'].values
+
+        return by_pass_link.combine_first(by_key_pass.dropna())
+
+    @staticmethod
+    def summarize(events: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Gera o resumo de eventos-chave a partir do DataFrame de eventos da partida.
+
+        Args:
+            events: DataFrame de eventos (formato do statsbombpy)
+
+        Returns:
+            Dicionário com times, placar, gols, cartões e substituições
+        """
+        teams = MatchSummarizer._teams(events)
+        event_type = events['type']
+        in_play = column(events, 'period').ne(PENALTY_SHOOTOUT_PERIOD)
+
+        goal_mask = (event_type == 'Shot') & (column(events, 'shot_outcome') == 'Goal') & in_play
+        own_goal_mask = (event_type == 'Own Goal Against') & in_play
+        card = column(events, 'foul_committed_card').combine_first(column(events, 'bad_behaviour_card'))
+        card_mask = card.notna()
+        sub_mask = event_type == 'Substitution'
+
+        key = events.loc[goal_mask | own_goal_mask | card_mask | sub_mask].assign(
+            card_type=card,
+            replacement=column(events, 'substitution_replacement'),
+            xg=column(events, 'shot_statsbomb_xg'),
+            is_goal=goal_mask,
+            is_own_goal=own_goal_mask,
+            is_card=card_mask,
+            is_sub=sub_mask
+        )
+        key = key.astype(object).where(key.notna(), None)
+
+        # Gol contra conta para o adversário de quem o marcou
+        opponent = {teams[0]: teams[1], teams[1]: teams[0]} if len(teams) == 2 else {}
+        assisters = MatchSummarizer._assisters(events)
+
+        goals = []
+        for row in key[key['is_goal'] | key['is_own_goal']].itertuples(index=False):
+            own_goal = bool(row.is_own_goal)
+            goals.append({
+                "minute": int(row.minute),
+                "second": int(row.second),
+                "period": int(row.period),
+                "scorer": row.player,
+                "team": opponent.get(row.team, row.team) if own_goal else row.team,
+                "assist": None if own_goal else assisters.get(row.id),
+                "own_goal": own_goal,
+                "xg": None if own_goal or row.xg is None else float(row.xg)
+            })
+
+        cards = [
+            {
+                "minute": int(row.minute),
+                "period": int(row.period),
+                "player": row.player,
+                "team": row.team,
+                "card_type": row.card_type
+            }
+            for row in key[key['is_card']].itertuples(index=False)
+        ]
+
+        substitutions = [
+            {
+                "minute": int(row.minute),
+                "period": int(row.period),
+                "team": row.team,
+                "player_out": row.player,
+                "player_in": row.replacement
+            }
+            for row in key[key['is_sub']].itertuples(index=False)
+        ]
+
+        score = {team: 0 for team in teams}
+        for goal in goals:
+            score[goal["team"]] = score.get(goal["team"], 0) + 1
+
+        home_team, away_team = (teams + [None, None])[:2]
+        return {
+            "home_team": home_team,
+            "away_team": away_team,
+            "score": f"{score.get(home_team, 0)}-{score.get(away_team, 0)}",
+            "goals": goals,
+            "cards": cards,
+            "substitutions": substitutions
+        }
@@ -0,0 +1,136 @@
+from typing import Dict, List, Any, Optional
+import logging
+import numpy as np
+import pandas as pd
+from api.utils.cache import match_cache
+from api.utils.downsampling import lttb_indices
+from api.utils.event_frame import column, location_xy
+from api.utils.statsbomb_handler import StatsBombHandler
+
+logger = logging.getLogger(__name__)
+
+# Início do terço final no sistema de coordenadas da StatsBomb (ataque sempre para x=120)
+FINAL_THIRD_X = 80.0
+METRICS = ("xg", "shots", "final_third_entries", "possession_share")
+
+
+class MatchMomentum:
+    """
+    Séries temporais de intensidade por time (xG, chutes, entradas no terço
+    final e posse de bola) em janelas de tempo, com média móvel e
+    downsampling LTTB para limitar o número de pontos dos gráficos.
+    """
+
+    @staticmethod
+    def bin_events(events: pd.DataFrame, window: int) -> pd.DataFrame:
+        """
+        Agrega as métricas por (período, janela de `window` minutos, time).
+
+        As janelas são definidas dentro de cada período, para que os acréscimos
+        do 1º tempo não se misturem com o início do 2º.
+
+        Args:
+            events: DataFrame de eventos da partida
+            window: Tamanho da janela em minutos
+
+        Returns:
+            DataFrame com uma linha por janela e colunas por métrica e time
+        """
+        period = events['period'].to_numpy(dtype=int)
+        minute = events['minute'].to_numpy(dtype=float) + events['second'].to_numpy(dtype=float) / 60
+        bucket = (minute // window).astype(int)
+        keys, bin_index = np.unique(np.stack([period, bucket], axis=1), axis=0, return_inverse=True)
+        bin_index = bin_index.ravel()
+        n_bins = len(keys)
+
+        event_type = events['type'].to_numpy()
+        team = events['team'].to_numpy()
+        x, _ = location_xy(events)
+        pass_end_x, _ = location_xy(events, 'pass_end_location')
+        carry_end_x, _ = location_xy(events, 'carry_end_location')
+        completed_pass = (event_type == 'Pass') & column(events, 'pass_outcome').isna().to_numpy()
+        end_x = np.where(completed_pass, pass_end_x, np.where(event_type == 'Carry', carry_end_x, np.nan))
+        entry = (x < FINAL_THIRD_X) & (end_x >= FINAL_THIRD_X)
+
+        is_shot = event_type == 'Shot'
+        xg = pd.to_numeric(column(events, 'shot_statsbomb_xg'), errors='coerce').fillna(0).to_numpy()
+        duration = pd.to_numeric(column(events, 'duration'), errors='coerce').fillna(0).to_numpy()
+        possession_team = column(events, 'possession_team').to_numpy()
+        possession_total = np.bincount(bin_index, weights=duration, minlength=n_bins)
+
+        table = pd.DataFrame({
+            "period": keys[:, 0],
+            "minute": keys[:, 1] * window
+        })
+        teams = [t for t in pd.unique(team) if isinstance(t, str)]
+        for name in teams:
+            own = team == name
+            table[(name, "xg")] = np.bincount(bin_index, weights=xg * (own & is_shot), minlength=n_bins)
+            table[(name, "shots")] = np.bincount(bin_index, weights=own & is_shot, minlength=n_bins)
+            table[(name, "final_third_entries")] = np.bincount(bin_index, weights=own & entry, minlength=n_bins)
+            owned = np.bincount(bin_index, weights=duration * (possession_team == name), minlength=n_bins)
+            table[(name, "possession_share")] = np.divide(
+                owned, possession_total, out=np.zeros(n_bins), where=possession_total > 0
+            )
+        table.attrs["teams"] = teams
+        return table
+
+    def get_momentum(
+        self,
+        match_id: int,
+        window: int = 1,
+        rolling: int = 5,
+        max_points: int = 120
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retorna as séries de momentum da partida.
+
+        Args:
+            match_id: ID da partida
+            window: Tamanho da janela em minutos
+            rolling: Número de janelas da média móvel (1 = sem suavização)
+            max_points: Máximo de pontos por série (LTTB)
+
+        Returns:
+            Dicionário com as séries de cada métrica por time, ou None
+        """
+        def compute_bins() -> pd.DataFrame:
+            return MatchMomentum.bin_events(StatsBombHandler.load_events(match_id), window)
+
+        def build() -> Optional[Dict[str, Any]]:
+            table = match_cache.get_or_compute("momentum_bins", (match_id, window), compute_bins, match_id=match_id)
+            if table.empty:
+                return None
+
+            # O LTTB usa a posição da janela como eixo x: o minuto da StatsBomb se
+            # repete entre os acréscimos do 1º tempo e o início do 2º
+            labels = table['minute'].to_numpy(dtype=float)
+            x = np.arange(len(table), dtype=float)
+
+            teams = {}
+            for team in table.attrs["teams"]:
+                series = {}
+                for metric in METRICS:
+                    values = table[(team, metric)].rolling(rolling, min_periods=1).mean().to_numpy()
+                    keep = lttb_indices(x, values, max_points)
+                    series[metric] = [
+                        {"period": int(table['period'].iat[i]), "minute": labels[i], "value": round(float(values[i]), 4)}
+                        for i in keep
+                    ]
+                teams[team] = series
+
+            return {
+                "match_id": match_id,
+                "window": window,
+                "rolling": rolling,
+                "bins": len(table),
+                "teams": teams
+            }
+
+        try:
+            return match_cache.get_or_compute(
+                "momentum", (match_id, window, rolling, max_points), build, match_id=match_id
+            )
+        except Exception as e:
+            logger.error(f"Erro ao calcular momentum da partida {match_id}: {str(e)}")
+            return None
@@ -0,0 +1,163 @@
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+import numpy as np
+import pandas as pd
+from api.utils.cache import match_cache
+from api.utils.event_frame import column, game_seconds, location_xy, timeline_position
+from api.utils.statsbomb_handler import StatsBombHandler
+
+logger = logging.getLogger(__name__)
+
+
+class PassNetwork:
+    """
+    Redes de passe por time: jogadores na posição média de origem dos passes e
+    arestas ponderadas passador -> receptor.
+
+    A partida é dividida em janelas entre as substituições do time; todas as
+    janelas saem de uma mesma agregação agrupada e ficam em cache por (partida, time).
+    """
+
+    @staticmethod
+    def _windows(events: pd.DataFrame, team: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Limites das janelas definidos pelas substituições do time.
+
+        Returns:
+            (posição de cada limite na linha do tempo, minuto do relógio da substituição)
+        """
+        subs = events[(events['type'] == 'Substitution') & (events['team'] == team)]
+        if subs.empty:
+            return np.array([]), np.array([])
+        # (período, relógio), e não só o relógio: acréscimos do 1º tempo vêm antes do início do 2º
+        breaks, first = np.unique(timeline_position(subs), return_index=True)
+        return breaks, game_seconds(subs)[first] / 60
+
+    @staticmethod
+    def build(events: pd.DataFrame, team: str) -> Optional[Dict[str, Any]]:
+        """
+        Calcula a rede de passes de todas as janelas do time.
+
+        Args:
+            events: DataFrame de eventos da partida
+            team: Nome do time
+
+        Returns:
+            Dicionário com as janelas e, para cada uma, nós e arestas; None se o time não tiver passes
+        """
+        completed = (
+            (events['type'] == 'Pass')
+            & (events['team'] == team)
+            & column(events, 'pass_recipient').notna()
+            & column(events, 'pass_outcome').isna()
+        )
+        passes = events[completed]
+        if passes.empty:
+            return None
+
+        breaks, break_minutes = PassNetwork._windows(events, team)
+        x, y = location_xy(passes)
+        end_x, end_y = location_xy(passes, 'pass_end_location')
+        table = pd.DataFrame({
+            "window": np.searchsorted(breaks, timeline_position(passes), side='right'),
+            "passer": passes['player'].to_numpy(),
+            "recipient": passes['pass_recipient'].to_numpy(),
+            "x": x,
+            "y": y,
+            "end_x": end_x,
+            "end_y": end_y
+        })
+
+        # Uma única agregação por (janela, passador, receptor); nós e arestas derivam dela
+        pairs = table.groupby(['window', 'passer', 'recipient'], sort=False).agg(
+            count=('x', 'size'),
+            x_sum=('x', 'sum'),
+            y_sum=('y', 'sum'),
+            x_n=('x', 'count'),
+            end_x_sum=('end_x', 'sum'),
+            end_y_sum=('end_y', 'sum'),
+            end_n=('end_x', 'count')
+        ).reset_index()
+
+        made = pairs.groupby(['window', 'passer'])[['count', 'x_sum', 'y_sum', 'x_n']].sum()
+        received = pairs.groupby(['window', 'recipient'])[['count', 'end_x_sum', 'end_y_sum', 'end_n']].sum()
+        made.index.names = received.index.names = ['window', 'player']
+        nodes = made.join(received, how='outer', lsuffix='_made', rsuffix='_received').fillna(0)
+
+        # Posição média de origem dos passes; quem só recebeu usa o destino médio dos passes recebidos
+        origin_x = nodes['x_sum'] / nodes['x_n'].replace(0, np.nan)
+        origin_y = nodes['y_sum'] / nodes['x_n'].replace(0, np.nan)
+        nodes['x'] = origin_x.fillna(nodes['end_x_sum'] / nodes['end_n'].replace(0, np.nan))
+        nodes['y'] = origin_y.fillna(nodes['end_y_sum'] / nodes['end_n'].replace(0, np.nan))
+        nodes = nodes.reset_index()
+
+        player_ids = (
+            events.loc[events['team'] == team, ['player', 'player_id']]
+            .dropna().drop_duplicates('player').set_index('player')['player_id']
+        )
+
+        minutes = np.concatenate([[0.0], break_minutes])
+        last_minute = float(events['minute'].max()) + 1
+        windows = []
+        for index in range(len(minutes)):
+            window_nodes = nodes[nodes['window'] == index]
+            window_edges = pairs[pairs['window'] == index].sort_values('count', ascending=False)
+            windows.append({
+                "index": index,
+                "start_minute": round(float(minutes[index]), 2),
+                "end_minute": round(float(minutes[index + 1]), 2) if index + 1 < len(minutes) else last_minute,
+                "passes": int(window_edges['count'].sum()),
+                "nodes": [
+                    {
+                        "player": row.player,
+                        "player_id": int(player_ids[row.player]) if row.player in player_ids else None,
+                        "x": None if pd.isna(row.x) else round(float(row.x), 2),
+                        "y": None if pd.isna(row.y) else round(float(row.y), 2),
+                        "passes": int(row.count_made),
+                        "received": int(row.count_received)
+                    }
+                    for row in window_nodes.itertuples(index=False)
+                ],
+                "edges": [
+                    {"passer": row.passer, "recipient": row.recipient, "count": int(row.count)}
+                    for row in window_edges.itertuples(index=False)
+                ]
+            })
+        return {"team": team, "windows": windows}
+
+    def get_pass_network(self, match_id: int, team: str, window: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Retorna a rede de passes do time em uma janela entre substituições.
+
+        Args:
+            match_id: ID da partida
+            team: Nome do time
+            window: Índice da janela (0 = titulares até a primeira substituição)
+
+        Returns:
+            Dicionário com nós, arestas e a lista de janelas disponíveis, ou None
+        """
+        def compute() -> Optional[Dict[str, Any]]:
+            return PassNetwork.build(StatsBombHandler.load_events(match_id), team)
+
+        try:
+            network = match_cache.get_or_compute("pass_network", (match_id, team), compute, match_id=match_id)
+        except Exception as e:
+            logger.error(f"Erro ao gerar rede de passes da partida {match_id}: {str(e)}")
+            return None
+
+        if not network or not 0 <= window < len(network["windows"]):
+            return None
+
+        selected = network["windows"][window]
+        return {
+            "match_id": match_id,
+            "team": team,
+            "window": {k: selected[k] for k in ("index", "start_minute", "end_minute", "passes")},
+            "windows": [
+                {k: w[k] for k in ("index", "start_minute", "end_minute", "passes")}
+                for w in network["windows"]
+            ],
+            "nodes": selected["nodes"],
+            "edges": selected["edges"]
+        }
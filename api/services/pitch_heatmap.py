@@ -0,0 +1,161 @@
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+import numpy as np
+import pandas as pd
+from api.utils.cache import match_cache
+from api.utils.event_frame import location_xy
+from api.utils.statsbomb_handler import StatsBombHandler
+
+logger = logging.getLogger(__name__)
+
+# Dimensões do campo no sistema de coordenadas da StatsBomb
+PITCH_LENGTH = 120.0
+PITCH_WIDTH = 80.0
+DEFAULT_BINS = 12
+
+
+def grid_shape(bins: int) -> Tuple[int, int]:
+    """
+    Retorna (colunas, linhas) da grade mantendo células aproximadamente quadradas.
+    """
+    return bins, max(1, round(bins * PITCH_WIDTH / PITCH_LENGTH))
+
+
+def gaussian_smooth(grid: np.ndarray, sigma: float) -> np.ndarray:
+    """
+    Suaviza a grade com um kernel gaussiano separável (bordas refletidas).
+    """
+    if sigma <= 0:
+        return grid
+    radius = max(1, int(np.ceil(3 * sigma)))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    kernel /= kernel.sum()
+
+    smoothed = grid
+    for axis in (0, 1):
+        padding = [(0, 0), (0, 0)]
+        padding[axis] = (radius, radius)
+        padded = np.pad(smoothed, padding, mode="reflect" if smoothed.shape[axis] > radius else "edge")
+        smoothed = np.apply_along_axis(lambda line: np.convolve(line, kernel, mode="valid"), axis, padded)
+    return smoothed
+
+
+class PitchHeatmap:
+    """
+    Mapas de calor de eventos no campo (120x80) com binning vetorizado.
+
+    As grades por time são pré-calculadas juntas na primeira consulta da partida;
+    filtros por jogador/tipo de evento são calculados sob demanda e também ficam em cache.
+    """
+
+    def _coordinates(self, match_id: int) -> pd.DataFrame:
+        """
+        Tabela enxuta (time, jogador, tipo, x, y) com os eventos que têm localização.
+        """
+        def build() -> pd.DataFrame:
+            events = StatsBombHandler.load_events(match_id)
+            x, y = location_xy(events)
+            coords = pd.DataFrame({
+                "team": events['team'].to_numpy(),
+                "player_id": events['player_id'].to_numpy() if 'player_id' in events else np.nan,
+                "type": events['type'].to_numpy(),
+                "x": x,
+                "y": y
+            })
+            return coords[~np.isnan(x)].reset_index(drop=True)
+
+        return match_cache.get_or_compute("event_coordinates", match_id, build, match_id=match_id)
+
+    @staticmethod
+    def _histogram(coords: pd.DataFrame, bins: int) -> np.ndarray:
+        """
+        Conta eventos por célula. A grade retornada é (linhas=y, colunas=x).
+        """
+        nx, ny = grid_shape(bins)
+        counts, _, _ = np.histogram2d(
+            coords['x'].to_numpy(),
+            coords['y'].to_numpy(),
+            bins=[nx, ny],
+            range=[[0, PITCH_LENGTH], [0, PITCH_WIDTH]]
+        )
+        return counts.T
+
+    def _team_grids(self, match_id: int, bins: int) -> Dict[Optional[str], np.ndarray]:
+        """
+        Pré-calcula as grades de todos os times (e da partida inteira) de uma vez.
+        """
+        def build() -> Dict[Optional[str], np.ndarray]:
+            coords = self._coordinates(match_id)
+            grids = {team: self._histogram(group, bins) for team, group in coords.groupby('team')}
+            grids[None] = sum(grids.values()) if grids else self._histogram(coords, bins)
+            return grids
+
+        return match_cache.get_or_compute("heatmap_teams", (match_id, bins), build, match_id=match_id)
+
+    def get_heatmap(
+        self,
+        match_id: int,
+        team: Optional[str] = None,
+        player_id: Optional[int] = None,
+        types: Optional[List[str]] = None,
+        bins: int = DEFAULT_BINS,
+        smooth: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retorna a grade de densidade de eventos de uma partida.
+
+        Args:
+            match_id: ID da partida
+            team: Nome do time (opcional)
+            player_id: ID do jogador (opcional)
+            types: Tipos de evento a considerar, ex.: ['Pass', 'Carry'] (opcional)
+            bins: Número de colunas da grade no comprimento do campo
+            smooth: Desvio padrão do suavizador gaussiano, em células (0 = sem suavização)
+
+        Returns:
+            Dicionário com a grade (linhas = largura do campo) ou None se não houver dados
+        """
+        type_key = tuple(sorted(types)) if types else None
+
+        def build() -> Optional[Dict[str, Any]]:
+            if player_id is None and type_key is None:
+                grids = self._team_grids(match_id, bins)
+                if team not in grids:
+                    return None
+                grid = grids[team]
+            else:
+                coords = self._coordinates(match_id)
+                mask = np.ones(len(coords), dtype=bool)
+                if team is not None:
+                    mask &= (coords['team'] == team).to_numpy()
+                if player_id is not None:
+                    mask &= (coords['player_id'] == player_id).to_numpy()
+                if type_key is not None:
+                    mask &= coords['type'].isin(type_key).to_numpy()
+                if not mask.any():
+                    return None
+                grid = self._histogram(coords[mask], bins)
+
+            total = int(grid.sum())
+            grid = gaussian_smooth(grid, smooth)
+            nx, ny = grid_shape(bins)
+            return {
+                "match_id": match_id,
+                "team": team,
+                "player_id": player_id,
+                "types": list(type_key) if type_key else None,
+                "pitch": [PITCH_LENGTH, PITCH_WIDTH],
+                "bins": [nx, ny],
+                "smooth": smooth,
+                "events": total,
+                "max": round(float(grid.max()), 3) if grid.size else 0.0,
+                "grid": np.round(grid, 3).tolist()
+            }
+
+        key = (match_id, team, player_id, type_key, bins, smooth)
+        try:
+            return match_cache.get_or_compute("heatmap", key, build, match_id=match_id)
+        except Exception as e:
+            logger.error(f"Erro ao gerar mapa de calor da partida {match_id}: {str(e)}")
+            return None
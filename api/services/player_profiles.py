@@ -0,0 +1,192 @@
+from typing import Dict, List, Any, Optional
+import logging
+import numpy as np
+import pandas as pd
+from .match_summarizer import PENALTY_SHOOTOUT_PERIOD
+from .shot_analysis import ON_TARGET_OUTCOMES
+from api.models.match_models import PLAYER_PROFILES_ADAPTER
+from api.utils.cache import match_cache
+from api.utils.event_frame import PERIOD_START_SECONDS, column, period_offsets
+from api.utils.statsbomb_handler import StatsBombHandler
+
+logger = logging.getLogger(__name__)
+
+INTEGER_STATS = [
+    "passes", "passes_completed", "key_passes", "assists", "shots", "shots_on_target",
+    "goals", "tackles", "interceptions", "fouls_committed"
+]
+
+
+def _clock_seconds(value: Any) -> Optional[int]:
+    """
+    Converte um horário "MM:SS" das posições do lineup em segundos.
+    """
+    if not isinstance(value, str) or ':' not in value:
+        return None
+    minutes, seconds = value.split(':')[:2]
+    return int(minutes) * 60 + int(float(seconds))
+
+
+class PlayerProfiles:
+    """
+    Perfis de todos os jogadores de uma partida: dados do lineup, posições com
+    minutos jogados, cartões e estatísticas.
+
+    As estatísticas saem de uma única agregação agrupada por jogador sobre os
+    eventos, e o lineup é buscado uma vez; o resultado fica em cache por partida.
+    """
+
+    @staticmethod
+    def player_stats(events: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula as estatísticas de todos os jogadores de uma vez.
+
+        Args:
+            events: DataFrame de eventos da partida
+
+        Returns:
+            DataFrame indexado por player_id com uma coluna por estatística
+        """
+        events = events[events['period'] < PENALTY_SHOOTOUT_PERIOD]
+        event_type = events['type']
+        is_pass = event_type == 'Pass'
+        is_shot = event_type == 'Shot'
+        outcome = column(events, 'shot_outcome')
+
+        indicators = pd.DataFrame({
+            "player_id": column(events, 'player_id'),
+            "passes": is_pass,
+            "passes_completed": is_pass & column(events, 'pass_outcome').isna(),
+            "key_passes": column(events, 'pass_shot_assist').eq(True),
+            "assists": column(events, 'pass_goal_assist').eq(True),
+            "shots": is_shot,
+            "shots_on_target": is_shot & outcome.isin(ON_TARGET_OUTCOMES),
+            "goals": is_shot & (outcome == 'Goal'),
+            "xg": pd.to_numeric(column(events, 'shot_statsbomb_xg'), errors='coerce').where(is_shot, 0).fillna(0),
+            "tackles": (event_type == 'Duel') & (column(events, 'duel_type') == 'Tackle'),
+            "interceptions": event_type == 'Interception',
+            "fouls_committed": event_type == 'Foul Committed'
+        })
+        return indicators.dropna(subset=['player_id']).groupby('player_id').sum()
+
+    @staticmethod
+    def _positions(positions: Any, offsets: Dict[int, float]) -> List[Dict[str, Any]]:
+        """
+        Posições do jogador com os minutos jogados em cada uma.
+
+        Posições sem `to` vão até o fim da partida (antes dos pênaltis).
+        """
+        if not isinstance(positions, (list, tuple, np.ndarray)):
+            return []
+
+        def elapsed(clock: Optional[int], period: Any) -> float:
+            if clock is None or pd.isna(period) or int(period) not in PERIOD_START_SECONDS:
+                return offsets[PENALTY_SHOOTOUT_PERIOD]
+            period = int(period)
+            return offsets[period] + max(clock - PERIOD_START_SECONDS[period], 0)
+
+        result = []
+        for position in positions:
+            start = elapsed(_clock_seconds(position.get('from')), position.get('from_period'))
+            end = elapsed(_clock_seconds(position.get('to')), position.get('to_period'))
+            result.append({
+                "position_id": position.get('position_id'),
+                "position": position.get('position'),
+                "from": position.get('from'),
+                "to": position.get('to'),
+                "from_period": position.get('from_period'),
+                "to_period": position.get('to_period'),
+                "start_reason": position.get('start_reason'),
+                "end_reason": position.get('end_reason'),
+                "minutes": round(max(end - start, 0.0) / 60, 1)
+            })
+        return result
+
+    @staticmethod
+    def build(events: pd.DataFrame, lineups: Dict[str, pd.DataFrame]) -> List[Dict[str, Any]]:
+        """
+        Monta o perfil de todos os jogadores relacionados para a partida.
+
+        Args:
+            events: DataFrame de eventos da partida
+            lineups: Lineups da partida ({nome do time: DataFrame})
+
+        Returns:
+            Lista de perfis, um por jogador do lineup
+        """
+        stats = PlayerProfiles.player_stats(events)
+        offsets = period_offsets(events[events['period'] < PENALTY_SHOOTOUT_PERIOD])
+        empty_stats = pd.Series(0, index=stats.columns)
+
+        profiles = []
+        for team, players in lineups.items():
+            for player in players.to_dict('records'):
+                player_id = int(player['player_id'])
+                positions = PlayerProfiles._positions(player.get('positions'), offsets)
+                cards = player.get('cards')
+                row = stats.loc[player_id] if player_id in stats.index else empty_stats
+
+                statistics = {name: int(row[name]) for name in INTEGER_STATS}
+                statistics["xg"] = round(float(row["xg"]), 4)
+                profiles.append({
+                    "player_id": player_id,
+                    "player_name": player.get('player_name'),
+                    "player_nickname": None if pd.isna(player.get('player_nickname')) else player.get('player_nickname'),
+                    "jersey_number": None if pd.isna(player.get('jersey_number')) else int(player['jersey_number']),
+                    "country": None if pd.isna(player.get('country')) else player.get('country'),
+                    "team": team,
+                    "position": positions[0]["position"] if positions else None,
+                    "started": bool(positions) and positions[0]["start_reason"] == 'Starting XI',
+                    "minutes_played": round(sum(p["minutes"] for p in positions), 1),
+                    "cards": [card.get('card_type') for card in cards] if isinstance(cards, (list, tuple)) else [],
+                    "positions": positions,
+                    "statistics": statistics
+                })
+        return profiles
+
+    def get_profiles_list(self, match_id: int) -> List[Dict[str, Any]]:
+        """
+        Perfis de todos os jogadores da partida (em cache), para uso por outros serviços.
+        """
+        def compute() -> List[Dict[str, Any]]:
+            profiles = PlayerProfiles.build(
+                StatsBombHandler.load_events(match_id),
+                StatsBombHandler.load_lineups(match_id)
+            )
+            # Validação única, antes de entrar no cache: as rotas servem os perfis sem revalidar
+            PLAYER_PROFILES_ADAPTER.validate_python(profiles)
+            return profiles
+
+        return match_cache.get_or_compute("player_profiles", match_id, compute, match_id=match_id)
+
+    def get_player(self, match_id: int, player_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o perfil de um jogador da partida, ou None se ele não estiver no lineup.
+        """
+        for profile in self.get_profiles_list(match_id):
+            if profile["player_id"] == player_id:
+                return profile
+        return None
+
+    def get_players(self, match_id: int, team: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o perfil de todos os jogadores da partida.
+
+        Args:
+            match_id: ID da partida
+            team: Filtra os jogadores de um time (opcional)
+
+        Returns:
+            Dicionário com a lista de perfis, ou None
+        """
+        try:
+            profiles = self.get_profiles_list(match_id)
+        except Exception as e:
+            logger.error(f"Erro ao montar perfis dos jogadores da partida {match_id}: {str(e)}")
+            return None
+
+        if team is not None:
+            profiles = [p for p in profiles if p["team"] == team]
+        if not profiles:
+            return None
+        return {"match_id": match_id, "team": team, "players": profiles}
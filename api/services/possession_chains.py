@@ -0,0 +1,162 @@
+from typing import Dict, List, Any, Optional
+import logging
+import numpy as np
+import pandas as pd
+from api.utils.cache import match_cache
+from api.utils.event_frame import column, game_seconds, location_xy
+from api.utils.statsbomb_handler import StatsBombHandler
+
+logger = logging.getLogger(__name__)
+
+
+def _first_valid(valid: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Índice do primeiro evento válido de cada sequência (-1 se nenhum).
+    """
+    n = len(valid)
+    positions = np.where(valid, np.arange(n), n)
+    first = np.minimum.reduceat(positions, starts)
+    return np.where(first < n, first, -1)
+
+
+def _last_valid(valid: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Índice do último evento válido de cada sequência (-1 se nenhum).
+    """
+    positions = np.where(valid, np.arange(len(valid)), -1)
+    return np.maximum.reduceat(positions, starts)
+
+
+class PossessionChains:
+    """
+    Segmenta a partida em cadeias de posse usando codificação por comprimento
+    de sequência (run-length) sobre a coluna `possession` da StatsBomb.
+
+    A tabela de cadeias é calculada uma vez por partida e fica em cache.
+    """
+
+    @staticmethod
+    def build(events: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula a tabela de cadeias de posse a partir dos eventos em ordem cronológica.
+
+        Args:
+            events: DataFrame de eventos da partida (ordenado)
+
+        Returns:
+            DataFrame com uma linha por cadeia de posse
+        """
+        events = events[column(events, 'possession').notna()]
+        if events.empty:
+            return pd.DataFrame()
+
+        possession = events['possession'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, possession[1:] != possession[:-1]])
+        ends = np.r_[starts[1:], len(possession)] - 1
+
+        seconds = game_seconds(events)
+        duration = pd.to_numeric(column(events, 'duration'), errors='coerce').fillna(0).to_numpy()
+        x, y = location_xy(events)
+        has_location = ~np.isnan(x)
+
+        team = events['team'].to_numpy()
+        possession_team = events['possession_team'].to_numpy()
+        own_action = team == possession_team
+        event_type = events['type'].to_numpy()
+        is_pass = (event_type == 'Pass') & own_action
+        is_shot = (event_type == 'Shot') & own_action
+        xg = pd.to_numeric(column(events, 'shot_statsbomb_xg'), errors='coerce').fillna(0).to_numpy() * is_shot
+        is_goal = is_shot & (column(events, 'shot_outcome') == 'Goal').to_numpy()
+
+        first_loc = _first_valid(has_location, starts)
+        last_loc = _last_valid(has_location, starts)
+        # A cadeia termina em chute se a última ação do time com a posse for um chute
+        last_own = _last_valid(own_action, starts)
+
+        def at(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+            return np.where(index >= 0, values[np.clip(index, 0, None)], np.nan)
+
+        return pd.DataFrame({
+            "possession": possession[starts].astype(int),
+            "team": possession_team[starts],
+            "period": events['period'].to_numpy()[starts].astype(int),
+            "play_pattern": column(events, 'play_pattern').to_numpy()[starts],
+            "start_time": seconds[starts],
+            "end_time": seconds[ends] + duration[ends],
+            "events": ends - starts + 1,
+            "passes": np.add.reduceat(is_pass.astype(int), starts),
+            "shots": np.add.reduceat(is_shot.astype(int), starts),
+            "ended_in_shot": (last_own >= 0) & is_shot[np.clip(last_own, 0, None)],
+            "goal": np.add.reduceat(is_goal.astype(int), starts) > 0,
+            "xg": np.add.reduceat(xg, starts),
+            "start_x": at(x, first_loc),
+            "start_y": at(y, first_loc),
+            "end_x": at(x, last_loc),
+            "end_y": at(y, last_loc)
+        }).assign(duration=lambda df: (df['end_time'] - df['start_time']).clip(lower=0))
+
+    def get_chains_frame(self, match_id: int) -> pd.DataFrame:
+        """
+        Tabela de cadeias de posse da partida (em cache), para uso por outros serviços.
+        """
+        def compute() -> pd.DataFrame:
+            return PossessionChains.build(StatsBombHandler.load_events(match_id))
+
+        return match_cache.get_or_compute("possession_chains", match_id, compute, match_id=match_id)
+
+    def get_possessions(self, match_id: int, team: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retorna as cadeias de posse da partida e um resumo por time.
+
+        Args:
+            match_id: ID da partida
+            team: Filtra as cadeias de um time (opcional)
+
+        Returns:
+            Dicionário com as cadeias e o resumo por time, ou None
+        """
+        try:
+            chains = self.get_chains_frame(match_id)
+        except Exception as e:
+            logger.error(f"Erro ao segmentar posses da partida {match_id}: {str(e)}")
+            return None
+        if chains.empty:
+            return None
+
+        summary = chains.groupby('team').agg(
+            chains=('possession', 'size'),
+            total_duration=('duration', 'sum'),
+            avg_duration=('duration', 'mean'),
+            avg_passes=('passes', 'mean'),
+            ended_in_shot=('ended_in_shot', 'sum'),
+            xg=('xg', 'sum')
+        )
+        total_time = summary['total_duration'].sum() or 1.0
+        summary['share'] = summary['total_duration'] / total_time
+
+        if team is not None:
+            chains = chains[chains['team'] == team]
+            if chains.empty:
+                return None
+
+        rounded = chains.round({
+            'start_time': 2, 'end_time': 2, 'duration': 2, 'xg': 4,
+            'start_x': 2, 'start_y': 2, 'end_x': 2, 'end_y': 2
+        })
+        records = rounded.astype(object).where(rounded.notna(), None).to_dict('records')
+        return {
+            "match_id": match_id,
+            "team": team,
+            "summary": {
+                name: {
+                    "chains": int(row.chains),
+                    "avg_duration": round(float(row.avg_duration), 2),
+                    "avg_passes": round(float(row.avg_passes), 2),
+                    "ended_in_shot": int(row.ended_in_shot),
+                    "xg": round(float(row.xg), 4),
+                    "share": round(float(row.share), 4)
+                }
+                for name, row in summary.iterrows()
+            },
+            "chains": records
+        }
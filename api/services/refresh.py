@@ -0,0 +1,153 @@
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+import logging
+import os
+import threading
+import pandas as pd
+from .season_stats import season_stats
+from .warmup import warmup
+from api.utils.cache import match_cache
+from api.utils.event_columns import event_columns
+from api.utils.match_index import match_index
+from api.utils.statsbomb_data import get_competitions
+from api.utils.statsbomb_handler import StatsBombHandler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Intervalo entre verificações automáticas (0 desativa o agendamento)
+REFRESH_INTERVAL_SECONDS = float(os.getenv("REFRESH_INTERVAL_SECONDS", "3600"))
+
+
+def _stamp(value: Any) -> Optional[str]:
+    # Mesmo formato gravado pelo índice de partidas (ausente/NaN -> None)
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or value == "":
+        return None
+    return str(value)
+
+
+class RefreshScheduler:
+    """
+    Atualização incremental dos dados a partir dos carimbos de atualização da StatsBomb.
+
+    Compara `match_updated`/`match_updated_360` de cada temporada já indexada com
+    o último valor processado; nas temporadas alteradas, compara `last_updated` e
+    `data_version` de cada partida com o índice e, só para as partidas alteradas,
+    invalida os caches dependentes (eventos, resumos, perfis, narrativas, versão
+    usada nos ETags e tabela da temporada) e baixa os dados de novo.
+    """
+
+    def __init__(self, interval: float = REFRESH_INTERVAL_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def start(self) -> None:
+        """
+        Inicia a verificação periódica em uma thread própria (se o intervalo for positivo).
+        """
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Interrompe a verificação periódica.
+        """
+        self._stop.set()
+        self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Erro na atualização agendada: {str(e)}")
+
+    def invalidate_match(self, match_id: int) -> None:
+        """
+        Descarta tudo o que foi calculado a partir dos dados de uma partida.
+        """
+        StatsBombHandler.evict_http_cache(match_id=match_id)
+        if event_columns is not None:
+            event_columns.remove(match_id)
+        match_cache.invalidate_match(match_id)
+        season_stats.remove_match(match_id)
+
+    def refresh_season(self, competition_id: int, season_id: int) -> List[int]:
+        """
+        Atualiza a lista de partidas de uma temporada e trata as partidas alteradas.
+
+        Returns:
+            IDs das partidas cujos dados mudaram
+        """
+        stored = match_index.match_versions(competition_id, season_id)
+        StatsBombHandler.evict_http_cache(competition_id=competition_id, season_id=season_id)
+        matches = StatsBombHandler.get_matches(competition_id, season_id)
+
+        changed = []
+        for match in matches:
+            match_id = int(match["match_id"])
+            current = (_stamp(match.get("last_updated")), _stamp(match.get("data_version")))
+            if match_id in stored and stored[match_id] != current:
+                changed.append(match_id)
+
+        for match_id in changed:
+            self.invalidate_match(match_id)
+            try:
+                warmup.warm_match(match_id, [])
+            except Exception as e:
+                logger.error(f"Erro ao baixar novamente a partida {match_id}: {str(e)}")
+        return changed
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Executa uma verificação completa (uma por vez) e retorna o relatório.
+        """
+        with self._lock:
+            StatsBombHandler.evict_http_cache(competitions=True)
+            competitions = get_competitions()
+            tracked = set(match_index.tracked_seasons())
+
+            report: Dict[str, Any] = {
+                "checked_seasons": 0,
+                "changed_seasons": [],
+                "changed_matches": [],
+                "errors": []
+            }
+            if not competitions:
+                report["errors"].append("Não foi possível obter a lista de competições")
+
+            for competition in competitions:
+                key = (int(competition["competition_id"]), int(competition["season_id"]))
+                if key not in tracked:
+                    continue
+                report["checked_seasons"] += 1
+                stamps = (_stamp(competition.get("match_updated")), _stamp(competition.get("match_updated_360")))
+                if match_index.season_updates(*key) == stamps:
+                    continue
+
+                try:
+                    changed = self.refresh_season(*key)
+                    match_index.set_season_updates(*key, *stamps)
+                except Exception as e:
+                    logger.error(f"Erro ao atualizar a temporada {key[0]}/{key[1]}: {str(e)}")
+                    report["errors"].append(f"temporada {key[0]}/{key[1]}: {str(e)}")
+                    continue
+                report["changed_seasons"].append({"competition_id": key[0], "season_id": key[1]})
+                report["changed_matches"] += changed
+
+            report["finished_at"] = datetime.now().isoformat(timespec="seconds")
+            if report["changed_matches"]:
+                logger.info(f"Partidas atualizadas: {report['changed_matches']}")
+            self.last_report = report
+            return report
+
+
+# Instância compartilhada pelo processo (iniciada no lifespan da aplicação)
+refresh_scheduler = RefreshScheduler()
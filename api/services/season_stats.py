@@ -0,0 +1,240 @@
+from typing import Dict, List, Any, Optional, Set, Tuple
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from .match_analysis import SUMMARY_WORKERS
+from .player_profiles import PlayerProfiles, INTEGER_STATS
+from api.utils.cache import MatchCache, match_cache
+from api.utils.match_index import match_index
+from api.utils.statsbomb_handler import StatsBombHandler
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = ["minutes_played"] + INTEGER_STATS + ["xg"]
+# Intervalo mínimo entre consultas à lista de partidas de uma temporada
+SEASON_REFRESH_SECONDS = 300
+
+SeasonKey = Tuple[int, int]
+
+
+class SeasonStats:
+    """
+    Tabela materializada de estatísticas por jogador e por partida, por temporada.
+
+    Cada partida é processada uma única vez ao ser ingerida: suas linhas são
+    anexadas à tabela e somadas aos totais por jogador, sem reprocessar as
+    partidas anteriores.
+
+    A tabela é do processo: partidas invalidadas por outro worker (atualização de
+    dados) chegam pelo log de invalidações do cache compartilhado e são retiradas
+    daqui também, para serem ingeridas de novo na próxima atualização.
+    """
+
+    def __init__(self, max_workers: int = SUMMARY_WORKERS, cache: Optional[MatchCache] = None):
+        self.max_workers = max_workers
+        self.cache = cache or match_cache
+        self.cache.add_invalidation_listener(self.remove_match)
+        self.player_profiles = PlayerProfiles()
+        self._rows: Dict[SeasonKey, pd.DataFrame] = {}
+        self._totals: Dict[SeasonKey, pd.DataFrame] = {}
+        self._ingested: Dict[SeasonKey, Set[int]] = {}
+        self._checked_at: Dict[SeasonKey, float] = {}
+        self._removed_at: Dict[SeasonKey, float] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @staticmethod
+    def match_rows(match_id: int, profiles: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Converte os perfis de uma partida em linhas (jogador, partida) da tabela.
+
+        Reservas que não entraram em campo ficam de fora.
+        """
+        rows = [
+            {
+                "match_id": match_id,
+                "player_id": p["player_id"],
+                "player_name": p["player_name"],
+                "team": p["team"],
+                "minutes_played": p["minutes_played"],
+                **p["statistics"]
+            }
+            for p in profiles
+            if p["minutes_played"] > 0
+        ]
+        return pd.DataFrame(rows, columns=["match_id", "player_id", "player_name", "team"] + STAT_COLUMNS)
+
+    @staticmethod
+    def _player_totals(rows: pd.DataFrame) -> pd.DataFrame:
+        totals = rows.groupby('player_id')[STAT_COLUMNS].sum()
+        totals['matches'] = rows.groupby('player_id').size()
+        return totals
+
+    def ingest(self, competition_id: int, season_id: int, match_id: int, rows: pd.DataFrame) -> None:
+        """
+        Anexa as linhas de uma partida à tabela da temporada e atualiza os totais por jogador.
+        """
+        key = (competition_id, season_id)
+        with self._lock:
+            if match_id in self._ingested.setdefault(key, set()):
+                return
+            totals = SeasonStats._player_totals(rows)
+            current = self._totals.get(key)
+            self._totals[key] = totals if current is None else current.add(totals, fill_value=0)
+            self._rows[key] = pd.concat([self._rows[key], rows], ignore_index=True) if key in self._rows else rows
+            self._ingested[key].add(match_id)
+
+    def remove_match(self, match_id: int) -> bool:
+        """
+        Retira uma partida (ex.: dados atualizados na StatsBomb) das tabelas em que
+        ela foi ingerida; a próxima atualização da temporada a ingere de novo.
+
+        Returns:
+            True se a partida estava em alguma tabela
+        """
+        removed = False
+        with self._lock:
+            for key, ingested in self._ingested.items():
+                if match_id not in ingested:
+                    continue
+                rows = self._rows[key]
+                rows = self._rows[key] = rows[rows['match_id'] != match_id].reset_index(drop=True)
+                self._totals[key] = SeasonStats._player_totals(rows)
+                ingested.discard(match_id)
+                self._removed_at[key] = time.monotonic()
+                removed = True
+        return removed
+
+    def refresh(self, competition_id: int, season_id: int, force: bool = False) -> int:
+        """
+        Ingere as partidas disponíveis da temporada que ainda não estão na tabela.
+
+        A lista de partidas é consultada no máximo a cada SEASON_REFRESH_SECONDS,
+        ou logo depois que uma partida da temporada é retirada (neste ou em outro processo).
+
+        Returns:
+            Número de partidas novas ingeridas
+        """
+        key = (competition_id, season_id)
+        self.cache.sync_invalidations()
+        with self._refresh_lock:
+            started = time.monotonic()
+            checked_at = self._checked_at.get(key, float('-inf'))
+            fresh = started - checked_at < SEASON_REFRESH_SECONDS
+            if not force and fresh and self._removed_at.get(key, float('-inf')) < checked_at:
+                return 0
+
+            matches = StatsBombHandler.get_matches(competition_id, season_id)
+            ingested = self._ingested.get(key, set())
+            pending = [
+                int(m["match_id"]) for m in matches
+                if m.get("match_status", "available") == "available" and int(m["match_id"]) not in ingested
+            ]
+
+            def load(match_id: int) -> Optional[pd.DataFrame]:
+                try:
+                    return SeasonStats.match_rows(match_id, self.player_profiles.get_profiles_list(match_id))
+                except Exception as e:
+                    logger.error(f"Erro ao ingerir a partida {match_id}: {str(e)}")
+                    return None
+
+            added = 0
+            if pending:
+                logger.info(f"Ingerindo {len(pending)} partidas da temporada {competition_id}/{season_id}")
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                    for match_id, rows in zip(pending, executor.map(load, pending)):
+                        if rows is not None:
+                            self.ingest(competition_id, season_id, match_id, rows)
+                            added += 1
+
+            # Início da verificação: uma partida retirada durante ela força a próxima
+            self._checked_at[key] = started
+            return added
+
+    @staticmethod
+    def table_fingerprint(competition_id: int, season_id: int, rows: pd.DataFrame) -> str:
+        """
+        Identifica o conteúdo de uma tabela: partidas ingeridas e a versão dos dados de cada uma.
+
+        Não depende do processo: dois workers (ou o mesmo após reiniciar) com as
+        mesmas partidas chegam à mesma impressão digital.
+        """
+        versions = match_index.match_versions(competition_id, season_id)
+        match_ids = sorted(int(match_id) for match_id in rows['match_id'].unique()) if not rows.empty else []
+        content = repr([(match_id, versions.get(match_id)) for match_id in match_ids])
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def get_table(self, competition_id: int, season_id: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Retorna (linhas por jogador e partida, totais por jogador) da temporada, atualizando antes.
+        """
+        self.refresh(competition_id, season_id)
+        key = (competition_id, season_id)
+        with self._lock:
+            rows = self._rows.get(key)
+            totals = self._totals.get(key)
+        if rows is None or totals is None:
+            return pd.DataFrame(), pd.DataFrame()
+        return rows, totals
+
+    def get_player_season(self, player_id: int, competition_id: int, season_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Retorna os totais e as taxas por 90 minutos de um jogador na temporada.
+
+        Args:
+            player_id: ID do jogador
+            competition_id: ID da competição
+            season_id: ID da temporada
+
+        Returns:
+            Dicionário com totais, taxas por 90 e a lista de partidas, ou None
+        """
+        try:
+            rows, totals = self.get_table(competition_id, season_id)
+        except Exception as e:
+            logger.error(f"Erro ao carregar a temporada {competition_id}/{season_id}: {str(e)}")
+            return None
+
+        if totals.empty or player_id not in totals.index:
+            return None
+
+        total = totals.loc[player_id]
+        player_rows = rows[rows['player_id'] == player_id]
+        minutes = float(total['minutes_played'])
+        latest = player_rows.iloc[-1]
+
+        return {
+            "player_id": player_id,
+            "player_name": latest['player_name'],
+            "teams": list(dict.fromkeys(player_rows['team'])),
+            "competition_id": competition_id,
+            "season_id": season_id,
+            "matches": int(total['matches']),
+            "minutes_played": round(minutes, 1),
+            "totals": {
+                **{name: int(total[name]) for name in INTEGER_STATS},
+                "xg": round(float(total['xg']), 4)
+            },
+            "per90": {
+                name: round(float(total[name]) * 90 / minutes, 3) if minutes > 0 else None
+                for name in INTEGER_STATS + ["xg"]
+            },
+            "match_log": [
+                {
+                    "match_id": int(row.match_id),
+                    "team": row.team,
+                    "minutes_played": float(row.minutes_played),
+                    "goals": int(row.goals),
+                    "shots": int(row.shots),
+                    "xg": round(float(row.xg), 4)
+                }
+                for row in player_rows.itertuples(index=False)
+            ]
+        }
+
+
+# Instância compartilhada pelos routers (a tabela materializada é única no processo)
+season_stats = SeasonStats()
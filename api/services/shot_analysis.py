@@ -0,0 +1,210 @@
+from typing import Dict, List, Any, Optional
+import logging
+import numpy as np
+import pandas as pd
+from .match_summarizer import PENALTY_SHOOTOUT_PERIOD
+from api.utils.cache import match_cache
+from api.utils.event_frame import column, elapsed_seconds, location_points, location_xy, period_offsets
+from api.utils.statsbomb_handler import StatsBombHandler
+
+logger = logging.getLogger(__name__)
+
+# Traves no sistema de coordenadas da StatsBomb (gol atacado sempre em x=120)
+GOAL_X = 120.0
+LEFT_POST_Y = 36.0
+RIGHT_POST_Y = 44.0
+ON_TARGET_OUTCOMES = {'Goal', 'Saved', 'Saved to Post'}
+
+
+def _point(value: Any) -> Optional[List[float]]:
+    if isinstance(value, (list, tuple, np.ndarray)) and len(value) >= 2:
+        return [float(v) for v in value]
+    return None
+
+
+def summarize_freeze_frame(frame: Any, shot_location: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+    """
+    Resume o freeze frame de um chute: companheiros, adversários, posição do goleiro
+    e quantos adversários estão no triângulo entre o chutador e as traves.
+    """
+    if not isinstance(frame, (list, tuple, np.ndarray)) or len(frame) == 0:
+        return None
+
+    teammates = np.array([bool(p.get('teammate')) for p in frame])
+    positions = [p.get('position') for p in frame]
+    position_names = [pos.get('name') if isinstance(pos, dict) else pos for pos in positions]
+    coords = np.array([_point(p.get('location')) or [np.nan, np.nan] for p in frame], dtype=float)[:, :2]
+
+    goalkeeper = None
+    for name, is_teammate, xy in zip(position_names, teammates, coords):
+        if name == 'Goalkeeper' and not is_teammate:
+            goalkeeper = [round(float(xy[0]), 2), round(float(xy[1]), 2)]
+            break
+
+    in_cone = 0
+    if shot_location is not None:
+        # Teste de sinal (mesmo lado das três arestas) vetorizado para todos os adversários
+        a = np.array(shot_location[:2])
+        b = np.array([GOAL_X, LEFT_POST_Y])
+        c = np.array([GOAL_X, RIGHT_POST_Y])
+        p = coords[~teammates]
+
+        def side(p1, p2, pts):
+            return (pts[:, 0] - p2[0]) * (p1[1] - p2[1]) - (p1[0] - p2[0]) * (pts[:, 1] - p2[1])
+
+        d1, d2, d3 = side(a, b, p), side(b, c, p), side(c, a, p)
+        has_neg = (d1 < 0) | (d2 < 0) | (d3 < 0)
+        has_pos = (d1 > 0) | (d2 > 0) | (d3 > 0)
+        in_cone = int(np.sum(~(has_neg & has_pos)))
+
+    return {
+        "players": int(len(frame)),
+        "teammates": int(teammates.sum()),
+        "opponents": int((~teammates).sum()),
+        "goalkeeper_location": goalkeeper,
+        "opponents_in_cone": in_cone
+    }
+
+
+class ShotAnalysis:
+    """
+    Mapa de chutes e agregações de xG (StatsBomb) por time e por jogador.
+
+    A tabela de chutes, as curvas de xG acumulado e os totais são calculados
+    uma vez por partida e reaproveitados por dashboard e narradores.
+    """
+
+    @staticmethod
+    def _shot_table(events: pd.DataFrame) -> pd.DataFrame:
+        """
+        Tabela de chutes em ordem cronológica, com coordenadas já separadas.
+
+        Cobranças da disputa de pênaltis ficam de fora, como no resumo e nos perfis.
+        `t` é o tempo jogado em minutos (acréscimos incluídos), como nos minutos
+        dos perfis; a ordem segue período e índice do evento.
+        """
+        in_play = events[events['period'] != PENALTY_SHOOTOUT_PERIOD]
+        shots = in_play[in_play['type'] == 'Shot']
+        order = ['period', 'index'] if 'index' in shots.columns else ['period', 'minute', 'second']
+        shots = shots.sort_values(order, kind='stable')
+        x, y = location_xy(shots)
+        return pd.DataFrame({
+            "id": shots['id'].to_numpy(),
+            "period": shots['period'].to_numpy(),
+            "minute": shots['minute'].to_numpy(),
+            "second": shots['second'].to_numpy(),
+            "t": elapsed_seconds(shots, period_offsets(in_play)) / 60,
+            "team": shots['team'].to_numpy(),
+            "player": shots['player'].to_numpy(),
+            "player_id": column(shots, 'player_id').to_numpy(),
+            "x": x,
+            "y": y,
+            "end_location": location_points(shots, 'shot_end_location').to_numpy(),
+            "xg": pd.to_numeric(column(shots, 'shot_statsbomb_xg'), errors='coerce').fillna(0.0).to_numpy(),
+            "outcome": column(shots, 'shot_outcome').to_numpy(),
+            "body_part": column(shots, 'shot_body_part').to_numpy(),
+            "shot_type": column(shots, 'shot_type').to_numpy(),
+            "freeze_frame": column(shots, 'shot_freeze_frame').to_numpy()
+        })
+
+    @staticmethod
+    def _curves(shots: pd.DataFrame, by: str) -> Dict[str, List[Dict[str, float]]]:
+        """
+        Curvas de xG acumulado (cumsum sobre os chutes ordenados no tempo), por grupo.
+        """
+        cumulative = shots.groupby(by, sort=False)['xg'].cumsum().to_numpy()
+        curves: Dict[str, List[Dict[str, float]]] = {}
+        for key, positions in shots.groupby(by, sort=False).indices.items():
+            curves[key] = [{"minute": 0.0, "xg": 0.0}] + [
+                {"minute": round(float(t), 2), "xg": round(float(v), 4)}
+                for t, v in zip(shots['t'].to_numpy()[positions], cumulative[positions])
+            ]
+        return curves
+
+    @staticmethod
+    def build(events: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Calcula chutes, curvas de xG e totais da partida.
+
+        Args:
+            events: DataFrame de eventos da partida
+
+        Returns:
+            Dicionário com chutes, totais por time/jogador e curvas de xG acumulado
+        """
+        shots = ShotAnalysis._shot_table(events)
+        shots['goal'] = shots['outcome'] == 'Goal'
+        shots['on_target'] = shots['outcome'].isin(ON_TARGET_OUTCOMES)
+
+        shot_list = []
+        for row in shots.itertuples(index=False):
+            location = None if np.isnan(row.x) else [round(float(row.x), 2), round(float(row.y), 2)]
+            shot_list.append({
+                "id": row.id,
+                "period": int(row.period),
+                "minute": int(row.minute),
+                "second": int(row.second),
+                "team": row.team,
+                "player": row.player,
+                "player_id": None if pd.isna(row.player_id) else int(row.player_id),
+                "location": location,
+                "end_location": _point(row.end_location),
+                "xg": round(float(row.xg), 4),
+                "outcome": None if pd.isna(row.outcome) else row.outcome,
+                "body_part": None if pd.isna(row.body_part) else row.body_part,
+                "shot_type": None if pd.isna(row.shot_type) else row.shot_type,
+                "freeze_frame": summarize_freeze_frame(row.freeze_frame, location)
+            })
+
+        aggregations = dict(shots=('xg', 'size'), goals=('goal', 'sum'), on_target=('on_target', 'sum'), xg=('xg', 'sum'))
+        team_totals = shots.groupby('team').agg(**aggregations)
+        player_totals = shots.groupby(['player', 'team']).agg(**aggregations).reset_index().sort_values('xg', ascending=False)
+
+        def totals(row) -> Dict[str, Any]:
+            return {
+                "shots": int(row.shots),
+                "goals": int(row.goals),
+                "on_target": int(row.on_target),
+                "xg": round(float(row.xg), 4)
+            }
+
+        return {
+            "shots": shot_list,
+            "totals": {
+                "teams": {team: totals(row) for team, row in team_totals.iterrows()},
+                "players": [
+                    {"player": row.player, "team": row.team, **totals(row)}
+                    for row in player_totals.itertuples(index=False)
+                ]
+            },
+            "xg_curves": {
+                "teams": ShotAnalysis._curves(shots, 'team'),
+                "players": ShotAnalysis._curves(shots, 'player')
+            }
+        }
+
+    def _analysis(self, match_id: int) -> Dict[str, Any]:
+        def compute() -> Dict[str, Any]:
+            return ShotAnalysis.build(StatsBombHandler.load_events(match_id))
+
+        return match_cache.get_or_compute("shots", match_id, compute, match_id=match_id)
+
+    def get_shots(self, match_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o mapa de chutes da partida com curvas de xG acumulado e totais.
+        """
+        try:
+            return {"match_id": match_id, **self._analysis(match_id)}
+        except Exception as e:
+            logger.error(f"Erro ao analisar chutes da partida {match_id}: {str(e)}")
+            return None
+
+    def get_xg_totals(self, match_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Retorna apenas os totais de xG por time e por jogador (a partir do cache).
+        """
+        try:
+            return self._analysis(match_id)["totals"]
+        except Exception as e:
+            logger.error(f"Erro ao obter xG da partida {match_id}: {str(e)}")
+            return None
@@ -0,0 +1,184 @@
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import json
+import logging
+import os
+import threading
+from .match_analysis import MatchAnalyzer
+from .player_profiles import PlayerProfiles
+from .season_stats import season_stats
+from api.utils.statsbomb_handler import StatsBombHandler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Threads do aquecimento (independentes do threadpool das requisições)
+WARMUP_WORKERS = int(os.getenv("WARMUP_WORKERS", "4"))
+# Quantidade de erros guardados no progresso
+MAX_REPORTED_ERRORS = 20
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def load_warmup_config() -> Dict[str, Any]:
+    """
+    Lê a lista de aquecimento: arquivo JSON em WARMUP_CONFIG e/ou variáveis de ambiente.
+
+    Formato do JSON:
+        {"competitions": [{"competition_id": 55, "season_id": 43}],
+         "matches": [3788741], "styles": ["formal"]}
+
+    Variáveis: WARMUP_COMPETITIONS ("55:43,43:3"), WARMUP_MATCHES ("3788741,3788742")
+    e WARMUP_STYLES ("formal,tecnico"; narrativas só são geradas se houver estilos).
+    """
+    config: Dict[str, Any] = {"competitions": [], "matches": [], "styles": []}
+    path = os.getenv("WARMUP_CONFIG")
+    if path:
+        try:
+            with open(path, encoding="utf-8") as file:
+                loaded = json.load(file)
+            for key in config:
+                config[key] = list(loaded.get(key, []))
+        except Exception as e:
+            logger.error(f"Erro ao ler a configuração de aquecimento {path}: {str(e)}")
+
+    for item in _split(os.getenv("WARMUP_COMPETITIONS")):
+        competition_id, _, season_id = item.partition(":")
+        config["competitions"].append({"competition_id": int(competition_id), "season_id": int(season_id)})
+    config["matches"] += [int(match_id) for match_id in _split(os.getenv("WARMUP_MATCHES"))]
+    config["styles"] += _split(os.getenv("WARMUP_STYLES"))
+    return config
+
+
+class CacheWarmup:
+    """
+    Aquecimento dos caches em segundo plano após o deploy.
+
+    Para cada partida configurada (ou de cada temporada configurada) carrega
+    eventos, lineups, resumo, perfis dos jogadores e, opcionalmente, narrativas;
+    depois monta a tabela de estatísticas das temporadas. As partidas são
+    processadas em paralelo e o progresso é exposto para a verificação de prontidão.
+    """
+
+    def __init__(self, max_workers: int = WARMUP_WORKERS):
+        self.max_workers = max(int(max_workers), 1)
+        self.analysis = MatchAnalyzer()
+        self.player_profiles = PlayerProfiles()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._progress: Dict[str, Any] = {
+            "status": "idle",
+            "total": 0,
+            "completed": 0,
+            "failed": 0,
+            "errors": [],
+            "started_at": None,
+            "finished_at": None
+        }
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Estado do aquecimento; `ready` indica que ele terminou (ou não foi configurado).
+        """
+        with self._lock:
+            progress = {**self._progress, "errors": list(self._progress["errors"])}
+        progress["ready"] = progress["status"] in ("done", "disabled")
+        return progress
+
+    def start(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Inicia o aquecimento em uma thread própria, sem bloquear a inicialização da API.
+        """
+        config = load_warmup_config() if config is None else config
+        if not (config.get("competitions") or config.get("matches")):
+            with self._lock:
+                self._progress["status"] = "disabled"
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._progress.update(status="running", started_at=datetime.now().isoformat(timespec="seconds"))
+            self._thread = threading.Thread(target=self.run, args=(config,), name="cache-warmup", daemon=True)
+        self._thread.start()
+
+    def _advance(self, failed: Optional[str] = None) -> None:
+        with self._lock:
+            self._progress["completed"] += 1
+            if failed is not None:
+                self._progress["failed"] += 1
+                if len(self._progress["errors"]) < MAX_REPORTED_ERRORS:
+                    self._progress["errors"].append(failed)
+
+    def warm_match(self, match_id: int, styles: List[str]) -> None:
+        """
+        Carrega (e deixa em cache) tudo o que as rotas de uma partida usam.
+
+        Raises:
+            Exception: Se os dados da partida não puderem ser carregados
+        """
+        StatsBombHandler.load_events(match_id)
+        StatsBombHandler.load_lineups(match_id)
+        StatsBombHandler.load_event_records(match_id)
+        if self.analysis.summarize_match(match_id) is None:
+            raise Exception("resumo indisponível")
+        self.player_profiles.get_profiles_list(match_id)
+        for style in styles:
+            self.analysis.analyze_with_llm(match_id, style)
+
+    def run(self, config: Dict[str, Any]) -> None:
+        """
+        Executa o aquecimento (bloqueante); normalmente chamado por `start()`.
+        """
+        seasons: List[Tuple[int, int]] = []
+        match_ids: List[int] = [int(match_id) for match_id in config.get("matches", [])]
+        for competition in config.get("competitions", []):
+            season = (int(competition["competition_id"]), int(competition["season_id"]))
+            try:
+                matches = StatsBombHandler.get_matches(*season)
+                seasons.append(season)
+                match_ids += [
+                    int(m["match_id"]) for m in matches
+                    if m.get("match_status", "available") == "available"
+                ]
+            except Exception as e:
+                logger.error(f"Erro ao listar as partidas de {season[0]}/{season[1]}: {str(e)}")
+                with self._lock:
+                    self._progress["total"] += 1
+                self._advance(f"temporada {season[0]}/{season[1]}: {str(e)}")
+
+        match_ids = list(dict.fromkeys(match_ids))
+        styles = list(config.get("styles", []))
+        with self._lock:
+            self._progress["total"] += len(match_ids) + len(seasons)
+        logger.info(f"Aquecendo o cache: {len(match_ids)} partidas, {len(seasons)} temporadas")
+
+        if match_ids:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(match_ids))) as executor:
+                futures = {executor.submit(self.warm_match, match_id, styles): match_id for match_id in match_ids}
+                for future in as_completed(futures):
+                    error = future.exception()
+                    if error is not None:
+                        logger.error(f"Erro ao aquecer a partida {futures[future]}: {str(error)}")
+                    self._advance(None if error is None else f"partida {futures[future]}: {str(error)}")
+
+        # Perfis já em cache: a tabela da temporada só agrega
+        for competition_id, season_id in seasons:
+            try:
+                season_stats.refresh(competition_id, season_id, force=True)
+                self._advance()
+            except Exception as e:
+                logger.error(f"Erro ao montar a temporada {competition_id}/{season_id}: {str(e)}")
+                self._advance(f"temporada {competition_id}/{season_id}: {str(e)}")
+
+        with self._lock:
+            self._progress.update(status="done", finished_at=datetime.now().isoformat(timespec="seconds"))
+        progress = self.progress()
+        logger.info(f"Aquecimento concluído: {progress['completed']} tarefas, {progress['failed']} falhas")
+
+
+# Instância compartilhada pelo processo (iniciada no lifespan da aplicação)
+warmup = CacheWarmup()
@@ -0,0 +1,186 @@
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import re
+from starlette.datastructures import QueryParams
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+class Lane:
+    """
+    Faixa de admissão: limite de requisições simultâneas e fila limitada.
+
+    Requisições além do limite esperam na fila; com a fila cheia, ou após
+    `queue_timeout` segundos de espera, são recusadas imediatamente (503).
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        self.queue_size = max(queue_size, 0)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> bool:
+        """
+        Tenta admitir uma requisição; retorna False se ela deve ser recusada.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                self.shed += 1
+                return False
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class AdmissionController:
+    """
+    Classifica as requisições em faixas e mantém os contadores de cada uma.
+
+    - `llm`: rotas que chamam o LLM dentro da requisição (`/analysis`, `/narrative`,
+      `?include_analysis=true`);
+    - `heavy`: consultas em lote ou de temporada inteira;
+    - `default`: demais rotas, sem limite próprio. Como cada faixa tem o seu limite,
+      as rotas baratas nunca esperam atrás das rotas de LLM.
+    """
+
+    LLM_PATHS = re.compile(r"^/api/v1/(matches/[^/]+/analysis|matches/[^/]+/narrative|narratives/[^/]+)$")
+    HEAVY_PATHS = re.compile(
+        r"^/api/v1/(matches/summaries|competitions/[^/]+/seasons/[^/]+/leaderboard|"
+        r"players/[^/]+/season|query|competitions/refresh)$"
+    )
+
+    def __init__(self):
+        queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+        self.lanes: Dict[str, Lane] = {
+            "llm": Lane(
+                "llm", _env_int("ADMISSION_LLM_CONCURRENCY", 4), _env_int("ADMISSION_LLM_QUEUE", 16),
+                queue_timeout, retry_after=_env_int("ADMISSION_LLM_RETRY_AFTER", 30)
+            ),
+            "heavy": Lane(
+                "heavy", _env_int("ADMISSION_HEAVY_CONCURRENCY", 8), _env_int("ADMISSION_HEAVY_QUEUE", 32),
+                queue_timeout, retry_after=_env_int("ADMISSION_HEAVY_RETRY_AFTER", 5)
+            )
+        }
+        self.default_in_flight = 0
+        self.default_admitted = 0
+
+    def classify(self, scope: Scope) -> str:
+        path = scope["path"]
+        if self.LLM_PATHS.match(path):
+            return "llm"
+        query = QueryParams(scope.get("query_string", b"").decode("latin-1"))
+        if query.get("include_analysis", "").lower() in ("true", "1", "yes", "on"):
+            return "llm"
+        if self.HEAVY_PATHS.match(path):
+            return "heavy"
+        return "default"
+
+    def metrics(self) -> str:
+        """
+        Contadores no formato de exposição de texto do Prometheus.
+        """
+        lanes: List[Tuple[str, int, int, int, int, Optional[int], Optional[int]]] = [
+            (lane.name, lane.in_flight, lane.waiting, lane.admitted, lane.shed, lane.concurrency, lane.queue_size)
+            for lane in self.lanes.values()
+        ]
+        lanes.append(("default", self.default_in_flight, 0, self.default_admitted, 0, None, None))
+
+        series = [
+            ("api_admission_in_flight", "gauge", "Requisições em execução por faixa", 1),
+            ("api_admission_queue_depth", "gauge", "Requisições aguardando na fila por faixa", 2),
+            ("api_admission_admitted_total", "counter", "Requisições admitidas por faixa", 3),
+            ("api_admission_shed_total", "counter", "Requisições recusadas (503) por faixa", 4),
+            ("api_admission_concurrency_limit", "gauge", "Limite de requisições simultâneas por faixa", 5),
+            ("api_admission_queue_limit", "gauge", "Tamanho máximo da fila por faixa", 6)
+        ]
+        lines = []
+        for name, kind, help_text, position in series:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [
+                f'{name}{{lane="{lane[0]}"}} {lane[position]}'
+                for lane in lanes if lane[position] is not None
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI de controle de admissão: aplica os limites da faixa de cada
+    requisição e responde 503 com Retry-After quando a faixa está saturada.
+    """
+
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name = self.controller.classify(scope)
+        if name == "default":
+            self.controller.default_in_flight += 1
+            self.controller.default_admitted += 1
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.controller.default_in_flight -= 1
+            return
+
+        lane = self.controller.lanes[name]
+        if not await lane.acquire():
+            await self._reject(lane, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+    @staticmethod
+    async def _reject(lane: Lane, send: Send) -> None:
+        body = json.dumps({
+            "detail": f"Servidor sobrecarregado; tente novamente em {lane.retry_after} s"
+        }, ensure_ascii=False).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(lane.retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Instância compartilhada entre o middleware e a rota de métricas
+admission = AdmissionController()
@@ -0,0 +1,382 @@
+from typing import Dict, List, Any, Optional
+import logging
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from api.utils.event_frame import column, location_xy
+from api.utils.storage import connect, data_path
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Limites das consultas: linhas devolvidas e tempo máximo de execução
+DEFAULT_ROW_LIMIT = 500
+MAX_ROW_LIMIT = 5000
+QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "5"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id INTEGER PRIMARY KEY,
+    competition_id INTEGER,
+    season_id INTEGER,
+    match_date TEXT,
+    competition_stage TEXT,
+    stadium TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    home_score INTEGER,
+    away_score INTEGER
+);
+CREATE INDEX IF NOT EXISTS matches_season ON matches (competition_id, season_id);
+
+CREATE TABLE IF NOT EXISTS events (
+    match_id INTEGER NOT NULL,
+    event_index INTEGER NOT NULL,
+    event_id TEXT NOT NULL,
+    period INTEGER,
+    minute INTEGER,
+    second INTEGER,
+    type TEXT,
+    team TEXT,
+    player_id INTEGER,
+    player TEXT,
+    position TEXT,
+    possession INTEGER,
+    possession_team TEXT,
+    play_pattern TEXT,
+    x REAL,
+    y REAL,
+    end_x REAL,
+    end_y REAL,
+    duration REAL,
+    outcome TEXT,
+    xg REAL,
+    under_pressure INTEGER,
+    PRIMARY KEY (match_id, event_index)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_type_team ON events (type, team);
+CREATE INDEX IF NOT EXISTS events_player_type ON events (player_id, type);
+
+CREATE TABLE IF NOT EXISTS lineups (
+    match_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    team TEXT,
+    player_name TEXT,
+    player_nickname TEXT,
+    jersey_number INTEGER,
+    country TEXT,
+    PRIMARY KEY (match_id, player_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lineups_player ON lineups (player_id);
+"""
+
+EVENT_COLUMNS = [
+    "match_id", "event_index", "event_id", "period", "minute", "second", "type", "team",
+    "player_id", "player", "position", "possession", "possession_team", "play_pattern",
+    "x", "y", "end_x", "end_y", "duration", "outcome", "xg", "under_pressure"
+]
+
+# Resultado do evento: o primeiro `*_outcome` preenchido (passe completo fica NULL, como na StatsBomb)
+OUTCOME_COLUMNS = [
+    "pass_outcome", "shot_outcome", "duel_outcome", "interception_outcome",
+    "dribble_outcome", "goalkeeper_outcome", "ball_receipt_outcome", "substitution_outcome"
+]
+END_LOCATION_COLUMNS = ["pass_end_location", "carry_end_location", "shot_end_location"]
+
+# Consultas permitidas no /query. Filtros opcionais usam `(:param IS NULL OR ...)`.
+QUERY_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "event_counts": {
+        "description": "Eventos por tipo e time em uma partida",
+        "params": {"match_id": (int, ...)},
+        "sql": """
+            SELECT type, team, COUNT(*) AS events
+            FROM events WHERE match_id = :match_id
+            GROUP BY type, team ORDER BY events DESC
+        """
+    },
+    "player_event_totals": {
+        "description": "Jogadores com mais eventos de um tipo (ex.: Pass, Shot, Duel), opcionalmente por temporada",
+        "params": {"type": (str, ...), "competition_id": (int, None), "season_id": (int, None)},
+        "sql": """
+            SELECT e.player_id, e.player, e.team, COUNT(*) AS events, COUNT(DISTINCT e.match_id) AS matches
+            FROM events e JOIN matches m ON m.match_id = e.match_id
+            WHERE e.type = :type AND e.player_id IS NOT NULL
+              AND (:competition_id IS NULL OR m.competition_id = :competition_id)
+              AND (:season_id IS NULL OR m.season_id = :season_id)
+            GROUP BY e.player_id ORDER BY events DESC
+        """
+    },
+    "pass_completion": {
+        "description": "Percentual de passes completos por jogador (mínimo de passes configurável)",
+        "params": {"min_passes": (int, 20), "team": (str, None)},
+        "sql": """
+            SELECT player_id, player, team, COUNT(*) AS passes,
+                   SUM(outcome IS NULL) AS completed,
+                   ROUND(100.0 * SUM(outcome IS NULL) / COUNT(*), 1) AS completion_pct
+            FROM events
+            WHERE type = 'Pass' AND player_id IS NOT NULL AND (:team IS NULL OR team = :team)
+            GROUP BY player_id HAVING COUNT(*) >= :min_passes
+            ORDER BY completion_pct DESC, passes DESC
+        """
+    },
+    "team_xg_by_match": {
+        "description": "Chutes, gols e xG de cada time por partida de uma temporada",
+        "params": {"competition_id": (int, ...), "season_id": (int, ...)},
+        "sql": """
+            SELECT m.match_id, m.match_date, e.team, COUNT(*) AS shots,
+                   SUM(e.outcome = 'Goal') AS goals, ROUND(SUM(e.xg), 3) AS xg
+            FROM events e JOIN matches m ON m.match_id = e.match_id
+            WHERE e.type = 'Shot' AND m.competition_id = :competition_id AND m.season_id = :season_id
+            GROUP BY m.match_id, e.team ORDER BY m.match_date, m.match_id, e.team
+        """
+    },
+    "player_shots": {
+        "description": "Chutes de um jogador em todas as partidas armazenadas",
+        "params": {"player_id": (int, ...)},
+        "sql": """
+            SELECT match_id, period, minute, second, x, y, outcome, ROUND(xg, 3) AS xg, play_pattern
+            FROM events WHERE player_id = :player_id AND type = 'Shot'
+            ORDER BY match_id, event_index
+        """
+    },
+    "events_in_zone": {
+        "description": "Eventos de um tipo dentro de um retângulo do campo (coordenadas StatsBomb 120x80)",
+        "params": {
+            "type": (str, ...), "team": (str, None),
+            "x_min": (float, 0.0), "x_max": (float, 120.0), "y_min": (float, 0.0), "y_max": (float, 80.0)
+        },
+        "sql": """
+            SELECT match_id, team, player, minute, second, x, y, end_x, end_y, outcome
+            FROM events
+            WHERE type = :type AND (:team IS NULL OR team = :team)
+              AND x BETWEEN :x_min AND :x_max AND y BETWEEN :y_min AND :y_max
+            ORDER BY match_id, event_index
+        """
+    }
+}
+
+
+class QueryTimeout(Exception):
+    """Consulta interrompida por exceder o tempo máximo."""
+
+
+def _rows(frame: pd.DataFrame) -> List[tuple]:
+    # NaN/NA -> None e tipos NumPy -> tipos Python, como o sqlite3 espera
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def _integers(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series, errors="coerce").astype("Int64")
+
+
+class AnalyticsStore:
+    """
+    Base analítica embarcada (SQLite) com eventos, lineups e partidas de todas as
+    partidas já carregadas, para consultas entre partidas executadas no próprio
+    banco em vez de laços em Python sobre DataFrames por partida.
+
+    É alimentada junto com o cache (a cada download de eventos, lineups ou lista
+    de partidas) e consultada apenas por templates da lista QUERY_TEMPLATES.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        # Conexão de escrita aberta no primeiro uso, para que importar o módulo não crie arquivos
+        if self._connection is None:
+            self.path = self.path or os.getenv("ANALYTICS_DB_PATH") or data_path("analytics.sqlite3")
+            self._connection = connect(self.path)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def add_matches(self, matches: List[Dict[str, Any]], competition_id: Optional[int] = None,
+                    season_id: Optional[int] = None) -> int:
+        """
+        Insere ou atualiza as partidas de uma lista de `sb.matches`.
+        """
+        frame = pd.DataFrame(matches)
+        if frame.empty or "match_id" not in frame.columns:
+            return 0
+        # A lista da StatsBomb traz só os nomes; os IDs vêm da própria consulta
+        competition_ids = pd.to_numeric(column(frame, "competition_id"), errors="coerce")
+        season_ids = pd.to_numeric(column(frame, "season_id"), errors="coerce")
+        if competition_id is not None:
+            competition_ids = competition_ids.fillna(competition_id)
+        if season_id is not None:
+            season_ids = season_ids.fillna(season_id)
+        rows = pd.DataFrame({
+            "match_id": _integers(frame["match_id"]),
+            "competition_id": _integers(competition_ids),
+            "season_id": _integers(season_ids),
+            "match_date": column(frame, "match_date").astype(str).where(column(frame, "match_date").notna()),
+            "competition_stage": column(frame, "competition_stage"),
+            "stadium": column(frame, "stadium"),
+            "home_team": column(frame, "home_team"),
+            "away_team": column(frame, "away_team"),
+            "home_score": _integers(column(frame, "home_score")),
+            "away_score": _integers(column(frame, "away_score"))
+        }).dropna(subset=["match_id"])
+        with self._lock:
+            connection = self._db()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", _rows(rows)
+                )
+        return len(rows)
+
+    def has_events(self, match_id: int) -> bool:
+        """
+        Indica se os eventos da partida já estão na base.
+        """
+        with self._lock:
+            row = self._db().execute("SELECT 1 FROM events WHERE match_id = ? LIMIT 1", (int(match_id),)).fetchone()
+        return row is not None
+
+    def add_events(self, match_id: int, events: pd.DataFrame) -> int:
+        """
+        Substitui os eventos armazenados de uma partida.
+        """
+        if events is None or events.empty:
+            return 0
+        x, y = location_xy(events)
+        # Destino do passe, da condução ou do chute (o primeiro presente)
+        end_x, end_y = location_xy(events, END_LOCATION_COLUMNS[0])
+        for name in END_LOCATION_COLUMNS[1:]:
+            other_x, other_y = location_xy(events, name)
+            missing = np.isnan(end_x)
+            end_x, end_y = np.where(missing, other_x, end_x), np.where(missing, other_y, end_y)
+        outcome = column(events, OUTCOME_COLUMNS[0])
+        for name in OUTCOME_COLUMNS[1:]:
+            outcome = outcome.combine_first(column(events, name))
+        under_pressure = column(events, "under_pressure")
+
+        rows = pd.DataFrame({
+            "match_id": int(match_id),
+            "event_index": _integers(events["index"]),
+            "event_id": events["id"].astype(str),
+            "period": _integers(events["period"]),
+            "minute": _integers(events["minute"]),
+            "second": _integers(events["second"]),
+            "type": column(events, "type"),
+            "team": column(events, "team"),
+            "player_id": _integers(column(events, "player_id")),
+            "player": column(events, "player"),
+            "position": column(events, "position"),
+            "possession": _integers(column(events, "possession")),
+            "possession_team": column(events, "possession_team"),
+            "play_pattern": column(events, "play_pattern"),
+            "x": x,
+            "y": y,
+            "end_x": end_x,
+            "end_y": end_y,
+            "duration": pd.to_numeric(column(events, "duration"), errors="coerce"),
+            "outcome": outcome,
+            "xg": pd.to_numeric(column(events, "shot_statsbomb_xg"), errors="coerce"),
+            "under_pressure": np.where(under_pressure.eq(True), 1, 0)
+        }, columns=EVENT_COLUMNS)
+
+        with self._lock:
+            connection = self._db()
+            with connection:
+                connection.execute("DELETE FROM events WHERE match_id = ?", (int(match_id),))
+                connection.executemany(
+                    f"INSERT INTO events VALUES ({', '.join('?' * len(EVENT_COLUMNS))})", _rows(rows)
+                )
+        return len(rows)
+
+    def add_lineups(self, match_id: int, lineups: Dict[str, pd.DataFrame]) -> int:
+        """
+        Substitui os lineups armazenados de uma partida.
+        """
+        frames = []
+        for team, players in lineups.items():
+            if players is None or players.empty:
+                continue
+            frames.append(pd.DataFrame({
+                "match_id": int(match_id),
+                "player_id": _integers(players["player_id"]),
+                "team": team,
+                "player_name": column(players, "player_name"),
+                "player_nickname": column(players, "player_nickname"),
+                "jersey_number": _integers(column(players, "jersey_number")),
+                "country": column(players, "country")
+            }))
+        rows = _rows(pd.concat(frames, ignore_index=True)) if frames else []
+        with self._lock:
+            connection = self._db()
+            with connection:
+                connection.execute("DELETE FROM lineups WHERE match_id = ?", (int(match_id),))
+                connection.executemany("INSERT OR REPLACE INTO lineups VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def query(self, template: str, params: Optional[Dict[str, Any]] = None,
+              limit: int = DEFAULT_ROW_LIMIT, timeout: float = QUERY_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        """
+        Executa uma consulta da lista de templates, somente leitura.
+
+        Args:
+            template: Nome do template em QUERY_TEMPLATES
+            params: Valores dos parâmetros do template
+            limit: Máximo de linhas devolvidas (até MAX_ROW_LIMIT)
+            timeout: Tempo máximo de execução, em segundos
+
+        Returns:
+            Dicionário com as colunas, as linhas e se o resultado foi truncado
+
+        Raises:
+            KeyError: Se o template não existir
+            ValueError: Se os parâmetros forem inválidos
+            QueryTimeout: Se a consulta exceder o tempo máximo
+        """
+        spec = QUERY_TEMPLATES[template]
+        params = dict(params or {})
+        unknown = set(params) - set(spec["params"])
+        if unknown:
+            raise ValueError(f"Parâmetros desconhecidos: {', '.join(sorted(unknown))}")
+        values = {}
+        for name, (kind, default) in spec["params"].items():
+            value = params.get(name, default)
+            if value is ...:
+                raise ValueError(f"Parâmetro obrigatório ausente: {name}")
+            try:
+                values[name] = None if value is None else kind(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Parâmetro {name} deve ser do tipo {kind.__name__}")
+        limit = max(1, min(int(limit), MAX_ROW_LIMIT))
+
+        # Conexão própria e somente leitura por consulta: leituras em paralelo (WAL) e
+        # interrupção individual pelo progress handler
+        with self._lock:
+            self._db()
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        deadline = time.monotonic() + timeout
+        connection.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+        try:
+            cursor = connection.execute(f"SELECT * FROM ({spec['sql']}) LIMIT {limit + 1}", values)
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+        except sqlite3.OperationalError as e:
+            if "interrupted" in str(e):
+                raise QueryTimeout(f"Consulta excedeu {timeout:g} s")
+            raise
+        finally:
+            connection.close()
+
+        return {
+            "template": template,
+            "params": values,
+            "columns": columns,
+            "rows": [dict(zip(columns, row)) for row in rows[:limit]],
+            "truncated": len(rows) > limit
+        }
+
+
+# Instância compartilhada (alimentada pelos carregamentos de eventos, lineups e partidas)
+analytics_store = AnalyticsStore()
@@ -0,0 +1,220 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+import logging
+import os
+import threading
+import time
+from api.utils.shared_cache import SharedCache
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Hashable]
+
+# Segundo nível compartilhado entre os workers do host (SHARED_CACHE_ENABLED=0 desativa)
+SHARED_CACHE_ENABLED = os.getenv("SHARED_CACHE_ENABLED", "1") not in ("0", "false", "False")
+# Intervalo mínimo entre consultas ao log de invalidações dos outros processos
+SHARED_SYNC_SECONDS = 1.0
+# Orçamento da memória do processo, pelo tamanho serializado das entradas que passam pelo cache compartilhado
+MATCH_CACHE_MAX_BYTES = int(os.getenv("MATCH_CACHE_MAX_BYTES", str(256 * 1024 ** 2)))
+
+
+class MatchCache:
+    """
+    Cache LRU em memória para dados de partidas (eventos, lineups e resultados derivados).
+
+    As entradas são identificadas por (namespace, chave) e podem ser associadas a
+    uma partida, permitindo invalidar tudo o que depende dela de uma só vez.
+    Chamadas concorrentes para a mesma chave aguardam um único cálculo.
+
+    Com um cache compartilhado (`shared`), um valor ausente na memória é buscado
+    nele antes de ser calculado, e todo valor calculado é gravado nele: o que um
+    worker calcula (ou aquece) serve a todos. Invalidações feitas por outro
+    processo são aplicadas à memória local em até SHARED_SYNC_SECONDS e repassadas
+    aos ouvintes registrados (`add_invalidation_listener`).
+
+    A memória local é limitada em entradas e em bytes (`max_bytes`), medidos pelo
+    tamanho serializado que o cache compartilhado já calcula. Um valor maior que
+    o orçamento inteiro não fica na memória: é lido do cache compartilhado quando pedido.
+    Valores fora do cache compartilhado contam só no limite de entradas.
+    """
+
+    def __init__(self, max_entries: int = 512, shared: Optional[SharedCache] = None,
+                 max_bytes: int = MATCH_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._sizes: Dict[CacheKey, int] = {}
+        self._bytes = 0
+        self._by_match: Dict[int, Set[CacheKey]] = {}
+        self._in_flight: Dict[CacheKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._synced_at = 0.0
+        self._last_invalidation: Optional[int] = None
+        self._own_invalidations: Set[int] = set()
+        self._listeners: List[Callable[[int], Any]] = []
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor armazenado ou None se a chave não estiver no cache.
+        """
+        self.sync_invalidations()
+        with self._lock:
+            full_key = (namespace, key)
+            if full_key not in self._entries:
+                return None
+            self._entries.move_to_end(full_key)
+            return self._entries[full_key]
+
+    def set(self, namespace: str, key: Hashable, value: Any, match_id: Optional[int] = None,
+            size: int = 0) -> None:
+        """
+        Armazena um valor, opcionalmente associado a uma partida.
+
+        `size` é o tamanho estimado do valor em bytes; valores maiores que `max_bytes` não são guardados.
+        """
+        with self._lock:
+            full_key = (namespace, key)
+            if size > self.max_bytes:
+                self._remove(full_key)
+                return
+            self._entries[full_key] = value
+            self._entries.move_to_end(full_key)
+            self._bytes += size - self._sizes.get(full_key, 0)
+            self._sizes[full_key] = size
+            if match_id is not None:
+                self._by_match.setdefault(int(match_id), set()).add(full_key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted, 0)
+                self._forget(evicted)
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        key: Hashable,
+        compute: Callable[[], Any],
+        match_id: Optional[int] = None,
+        on_load: Optional[Callable[[Any], None]] = None,
+        share: bool = True
+    ) -> Any:
+        """
+        Retorna o valor em cache ou o calcula uma única vez, mesmo com chamadas concorrentes.
+
+        Resultados None não são armazenados. `on_load` é chamado quando o valor entra
+        na memória deste processo, calculado ou lido do cache compartilhado (ex.: para
+        manter índices locais que o cálculo alimentaria). Só valores associados a uma
+        partida (invalidáveis) vão para o cache compartilhado; com `share=False` o valor
+        fica só na memória do processo (dados derivados do estado do processo ou que já
+        têm armazenamento compartilhado próprio).
+        """
+        self.sync_invalidations()
+        full_key = (namespace, key)
+        while True:
+            with self._lock:
+                if full_key in self._entries:
+                    self._entries.move_to_end(full_key)
+                    return self._entries[full_key]
+                waiter = self._in_flight.get(full_key)
+                if waiter is None:
+                    self._in_flight[full_key] = threading.Event()
+                    break
+            waiter.wait()
+
+        try:
+            shared = self.shared if share and match_id is not None else None
+            entry = shared.get_entry(namespace, key) if shared is not None else None
+            if entry is not None:
+                value, size = entry
+            else:
+                value, size = compute(), 0
+                if value is not None and shared is not None:
+                    size = shared.set(namespace, key, value, match_id=match_id) or 0
+            if value is not None:
+                if on_load is not None:
+                    try:
+                        on_load(value)
+                    except Exception as e:
+                        logger.error(f"Erro ao carregar {namespace} no processo: {str(e)}")
+                self.set(namespace, key, value, match_id=match_id, size=size)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(full_key).set()
+
+    def invalidate_match(self, match_id: int) -> int:
+        """
+        Remove todas as entradas associadas a uma partida, também do cache
+        compartilhado (e, por consequência, dos outros workers). Retorna quantas
+        entradas locais foram removidas.
+        """
+        if self.shared is not None:
+            try:
+                self._own_invalidations.add(self.shared.invalidate_match(match_id))
+            except Exception as e:
+                logger.error(f"Erro ao invalidar a partida {match_id} no cache compartilhado: {str(e)}")
+        return self._drop_match(match_id)
+
+    def _drop_match(self, match_id: int) -> int:
+        with self._lock:
+            keys = self._by_match.pop(int(match_id), set())
+            for full_key in keys:
+                self._entries.pop(full_key, None)
+                self._bytes -= self._sizes.pop(full_key, 0)
+            return len(keys)
+
+    def add_invalidation_listener(self, listener: Callable[[int], Any]) -> None:
+        """
+        Registra uma função chamada com o ID de cada partida invalidada por outro
+        processo, para o estado do processo mantido fora deste cache (ex.: tabelas de temporada).
+        """
+        self._listeners.append(listener)
+
+    def sync_invalidations(self) -> None:
+        """
+        Aplica as invalidações registradas por outros processos desde a última consulta
+        (no máximo uma consulta ao log a cada SHARED_SYNC_SECONDS).
+        """
+        if self.shared is None or time.monotonic() - self._synced_at < SHARED_SYNC_SECONDS:
+            return
+        self._synced_at = time.monotonic()
+        try:
+            self._last_invalidation, rows = self.shared.invalidations_since(self._last_invalidation)
+        except Exception as e:
+            logger.error(f"Erro ao ler as invalidações do cache compartilhado: {str(e)}")
+            return
+        for invalidation_id, match_id in rows:
+            if invalidation_id in self._own_invalidations:
+                self._own_invalidations.discard(invalidation_id)
+                continue
+            self._drop_match(match_id)
+            for listener in self._listeners:
+                try:
+                    listener(match_id)
+                except Exception as e:
+                    logger.error(f"Erro ao propagar a invalidação da partida {match_id}: {str(e)}")
+
+    def clear(self) -> None:
+        """
+        Esvazia o cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self._by_match.clear()
+
+    def _remove(self, full_key: CacheKey) -> None:
+        if self._entries.pop(full_key, None) is not None:
+            self._bytes -= self._sizes.pop(full_key, 0)
+            self._forget(full_key)
+
+    def _forget(self, full_key: CacheKey) -> None:
+        for keys in self._by_match.values():
+            keys.discard(full_key)
+
+
+# Instância compartilhada pelos serviços da API
+match_cache = MatchCache(shared=SharedCache() if SHARED_CACHE_ENABLED else None)
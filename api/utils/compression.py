@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import gzip
+import logging
+import re
+import threading
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard é opcional
+    zstandard = None
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+# Níveis por rota (primeiro padrão que casar). Os dados brutos da partida são grandes
+# e imutáveis por versão: vale comprimir mais, pois o resultado fica em cache.
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+ROUTE_LEVELS: List[Tuple[str, Dict[str, int]]] = [
+    (r"^/api/v1/matches/\d+$", {"zstd": 15, "br": 8, "gzip": 9}),
+]
+
+
+def _compressors() -> Dict[str, Callable[[bytes, int], bytes]]:
+    """
+    Codificações disponíveis, na ordem de preferência do servidor.
+    """
+    available: Dict[str, Callable[[bytes, int], bytes]] = {}
+    if zstandard is not None:
+        available["zstd"] = lambda body, level: zstandard.ZstdCompressor(level=level).compress(body)
+    if brotli is not None:
+        available["br"] = lambda body, level: brotli.compress(body, quality=level)
+    available["gzip"] = lambda body, level: gzip.compress(body, compresslevel=level, mtime=0)
+    return available
+
+
+def negotiate(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Escolhe a codificação pelo Accept-Encoding (respeitando q=0), preferindo a ordem do servidor.
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*")
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality:
+            return encoding
+    return None
+
+
+class CompressedBodyCache:
+    """
+    Cache LRU de corpos já comprimidos, limitado pelo total de bytes.
+
+    Só guarda respostas com ETag: o mesmo ETag sempre corresponde ao mesmo corpo.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: Tuple[str, str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compressão negociada (zstd, brotli ou gzip).
+
+    Comprime respostas de tipos textuais acima de `minimum_size` bytes, com nível
+    por rota, e reaproveita corpos comprimidos de respostas com ETag. Respostas
+    em streaming (ex.: Server-Sent Events) passam sem compressão.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        route_levels: Optional[List[Tuple[str, Dict[str, int]]]] = None,
+        cache: Optional[CompressedBodyCache] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.route_levels = [(re.compile(p), levels) for p, levels in (route_levels or ROUTE_LEVELS)]
+        self.cache = cache or CompressedBodyCache()
+        self.compressors = _compressors()
+
+    def _level(self, path: str, encoding: str) -> int:
+        for pattern, levels in self.route_levels:
+            if pattern.search(path):
+                return levels.get(encoding, DEFAULT_LEVELS[encoding])
+        return DEFAULT_LEVELS[encoding]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), list(self.compressors))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            skip = (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if skip:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            etag = headers.get("etag")
+            key = (etag, encoding, scope["path"]) if etag else None
+            compressed = self.cache.get(key) if key else None
+            if compressed is None:
+                # Fora do event loop: payloads de vários MB levam centenas de ms para comprimir
+                compressed = await run_in_threadpool(
+                    self.compressors[encoding], body, self._level(scope["path"], encoding)
+                )
+                if key:
+                    self.cache.set(key, compressed)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            if etag and not etag.startswith("W/"):
+                # A representação comprimida não é idêntica byte a byte: o ETag passa a ser fraco
+                headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
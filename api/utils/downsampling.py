@@ -0,0 +1,44 @@
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Seleciona até `threshold` pontos de uma série com o algoritmo
+    Largest-Triangle-Three-Buckets, preservando a forma visual do gráfico.
+
+    Args:
+        x: Valores do eixo x (crescentes)
+        y: Valores do eixo y
+        threshold: Número máximo de pontos na saída
+
+    Returns:
+        Índices dos pontos selecionados, em ordem crescente
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Os pontos internos são divididos em threshold - 2 baldes
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+
+        candidates_x = x[start:end]
+        candidates_y = y[start:end]
+        areas = np.abs(
+            (x[previous] - avg_x) * (candidates_y - y[previous])
+            - (x[previous] - candidates_x) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
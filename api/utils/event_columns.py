@@ -0,0 +1,202 @@
+from typing import Any, Dict, Optional
+import json
+import logging
+import mmap
+import os
+import pickle
+import shutil
+import threading
+import time
+import numpy as np
+import pandas as pd
+from api.utils.event_frame import POINT_AXES
+from api.utils.storage import data_path
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Armazenamento em colunas mapeadas em memória (EVENT_COLUMNS_ENABLED=0 desativa)
+EVENT_COLUMNS_ENABLED = os.getenv("EVENT_COLUMNS_ENABLED", "1") not in ("0", "false", "False")
+# Incrementado quando o formato dos arquivos muda; diretórios de outra versão são ignorados
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+
+def _is_categorical(values: np.ndarray) -> bool:
+    # Coluna de texto ou de flags: strings/booleanos e, nos eventos sem o atributo, NaN
+    return all(isinstance(v, (str, bool)) or (isinstance(v, float) and v != v) for v in values)
+
+
+def _point_axes(values: np.ndarray) -> int:
+    """
+    Número de eixos (2 ou 3) de uma coluna de coordenadas ([x, y] ou [x, y, z]), ou 0 se não for uma.
+    """
+    axes = 0
+    for value in values:
+        if isinstance(value, float) and value != value:
+            continue
+        if not isinstance(value, (list, tuple)) or not 2 <= len(value) <= 3 or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in value
+        ):
+            return 0
+        axes = max(axes, len(value))
+    return axes
+
+
+class EventColumnStore:
+    """
+    Eventos das partidas persistidos coluna a coluna em disco, para leitura sem cópia.
+
+    Cada partida vira um diretório com as colunas lado a lado em um único arquivo
+    binário, mapeado com mmap: todos os processos (workers do uvicorn, threads
+    de aquecimento) mapeiam as mesmas páginas, somente leitura, e o DataFrame é
+    montado sobre elas (`np.frombuffer`) sem copiar. Colunas de texto e flags viram
+    categóricas (códigos mapeados mais o dicionário de valores distintos) e
+    coordenadas viram colunas float planas (`location_x`, `location_y`, ...,
+    lidas com `location_xy`). Só os campos realmente aninhados (freeze frames,
+    táticas, eventos relacionados) ficam em um arquivo pickle à parte, carregado por processo.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+
+    def _match_dir(self, match_id: int) -> str:
+        self.directory = self.directory or os.getenv("EVENT_COLUMNS_DIR") or data_path("events")
+        return os.path.join(self.directory, str(int(match_id)))
+
+    @staticmethod
+    def _format(directory: str) -> Optional[int]:
+        try:
+            with open(os.path.join(directory, "meta.json"), encoding="utf-8") as file:
+                return json.load(file).get("format")
+        except (OSError, ValueError):
+            return None
+
+    def save(self, match_id: int, events: pd.DataFrame) -> bool:
+        """
+        Grava os eventos de uma partida; retorna False se não for possível.
+
+        A gravação é feita em um diretório temporário renomeado ao final, então
+        leitores nunca veem uma partida pela metade.
+        """
+        if not isinstance(events.index, pd.RangeIndex) or events.index.start != 0 or events.index.step != 1:
+            return False
+        final = self._match_dir(match_id)
+        if os.path.isdir(final):
+            if self._format(final) == FORMAT_VERSION:
+                return True
+            # Gravada em um formato anterior: regrava
+            self.remove(match_id)
+        temporary = f"{final}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            os.makedirs(temporary, exist_ok=True)
+            columns = []
+            objects: Dict[str, Any] = {}
+            offset = 0
+            with open(os.path.join(temporary, "columns.bin"), "wb") as data:
+                def write(array: np.ndarray, column: Dict[str, Any]) -> None:
+                    # Colunas alinhadas em 64 bytes dentro de um único arquivo mapeado
+                    nonlocal offset
+                    padding = -offset % ALIGNMENT
+                    data.write(b"\0" * padding)
+                    offset += padding
+                    array = np.ascontiguousarray(array)
+                    data.write(array.tobytes())
+                    columns.append({**column, "dtype": array.dtype.str, "offset": offset})
+                    offset += array.nbytes
+
+                for name in events.columns:
+                    series = events[name]
+                    if series.dtype.kind in "biufcmM" and not pd.api.types.is_extension_array_dtype(series.dtype):
+                        write(series.to_numpy(), {"name": name, "kind": "array"})
+                        continue
+                    values = series.to_numpy() if series.dtype == object else None
+                    axes = _point_axes(values) if values is not None else 0
+                    if values is not None and _is_categorical(values):
+                        # Códigos no tipo que o pandas escolheria, para a categórica não copiar na leitura
+                        categorical = pd.Categorical(values)
+                        write(categorical.codes, {"name": name, "kind": "text", "values": categorical.categories.tolist()})
+                    elif axes:
+                        coords = np.full((len(values), axes), np.nan)
+                        for position, point in enumerate(values):
+                            if isinstance(point, (list, tuple)):
+                                coords[position, :len(point)] = point
+                        for axis in range(axes):
+                            write(coords[:, axis], {"name": f"{name}_{POINT_AXES[axis]}", "kind": "array"})
+                    else:
+                        objects[name] = values if values is not None else series.array
+                        columns.append({"name": name, "kind": "object"})
+
+            with open(os.path.join(temporary, "objects.pkl"), "wb") as file:
+                pickle.dump(objects, file, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(temporary, "meta.json"), "w", encoding="utf-8") as file:
+                json.dump({"format": FORMAT_VERSION, "rows": len(events), "columns": columns}, file)
+            try:
+                os.rename(temporary, final)
+            except OSError:
+                # Outro processo gravou a mesma partida primeiro
+                shutil.rmtree(temporary, ignore_errors=True)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao gravar as colunas de eventos da partida {match_id}: {str(e)}")
+            shutil.rmtree(temporary, ignore_errors=True)
+            return False
+
+    def load(self, match_id: int) -> Optional[pd.DataFrame]:
+        """
+        Monta o DataFrame de eventos sobre o arquivo mapeado, ou None se a partida não estiver gravada.
+
+        As colunas numéricas, categóricas e de coordenadas são somente leitura; o DataFrame
+        não deve ser modificado.
+        """
+        directory = self._match_dir(match_id)
+        if not os.path.isdir(directory):
+            return None
+        try:
+            with open(os.path.join(directory, "meta.json"), encoding="utf-8") as file:
+                meta = json.load(file)
+            if meta.get("format") != FORMAT_VERSION:
+                return None
+            with open(os.path.join(directory, "objects.pkl"), "rb") as file:
+                objects = pickle.load(file)
+            with open(os.path.join(directory, "columns.bin"), "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                # Os arrays mantêm o mapeamento vivo; o arquivo pode ser fechado
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+            rows = meta["rows"]
+            data: Dict[str, Any] = {}
+            for column in meta["columns"]:
+                name = column["name"]
+                if column["kind"] == "object":
+                    data[name] = objects[name]
+                    continue
+                mapped = np.frombuffer(buffer, dtype=np.dtype(column["dtype"]), count=rows, offset=column["offset"])
+                if column["kind"] == "array":
+                    data[name] = mapped
+                else:
+                    # Código -1: ausente (NaN)
+                    data[name] = pd.Categorical.from_codes(mapped, categories=pd.Index(column["values"], dtype=object))
+            return pd.DataFrame(data, index=pd.RangeIndex(rows), copy=False)
+        except Exception as e:
+            logger.error(f"Erro ao ler as colunas de eventos da partida {match_id}: {str(e)}")
+            return None
+
+    def remove(self, match_id: int) -> None:
+        """
+        Apaga os eventos gravados de uma partida (processos que já os mapearam continuam lendo a cópia antiga).
+        """
+        directory = self._match_dir(match_id)
+        if not os.path.isdir(directory):
+            return
+        retired = f"{directory}.old-{os.getpid()}-{time.time_ns()}"
+        try:
+            os.rename(directory, retired)
+            shutil.rmtree(retired, ignore_errors=True)
+        except OSError as e:
+            logger.error(f"Erro ao apagar as colunas de eventos da partida {match_id}: {str(e)}")
+
+
+# Instância compartilhada pelo processo (None quando desativada)
+event_columns: Optional[EventColumnStore] = EventColumnStore() if EVENT_COLUMNS_ENABLED else None
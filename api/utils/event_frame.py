@@ -0,0 +1,161 @@
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Relógio da StatsBomb no início de cada período (o `from`/`to` das posições segue o mesmo relógio)
+PERIOD_START_SECONDS = {1: 0, 2: 45 * 60, 3: 90 * 60, 4: 105 * 60}
+# Período da disputa de pênaltis (sem relógio próprio)
+PENALTY_SHOOTOUT_PERIOD = 5
+# Eixos das colunas planas de coordenadas (ex.: location_x, shot_end_location_z)
+POINT_AXES = ("x", "y", "z")
+# Maior que qualquer relógio de uma partida (segundos): separa os períodos na chave de ordenação
+PERIOD_SPAN_SECONDS = 100_000
+
+
+def column(events: pd.DataFrame, name: str) -> pd.Series:
+    """
+    Retorna uma coluna do DataFrame de eventos ou uma série vazia (NaN) se ela não existir.
+
+    O statsbombpy só cria colunas de atributos (ex.: `bad_behaviour_card`) quando
+    ao menos um evento daquele tipo aparece na partida.
+    """
+    if name in events.columns:
+        return events[name]
+    return pd.Series(np.nan, index=events.index, dtype=object)
+
+
+def sort_events(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ordena os eventos cronologicamente.
+
+    O statsbombpy concatena os eventos agrupados por tipo, então o DataFrame
+    original não segue a ordem da partida.
+    """
+    if "index" in events.columns:
+        return events.sort_values("index", kind="stable").reset_index(drop=True)
+    return events.sort_values(["period", "minute", "second"], kind="stable").reset_index(drop=True)
+
+
+def location_xy(events: pd.DataFrame, name: str = 'location') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Coordenadas x e y de uma coluna de pontos StatsBomb ([x, y] ou [x, y, z]) como dois arrays float.
+
+    Aceita tanto a coluna de listas do statsbombpy quanto as colunas planas
+    (`<name>_x`, `<name>_y`) gravadas pelo armazenamento em colunas, que são
+    devolvidas sem cópia. Eventos sem coordenada ficam como NaN.
+    """
+    if f"{name}_x" in events.columns:
+        return events[f"{name}_x"].to_numpy(dtype=float), events[f"{name}_y"].to_numpy(dtype=float)
+
+    locations = column(events, name)
+    x = np.full(len(locations), np.nan)
+    y = np.full(len(locations), np.nan)
+    valid = np.fromiter(
+        (isinstance(v, (list, tuple, np.ndarray)) and len(v) >= 2 for v in locations),
+        dtype=bool,
+        count=len(locations)
+    )
+    if valid.any():
+        coords = np.array([v[:2] for v in locations[valid]], dtype=float)
+        x[valid] = coords[:, 0]
+        y[valid] = coords[:, 1]
+    return x, y
+
+
+def location_points(events: pd.DataFrame, name: str) -> pd.Series:
+    """
+    Coluna de pontos como listas ([x, y] ou [x, y, z]; NaN sem coordenada).
+
+    Quando os eventos vêm do armazenamento em colunas, as listas são montadas a
+    partir das colunas planas; use só para serializar, os cálculos devem usar `location_xy`.
+    """
+    if f"{name}_x" not in events.columns:
+        return column(events, name)
+    axes = np.column_stack([
+        events[f"{name}_{axis}"].to_numpy(dtype=float)
+        for axis in POINT_AXES if f"{name}_{axis}" in events.columns
+    ])
+    points = np.full(len(events), np.nan, dtype=object)
+    for position in np.flatnonzero(~np.isnan(axes[:, 0])):
+        point = axes[position]
+        points[position] = point[~np.isnan(point)].tolist()
+    return pd.Series(points, index=events.index)
+
+
+def nested_locations(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Eventos com as coordenadas no formato do statsbombpy (uma coluna de listas por ponto).
+
+    Devolve o próprio DataFrame se ele não tiver colunas planas de coordenadas.
+    """
+    names = [
+        name[:-2] for name in events.columns
+        if name.endswith("_x") and f"{name[:-2]}_y" in events.columns and name[:-2] not in events.columns
+    ]
+    if not names:
+        return events
+    flat = {f"{name}_{axis}": name for name in names for axis in POINT_AXES}
+    data: Dict[str, Any] = {}
+    for name in events.columns:
+        if name not in flat:
+            data[name] = events[name]
+        elif flat[name] not in data:
+            data[flat[name]] = location_points(events, flat[name])
+    return pd.DataFrame(data, index=events.index)
+
+
+def game_seconds(events: pd.DataFrame) -> np.ndarray:
+    """
+    Relógio da partida de cada evento, em segundos (`minute`/`second` da StatsBomb).
+
+    O relógio não é contínuo entre períodos: os acréscimos do 1º tempo têm
+    minuto >= 45 e o 2º tempo recomeça em 45:00. Para ordenar ou fatiar eventos
+    de períodos diferentes, use `timeline_position`; para medir tempo jogado,
+    `elapsed_seconds`.
+    """
+    return events['minute'].to_numpy(dtype=float) * 60 + events['second'].to_numpy(dtype=float)
+
+
+def timeline_position(events: pd.DataFrame) -> np.ndarray:
+    """
+    Chave de ordenação cronológica equivalente à tupla (período, relógio).
+
+    Ao contrário do tempo decorrido, distingue o último evento dos acréscimos
+    de um período do primeiro instante do período seguinte.
+    """
+    return events['period'].to_numpy(dtype=float) * PERIOD_SPAN_SECONDS + game_seconds(events)
+
+
+def period_offsets(events: pd.DataFrame) -> Dict[int, float]:
+    """
+    Segundos de jogo já disputados no início de cada período, incluindo acréscimos.
+
+    A disputa de pênaltis começa depois de todo o tempo jogado.
+    """
+    seconds = pd.Series(game_seconds(events), index=events.index)
+    period_end = seconds.groupby(events['period']).max()
+
+    offsets: Dict[int, float] = {}
+    elapsed = 0.0
+    for period, start in PERIOD_START_SECONDS.items():
+        offsets[period] = elapsed
+        if period in period_end.index:
+            elapsed += max(float(period_end[period]) - start, 0.0)
+    offsets[PENALTY_SHOOTOUT_PERIOD] = elapsed
+    return offsets
+
+
+def elapsed_seconds(events: pd.DataFrame, offsets: Optional[Dict[int, float]] = None) -> np.ndarray:
+    """
+    Tempo de jogo decorrido de cada evento, em segundos, contínuo entre os períodos.
+
+    Args:
+        events: Eventos a converter
+        offsets: Início de cada período (`period_offsets` da partida inteira); calculado a partir de `events` se omitido
+    """
+    offsets = period_offsets(events) if offsets is None else offsets
+    periods = pd.Series(events['period'].to_numpy())
+    start = periods.map(PERIOD_START_SECONDS).to_numpy(dtype=float)
+    base = periods.map(offsets).to_numpy(dtype=float)
+    # Disputa de pênaltis: todos os eventos no fim do tempo jogado
+    return np.where(np.isnan(start), base, base + np.maximum(game_seconds(events) - start, 0.0))
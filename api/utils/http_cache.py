@@ -0,0 +1,88 @@
+from typing import Optional
+import hashlib
+import logging
+from fastapi import HTTPException, Request, Response
+from api.utils.cache import match_cache
+from api.utils.match_index import match_index
+from api.utils.statsbomb_handler import StatsBombHandler
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Partidas encerradas só mudam com nova versão dos dados; a validação por ETag cobre esse caso
+MATCH_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+# Respostas com texto do LLM não dependem só da versão dos dados (e podem trazer uma falha)
+ANALYSIS_CACHE_CONTROL = "no-store"
+
+
+def match_version(match_id: int) -> Optional[str]:
+    """
+    Versão dos dados de uma partida.
+
+    Usa `data_version`/`last_updated` do índice de partidas e, se a partida
+    ainda não foi indexada, uma impressão digital dos IDs dos eventos (calculada
+    uma vez e mantida em cache junto com a partida).
+
+    Returns:
+        String de versão, ou None se a partida não puder ser carregada
+    """
+    metadata = match_index.get(match_id)
+    if metadata and (metadata.get("data_version") or metadata.get("last_updated")):
+        return f"{metadata.get('data_version')}:{metadata.get('last_updated')}"
+
+    def fingerprint() -> str:
+        events = StatsBombHandler.load_events(match_id)
+        digest = hashlib.sha1()
+        for event_id in events['id'].astype(str):
+            digest.update(event_id.encode())
+        return f"events:{len(events)}:{digest.hexdigest()}"
+
+    try:
+        return match_cache.get_or_compute("fingerprint", match_id, fingerprint, match_id=match_id)
+    except Exception as e:
+        logger.error(f"Erro ao calcular a versão da partida {match_id}: {str(e)}")
+        return None
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """
+    Compara o cabeçalho If-None-Match com o ETag (comparação fraca, como pede a RFC 9110).
+    """
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def match_etag(match_id: int, request: Request, response: Response) -> None:
+    """
+    Dependência das rotas de partida: define ETag forte e Cache-Control e responde
+    304 quando o cliente já tem a versão atual (If-None-Match).
+
+    O ETag combina a versão dos dados da partida com o caminho e os parâmetros da requisição.
+    """
+    version = match_version(match_id)
+    if version is None:
+        return
+
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{version}|{request.url.path}|{query}".encode()).hexdigest()[:32]
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": MATCH_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def player_profile_etag(match_id: int, request: Request, response: Response, include_analysis: bool = False) -> None:
+    """
+    `match_etag` do perfil do jogador: com `include_analysis` a resposta traz a
+    análise do LLM, então fica sem ETag e sem cache público.
+    """
+    if include_analysis:
+        response.headers["Cache-Control"] = ANALYSIS_CACHE_CONTROL
+        return
+    match_etag(match_id, request, response)
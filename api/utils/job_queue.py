@@ -0,0 +1,291 @@
+from typing import Callable, Dict, List, Any, Optional, Set
+from datetime import datetime
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from api.utils.storage import connect, data_path
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Concorrência e vazão dos workers, independentes dos workers HTTP (uvicorn)
+JOB_WORKERS = int(os.getenv("API_JOB_WORKERS", "2"))
+JOB_RATE_PER_MINUTE = float(os.getenv("API_JOB_RATE_PER_MINUTE", "0"))  # 0 = sem limite
+# Cada processo renova o heartbeat das suas tarefas; sem renovação por JOB_STALE_SECONDS a tarefa volta à fila
+JOB_HEARTBEAT_SECONDS = float(os.getenv("API_JOB_HEARTBEAT_SECONDS", "10"))
+JOB_STALE_SECONDS = float(os.getenv("API_JOB_STALE_SECONDS", "60"))
+
+TERMINAL_STATUSES = ("done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+COLUMNS = ["job_id", "kind", "params", "status", "result", "error", "created_at", "started_at", "finished_at"]
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    # Dono no mesmo host: verifica se o processo ainda existe; em outro host, vale só o heartbeat
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    Fila de tarefas demoradas (ex.: análises com LLM) executadas por um pool de
+    threads no próprio processo, com o estado persistido em SQLite.
+
+    Cada tipo de tarefa tem um handler registrado, que recebe os parâmetros e
+    devolve o resultado (None conta como falha).
+
+    Vários processos (ex.: `uvicorn --workers N`) podem compartilhar o mesmo
+    arquivo: cada tarefa é reivindicada de forma atômica por um único processo,
+    que renova um heartbeat enquanto ela roda. Tarefas cujo dono parou (processo
+    inexistente ou heartbeat vencido) voltam para a fila e são retomadas por
+    qualquer processo vivo, em `start()` ou na verificação periódica.
+    """
+
+    def __init__(self, path: Optional[str] = None, workers: int = JOB_WORKERS,
+                 rate_per_minute: float = JOB_RATE_PER_MINUTE):
+        self.path = path
+        self.workers = max(int(workers), 1)
+        self.rate_per_minute = rate_per_minute
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._pending: "queue.Queue[str]" = queue.Queue()
+        # IDs na fila local ainda não retirados por um worker (a recuperação periódica não os repete)
+        self._queued: Set[str] = set()
+        self._threads: List[threading.Thread] = []
+        self._connection = None
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self.owner: Optional[str] = None
+
+    def _db(self):
+        # Conexão aberta no primeiro uso, para que importar o módulo não crie arquivos
+        if self._connection is None:
+            self.path = self.path or os.getenv("JOB_QUEUE_PATH") or data_path("jobs.sqlite3")
+            self._connection = connect(self.path)
+            self._connection.executescript(SCHEMA)
+            # Arquivos criados antes das colunas de dono e heartbeat
+            existing = {row[1] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+            for name, kind in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if name not in existing:
+                    try:
+                        self._connection.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+                    except sqlite3.OperationalError:
+                        pass  # outro processo acabou de adicionar a coluna
+            self._connection.commit()
+        return self._connection
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Registra o handler de um tipo de tarefa.
+        """
+        self._handlers[kind] = handler
+
+    def start(self) -> None:
+        """
+        Inicia os workers (uma única vez) e retoma as tarefas na fila ou abandonadas.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            self.owner = f"{socket.gethostname()}:{os.getpid()}"
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._maintain, name="job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        pending = self._recover(include_queued=True)
+        if pending:
+            logger.info(f"Retomando {len(pending)} tarefas pendentes")
+
+    def _recover(self, include_queued: bool) -> List[str]:
+        """
+        Devolve à fila as tarefas em execução cujo dono parou e as coloca na fila local.
+
+        Com `include_queued`, pega também todas as tarefas na fila; sem, apenas as
+        que esperam há mais de JOB_STALE_SECONDS (ex.: enfileiradas por um processo
+        que parou antes de executá-las). A reivindicação atômica em `_claim` impede
+        que dois processos executem a mesma tarefa.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            running = db.execute("SELECT job_id, owner, heartbeat_at FROM jobs WHERE status = 'running'").fetchall()
+            stale = [
+                (job_id, owner) for job_id, owner, heartbeat_at in running
+                if owner != self.owner and (
+                    heartbeat_at is None or now - heartbeat_at > JOB_STALE_SECONDS or not _owner_alive(owner)
+                )
+            ]
+            for job_id, owner in stale:
+                db.execute(
+                    "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL, heartbeat_at = NULL "
+                    "WHERE job_id = ? AND status = 'running' AND owner IS ?",
+                    (job_id, owner)
+                )
+            db.commit()
+            query, params = "SELECT job_id FROM jobs WHERE status = 'queued'", ()
+            if not include_queued:
+                query += " AND created_at < ?"
+                params = (datetime.fromtimestamp(now - JOB_STALE_SECONDS).isoformat(timespec="milliseconds"),)
+            pending = [row[0] for row in db.execute(query + " ORDER BY created_at", params)]
+        if stale:
+            logger.warning(f"Tarefas abandonadas devolvidas à fila: {[job_id for job_id, _ in stale]}")
+        for job_id in pending:
+            self._enqueue(job_id)
+        return pending
+
+    def _enqueue(self, job_id: str) -> None:
+        with self._lock:
+            if job_id in self._queued:
+                return
+            self._queued.add(job_id)
+        self._pending.put(job_id)
+
+    def _maintain(self) -> None:
+        # Renova o heartbeat das tarefas deste processo e recupera as abandonadas pelos demais
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                with self._lock:
+                    db = self._db()
+                    db.execute(
+                        "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+                        (time.time(), self.owner)
+                    )
+                    db.commit()
+                self._recover(include_queued=False)
+            except Exception as e:
+                logger.error(f"Erro na manutenção da fila de tarefas: {str(e)}")
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enfileira uma tarefa e retorna seu estado inicial.
+
+        Raises:
+            ValueError: Se não houver handler para o tipo de tarefa
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Tipo de tarefa desconhecido: {kind}")
+        self.start()
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO jobs (job_id, kind, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(params), _now())
+            )
+            db.commit()
+        self._enqueue(job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o estado de uma tarefa, ou None se ela não existir.
+        """
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            db = self._db()
+            db.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+            db.commit()
+
+    def _claim(self, job_id: str) -> bool:
+        # Reivindicação atômica: só um processo (e uma thread) passa de 'queued' para 'running'
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ? "
+                "WHERE job_id = ? AND status = 'queued'",
+                (_now(), self.owner, time.time(), job_id)
+            )
+            db.commit()
+            return cursor.rowcount == 1
+
+    def _throttle(self) -> None:
+        # Espaça o início das tarefas para respeitar o limite por minuto (ex.: cota da API do LLM)
+        if self.rate_per_minute <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + 60.0 / self.rate_per_minute
+        if start > now:
+            time.sleep(start - now)
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._pending.get()
+            with self._lock:
+                self._queued.discard(job_id)
+            job = self.get(job_id)
+            if job is None or job["status"] != "queued":
+                continue
+            if not self._claim(job_id):
+                continue
+            # Só tarefas reivindicadas por este processo consomem a cota
+            self._throttle()
+            try:
+                result = self._handlers[job["kind"]](job["params"])
+                if result is None:
+                    self._update(job_id, status="failed", error="A tarefa não produziu resultado",
+                                 finished_at=_now())
+                else:
+                    self._update(job_id, status="done", result=json.dumps(result, default=str),
+                                 finished_at=_now())
+            except Exception as e:
+                logger.error(f"Erro na tarefa {job_id} ({job['kind']}): {str(e)}")
+                self._update(job_id, status="failed", error=str(e) or type(e).__name__, finished_at=_now())
+
+
+# Instância compartilhada pelo processo (handlers registrados pelos routers)
+job_queue = JobQueue()
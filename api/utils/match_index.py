@@ -0,0 +1,175 @@
+from typing import Dict, List, Any, Optional
+import json
+import logging
+import os
+import threading
+import pandas as pd
+from api.utils.storage import connect, data_path
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id INTEGER PRIMARY KEY,
+    competition_id INTEGER,
+    season_id INTEGER,
+    match_date TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    last_updated TEXT,
+    data_version TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_season ON matches (competition_id, season_id);
+CREATE TABLE IF NOT EXISTS seasons (
+    competition_id INTEGER NOT NULL,
+    season_id INTEGER NOT NULL,
+    match_updated TEXT,
+    match_updated_360 TEXT,
+    PRIMARY KEY (competition_id, season_id)
+);
+"""
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class MatchIndex:
+    """
+    Índice persistente (SQLite) match_id -> metadados da partida.
+
+    É alimentado com todas as listas de partidas buscadas na StatsBomb, de modo
+    que consultar os times, a data ou o estádio de uma partida não exige baixar
+    novamente a lista da temporada inteira.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        # Conexão aberta no primeiro uso, para que importar o módulo não crie arquivos
+        if self._connection is None:
+            self.path = self.path or os.getenv("MATCH_INDEX_PATH") or data_path("match_index.sqlite3")
+            self._connection = connect(self.path)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def add_matches(self, matches: List[Dict[str, Any]], competition_id: Optional[int] = None,
+                    season_id: Optional[int] = None) -> int:
+        """
+        Insere ou atualiza os metadados de uma lista de partidas.
+
+        Args:
+            matches: Registros de `sb.matches`
+            competition_id: ID da competição da lista (a StatsBomb só devolve o nome)
+            season_id: ID da temporada da lista
+
+        Returns:
+            Número de partidas indexadas
+        """
+        rows = []
+        for match in matches:
+            if match.get('match_id') in (None, ''):
+                continue
+            record = {k: (None if not isinstance(v, (list, dict)) and pd.isna(v) else v) for k, v in match.items()}
+            record.setdefault('competition_id', competition_id)
+            record.setdefault('season_id', season_id)
+            rows.append((
+                int(record['match_id']),
+                record['competition_id'],
+                record['season_id'],
+                None if record.get('match_date') is None else str(record['match_date']),
+                record.get('home_team'),
+                record.get('away_team'),
+                None if record.get('last_updated') is None else str(record['last_updated']),
+                record.get('data_version'),
+                json.dumps(record, default=_json_default, ensure_ascii=False)
+            ))
+
+        with self._lock:
+            connection = self._db()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+        return len(rows)
+
+    def get(self, match_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Retorna os metadados de uma partida, ou None se ela ainda não foi indexada.
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT payload FROM matches WHERE match_id = ?", (int(match_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def season_matches(self, competition_id: int, season_id: int) -> List[Dict[str, Any]]:
+        """
+        Retorna os metadados das partidas indexadas de uma temporada, por data.
+        """
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT payload FROM matches WHERE competition_id = ? AND season_id = ? ORDER BY match_date, match_id",
+                (competition_id, season_id)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+    def match_versions(self, competition_id: int, season_id: int) -> Dict[int, tuple]:
+        """
+        Retorna {match_id: (last_updated, data_version)} das partidas indexadas de uma temporada.
+        """
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT match_id, last_updated, data_version FROM matches WHERE competition_id = ? AND season_id = ?",
+                (competition_id, season_id)
+            ).fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def tracked_seasons(self) -> List[tuple]:
+        """
+        Retorna as temporadas (competition_id, season_id) com partidas indexadas.
+        """
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT DISTINCT competition_id, season_id FROM matches WHERE competition_id IS NOT NULL"
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def season_updates(self, competition_id: int, season_id: int) -> Optional[tuple]:
+        """
+        Retorna o (match_updated, match_updated_360) registrado para a temporada, ou None.
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT match_updated, match_updated_360 FROM seasons WHERE competition_id = ? AND season_id = ?",
+                (competition_id, season_id)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def set_season_updates(self, competition_id: int, season_id: int,
+                           match_updated: Optional[str], match_updated_360: Optional[str]) -> None:
+        """
+        Registra os carimbos `match_updated`/`match_updated_360` já processados da temporada.
+        """
+        with self._lock:
+            connection = self._db()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO seasons VALUES (?, ?, ?, ?)",
+                    (competition_id, season_id, match_updated, match_updated_360)
+                )
+
+
+# Instância compartilhada (um único arquivo de índice por processo)
+match_index = MatchIndex()
@@ -0,0 +1,228 @@
+from typing import Dict, Iterable, List, Any, Optional, Set
+import bisect
+import difflib
+import logging
+import re
+import threading
+import unicodedata
+import pandas as pd
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Letras que a decomposição NFKD não separa em base + acento
+SPECIAL_LETTERS = str.maketrans({
+    'ı': 'i', 'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'đ': 'd', 'ð': 'd', 'ł': 'l', 'þ': 'th'
+})
+
+# Nomes alternativos (já normalizados) -> nome normalizado usado pela StatsBomb
+TEAM_ALIASES = {
+    "alemanha": "germany",
+    "argelia": "algeria",
+    "belgica": "belgium",
+    "brasil": "brazil",
+    "camaroes": "cameroon",
+    "coreia do sul": "south korea",
+    "croacia": "croatia",
+    "dinamarca": "denmark",
+    "escocia": "scotland",
+    "eslovaquia": "slovakia",
+    "espanha": "spain",
+    "estados unidos": "united states",
+    "eua": "united states",
+    "usa": "united states",
+    "finlandia": "finland",
+    "franca": "france",
+    "gales": "wales",
+    "pais de gales": "wales",
+    "holanda": "netherlands",
+    "paises baixos": "netherlands",
+    "hungria": "hungary",
+    "inglaterra": "england",
+    "italia": "italy",
+    "japao": "japan",
+    "macedonia do norte": "north macedonia",
+    "marrocos": "morocco",
+    "polonia": "poland",
+    "republica tcheca": "czech republic",
+    "tchequia": "czech republic",
+    "suecia": "sweden",
+    "suica": "switzerland",
+    "turquia": "turkey",
+    "turkiye": "turkey",
+    "ucrania": "ukraine"
+}
+
+
+def normalize_name(name: Any) -> str:
+    """
+    Normaliza um nome para comparação: minúsculas (casefold), sem acentos e
+    apenas letras/dígitos separados por um espaço.
+    """
+    if not isinstance(name, str):
+        return ""
+    text = unicodedata.normalize("NFKD", name.casefold().translate(SPECIAL_LETTERS))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+class NameIndex:
+    """
+    Índice de nomes de times e jogadores, alimentado à medida que lineups e
+    listas de partidas são carregados.
+
+    Times são resolvidos em O(1) por nome normalizado ou apelido; jogadores são
+    buscados por prefixo (de qualquer palavra do nome) com fallback aproximado.
+    """
+
+    def __init__(self):
+        self._teams: Dict[str, str] = {}
+        self._players: Dict[int, Dict[str, Any]] = {}
+        self._names: Dict[str, Set[int]] = {}
+        self._tokens: List[tuple] = []
+        self._sorted = True
+        self._lock = threading.Lock()
+
+    def add_team(self, team: Any) -> None:
+        key = normalize_name(team)
+        if key:
+            with self._lock:
+                self._teams[key] = team
+
+    def add_matches(self, matches: Iterable[Dict[str, Any]]) -> None:
+        """
+        Registra os times de uma lista de partidas.
+        """
+        for match in matches:
+            self.add_team(match.get('home_team'))
+            self.add_team(match.get('away_team'))
+
+    def add_lineups(self, match_id: int, lineups: Dict[str, pd.DataFrame]) -> None:
+        """
+        Registra os times e jogadores dos lineups de uma partida.
+        """
+        for team, players in lineups.items():
+            self.add_team(team)
+            if players is None or players.empty:
+                continue
+            with self._lock:
+                for player in players.to_dict('records'):
+                    self._add_player(match_id, team, player)
+
+    def _add_player(self, match_id: int, team: str, player: Dict[str, Any]) -> None:
+        player_id = int(player['player_id'])
+        entry = self._players.get(player_id)
+        if entry is None:
+            entry = self._players[player_id] = {
+                "player_id": player_id,
+                "player_name": player.get('player_name'),
+                "player_nickname": None,
+                "teams": [],
+                "matches": set()
+            }
+            names = [player.get('player_name')]
+        else:
+            names = []
+        nickname = player.get('player_nickname')
+        if isinstance(nickname, str) and nickname and entry["player_nickname"] != nickname:
+            entry["player_nickname"] = nickname
+            names.append(nickname)
+        if team not in entry["teams"]:
+            entry["teams"].append(team)
+        entry["matches"].add(int(match_id))
+
+        for name in names:
+            key = normalize_name(name)
+            if not key:
+                continue
+            self._names.setdefault(key, set()).add(player_id)
+            for token in set(key.split()) | {key}:
+                self._tokens.append((token, player_id))
+            self._sorted = False
+
+    def resolve_team(self, name: str, candidates: Optional[Iterable[str]] = None) -> Optional[str]:
+        """
+        Resolve um nome de time (com ou sem acentos, em português ou apelido) para o nome da StatsBomb.
+
+        Args:
+            name: Nome informado
+            candidates: Nomes válidos no contexto (ex.: os dois times de um lineup)
+
+        Returns:
+            Nome canônico do time, ou None se não for reconhecido
+        """
+        key = normalize_name(name)
+        key = TEAM_ALIASES.get(key, key)
+        if candidates is not None:
+            for candidate in candidates:
+                normalized = normalize_name(candidate)
+                if normalized == key or TEAM_ALIASES.get(normalized) == key:
+                    return candidate
+            return None
+        with self._lock:
+            return self._teams.get(key)
+
+    def _prefix(self, word: str) -> Set[int]:
+        # Busca binária na lista ordenada de (palavra, player_id)
+        found = set()
+        position = bisect.bisect_left(self._tokens, (word,))
+        while position < len(self._tokens) and self._tokens[position][0].startswith(word):
+            found.add(self._tokens[position][1])
+            position += 1
+        return found
+
+    def search_players(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Busca jogadores pelo nome: nome completo, prefixo de qualquer palavra e,
+        por último, correspondência aproximada.
+
+        Args:
+            query: Texto buscado
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista de jogadores, do mais ao menos relevante
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        with self._lock:
+            if not self._sorted:
+                self._tokens = sorted(set(self._tokens))
+                self._sorted = True
+
+            ranked: Dict[int, int] = {}
+
+            def rank(player_ids: Iterable[int], score: int) -> None:
+                for player_id in player_ids:
+                    ranked.setdefault(player_id, score)
+
+            rank(self._names.get(key, ()), 0)
+
+            # Prefixo do nome completo e, depois, de todas as palavras da busca
+            rank(self._prefix(key), 1)
+            matches: Optional[Set[int]] = None
+            for word in key.split():
+                found = self._prefix(word)
+                matches = found if matches is None else matches & found
+            rank(matches or (), 2)
+
+            if len(ranked) < limit:
+                for name in difflib.get_close_matches(key, list(self._names), n=limit, cutoff=0.75):
+                    rank(self._names[name], 3)
+
+            ordered = sorted(ranked, key=lambda pid: (ranked[pid], self._players[pid]["player_name"] or ""))
+            return [
+                {
+                    **{k: v for k, v in self._players[pid].items() if k != "matches"},
+                    "teams": list(self._players[pid]["teams"]),
+                    "matches": sorted(self._players[pid]["matches"])
+                }
+                for pid in ordered[:limit]
+            ]
+
+
+# Instância compartilhada (alimentada pelos carregamentos de lineups e partidas)
+name_index = NameIndex()
@@ -0,0 +1,57 @@
+from typing import Any, Optional
+import math
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """
+    Conversão dos tipos que o orjson não serializa nativamente (pandas, sets, escalares NumPy raros).
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        item = value.item()
+        return None if isinstance(item, float) and math.isnan(item) else item
+    if value is None or str(value) in ("<NA>", "NaT"):
+        return None
+    raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada com orjson.
+
+    Trata nativamente escalares e arrays NumPy, datetimes e NaN (serializado como null).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def fast_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Devolve o conteúdo já como FastJSONResponse, sem a passagem do `jsonable_encoder`
+    que o FastAPI faz sobre dicionários retornados pelas rotas.
+
+    Cabeçalhos definidos por dependências na resposta temporária (ex.: ETag) são copiados.
+
+    Args:
+        content: Dados já serializáveis (dicts, listas, tipos NumPy/pandas)
+        response: Resposta temporária injetada na rota, se houver
+        status_code: Código HTTP
+    """
+    headers = None
+    if response is not None:
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key not in ("content-length", "content-type")
+        }
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,239 @@
+from typing import Any, Hashable, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import pickle
+import platform
+import sqlite3
+import threading
+import time
+import pandas as pd
+from api.utils.storage import data_path
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Orçamento total em disco e janela mapeada em memória (páginas compartilhadas entre processos)
+SHARED_CACHE_MAX_BYTES = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(1024 ** 3)))
+SHARED_CACHE_MMAP_BYTES = int(os.getenv("SHARED_CACHE_MMAP_BYTES", str(256 * 1024 ** 2)))
+# Leituras só regravam o horário de acesso de uma entrada depois deste intervalo
+TOUCH_INTERVAL_SECONDS = 60
+# Registros de invalidação mais antigos que isto são apagados (os processos leem o log a cada segundo)
+INVALIDATION_RETENTION_SECONDS = 24 * 3600
+# Entradas de outra versão do código sem leitura há mais que isto são apagadas ao abrir o cache
+STALE_VERSION_SECONDS = 3600
+# Incrementado quando o formato das entradas muda
+SCHEMA_VERSION = 1
+
+
+def code_version() -> str:
+    """
+    Versão das entradas: SHARED_CACHE_VERSION ou uma impressão digital do código da API.
+
+    A impressão digital cobre os fontes do pacote `api`, as versões do Python e
+    do pandas (valores em pickle) e o SCHEMA_VERSION; qualquer deploy que mude
+    um deles deixa de enxergar as entradas gravadas pela versão anterior.
+    """
+    configured = os.getenv("SHARED_CACHE_VERSION")
+    if configured:
+        return configured
+    digest = hashlib.sha1(f"{SCHEMA_VERSION}:{platform.python_version()}:{pd.__version__}".encode())
+    package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for root, dirs, files in sorted(os.walk(package)):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.endswith(".py"):
+                path = os.path.join(root, filename)
+                digest.update(os.path.relpath(path, package).encode())
+                with open(path, "rb") as file:
+                    digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    match_id INTEGER,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_match ON entries (match_id);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS invalidations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class SharedCache:
+    """
+    Cache compartilhado por todos os processos (workers do uvicorn) de um host.
+
+    Os valores ficam serializados (pickle) em um arquivo SQLite local, lido via
+    mmap: as páginas mais usadas ficam no page cache do sistema, uma única vez
+    para todos os workers, e o restante em disco. O total é limitado por um
+    orçamento de bytes, descartando as entradas lidas há mais tempo.
+
+    Invalidações de partidas são registradas em um log, que os demais processos
+    consultam para descartar as próprias cópias em memória.
+
+    As chaves levam a versão do código (`code_version()`): entradas gravadas por
+    outro deploy nunca são lidas e saem do arquivo por idade ou pelo orçamento.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = SHARED_CACHE_MAX_BYTES,
+                 mmap_bytes: int = SHARED_CACHE_MMAP_BYTES, version: Optional[str] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mmap_bytes = mmap_bytes
+        self.version = version or code_version()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        # Uma conexão por processo, aberta no primeiro uso (e reaberta após um fork)
+        if self._connection is None or self._pid != os.getpid():
+            self.path = self.path or os.getenv("SHARED_CACHE_PATH") or data_path("shared_cache.sqlite3")
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            connection.executescript(SCHEMA)
+            with connection:
+                connection.execute(
+                    "DELETE FROM entries WHERE substr(key, 1, ?) != ? AND accessed_at < ?",
+                    (len(self.version) + 1, f"{self.version}:", time.time() - STALE_VERSION_SECONDS)
+                )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _key(self, key: Hashable) -> str:
+        # Chaves são inteiros, strings ou tuplas desses tipos: repr é estável entre processos
+        return f"{self.version}:{key!r}"
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor armazenado ou None se a chave não estiver no cache.
+        """
+        entry = self.get_entry(namespace, key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, namespace: str, key: Hashable) -> Optional[Tuple[Any, int]]:
+        """
+        Retorna o valor armazenado e seu tamanho serializado, ou None se a chave não estiver no cache.
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._db()
+                row = connection.execute(
+                    "SELECT value, accessed_at FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace, self._key(key))
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > TOUCH_INTERVAL_SECONDS:
+                    with connection:
+                        connection.execute(
+                            "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                            (now, namespace, self._key(key))
+                        )
+            return pickle.loads(row[0]), len(row[0])
+        except Exception as e:
+            logger.error(f"Erro ao ler {namespace} do cache compartilhado: {str(e)}")
+            return None
+
+    def set(self, namespace: str, key: Hashable, value: Any, match_id: Optional[int] = None) -> Optional[int]:
+        """
+        Armazena um valor e descarta as entradas mais antigas se o orçamento for excedido.
+
+        Retorna o tamanho serializado do valor, ou None se ele não foi gravado.
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Valor de {namespace} não serializável; não compartilhado: {str(e)}")
+            return None
+        if len(blob) > self.max_bytes:
+            return None
+        try:
+            with self._lock:
+                connection = self._db()
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                        (namespace, self._key(key), None if match_id is None else int(match_id),
+                         blob, len(blob), time.time())
+                    )
+                    self._evict(connection)
+            return len(blob)
+        except Exception as e:
+            logger.error(f"Erro ao gravar {namespace} no cache compartilhado: {str(e)}")
+            return None
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for namespace, key, size in connection.execute(
+            "SELECT namespace, key, size FROM entries ORDER BY accessed_at"
+        ):
+            victims.append((namespace, key))
+            freed += size
+            if freed >= excess:
+                break
+        connection.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", victims)
+
+    def invalidate_match(self, match_id: int) -> int:
+        """
+        Remove as entradas de uma partida e registra a invalidação para os demais processos.
+
+        Returns:
+            ID do registro no log de invalidações
+        """
+        with self._lock:
+            connection = self._db()
+            with connection:
+                connection.execute("DELETE FROM entries WHERE match_id = ?", (int(match_id),))
+                cursor = connection.execute(
+                    "INSERT INTO invalidations (match_id, created_at) VALUES (?, ?)", (int(match_id), time.time())
+                )
+                connection.execute(
+                    "DELETE FROM invalidations WHERE created_at < ?", (time.time() - INVALIDATION_RETENTION_SECONDS,)
+                )
+            return cursor.lastrowid
+
+    def invalidations_since(self, last_id: Optional[int]) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Retorna o último ID do log e as invalidações (id, match_id) posteriores a `last_id`.
+
+        Com `last_id` None, apenas posiciona no fim do log.
+        """
+        with self._lock:
+            connection = self._db()
+            if last_id is None:
+                row = connection.execute("SELECT COALESCE(MAX(id), 0) FROM invalidations").fetchone()
+                return row[0], []
+            rows = connection.execute(
+                "SELECT id, match_id FROM invalidations WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+        return (rows[-1][0] if rows else last_id), rows
+
+    def clear(self) -> None:
+        """
+        Esvazia o cache compartilhado (o log de invalidações é mantido).
+        """
+        with self._lock:
+            connection = self._db()
+            with connection:
+                connection.execute("DELETE FROM entries")
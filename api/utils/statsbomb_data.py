@@ -2,6 +2,10 @@ from statsbombpy import sb
 import pandas as pd
 import logging
 from typing import Dict, List, Any, Optional
+from api.utils.analytics_store import analytics_store
+from api.utils.match_index import match_index
+from api.utils.name_index import name_index
+from api.utils.statsbomb_handler import StatsBombHandler
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -39,6 +43,11 @@ def get_matches(competition_id: int, season_id: int) -> List[Dict[str, Any]]:
             logger.warning(f"Nenhuma partida encontrada para competition_id={competition_id}, season_id={season_id}")
             return []
             
+        records = matches.to_dict('records')
+        match_index.add_matches(records, competition_id, season_id)
+        name_index.add_matches(records)
+        analytics_store.add_matches(records, competition_id, season_id)
+        
         # Garantir que temos todas as colunas necessárias
         required_columns = [
             'match_id', 'match_date', 'match_time', 
@@ -86,35 +95,29 @@ def get_match_lineup(match_id: int, team_name: str) -> List[Dict[str, Any]]:
     Retorna o lineup de um time em uma partida específica.
     """
     try:
-        lineups = sb.lineups(match_id=match_id)
+        # Lineups compartilhados pelo cache de partidas (uma busca por partida)
+        lineups = StatsBombHandler.load_lineups(match_id)
         if lineups is None:
             logger.warning(f"Nenhum lineup encontrado para match_id={match_id}")
             return []
             
-        # Tentar encontrar o time com diferentes variações do nome
-        team_variations = [
-            team_name,
-            team_name.title(),
-            team_name.upper(),
-            team_name.lower(),
-            team_name.strip()
-        ]
-        
-        for team_var in team_variations:
-            if team_var in lineups:
-                team_lineup = lineups[team_var]
-                if team_lineup is not None and not team_lineup.empty:
-                    # Garantir que todos os campos necessários existam
-                    required_columns = [
-                        'player_id', 'player_name', 'player_nickname',
-                        'jersey_number', 'position', 'starting'
-                    ]
-                    for col in required_columns:
-                        if col not in team_lineup.columns:
-                            team_lineup[col] = ''
-                            
-                    team_lineup = team_lineup.fillna('')
-                    return team_lineup.to_dict('records')
+        # Resolve o nome do time sem depender de acentos, caixa ou grafia (ex.: "Turquia")
+        team = name_index.resolve_team(team_name, lineups.keys())
+        if team is not None:
+            team_lineup = lineups[team]
+            if team_lineup is not None and not team_lineup.empty:
+                team_lineup = team_lineup.copy()
+                # Garantir que todos os campos necessários existam
+                required_columns = [
+                    'player_id', 'player_name', 'player_nickname',
+                    'jersey_number', 'position', 'starting'
+                ]
+                for col in required_columns:
+                    if col not in team_lineup.columns:
+                        team_lineup[col] = ''
+                        
+                team_lineup = team_lineup.fillna('')
+                return team_lineup.to_dict('records')
                 
         logger.warning(f"Time {team_name} não encontrado nos lineups")
         return []
@@ -1,7 +1,16 @@
 from statsbombpy import sb
-from typing import Dict, List, Any, Optional
+from statsbombpy.config import HOSTNAME, OPEN_DATA_PATHS, VERSIONS
+from typing import Callable, Dict, List, Any, Optional
 import pandas as pd
 import logging
+import requests_cache
+from api.models.match_models import MATCH_EVENTS_ADAPTER
+from api.utils.analytics_store import analytics_store
+from api.utils.cache import match_cache
+from api.utils.event_columns import event_columns
+from api.utils.event_frame import column, nested_locations, sort_events
+from api.utils.match_index import match_index
+from api.utils.name_index import name_index
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +21,147 @@ class StatsBombHandler:
     Classe para gerenciar todas as interações com a API StatsBomb.
     Centraliza as chamadas e tratamento de dados da API.
     """
+
+    @staticmethod
+    def load_events(match_id: int) -> pd.DataFrame:
+        """
+        Retorna o DataFrame de eventos da partida em ordem cronológica.
+        
+        O download é feito uma única vez por partida; os eventos são gravados em
+        colunas mapeadas em memória, que os demais processos leem sem copiar.
+        O DataFrame retornado é compartilhado e não deve ser modificado.
+        
+        Args:
+            match_id: ID da partida na StatsBomb
+            
+        Returns:
+            DataFrame com os eventos da partida
+        """
+        def fetch() -> pd.DataFrame:
+            stored = event_columns.load(match_id) if event_columns is not None else None
+            if stored is not None:
+                # A base analítica pode ter sido criada (ou apagada) depois das colunas
+                StatsBombHandler._store("eventos", match_id, StatsBombHandler._store_missing_events, match_id, stored)
+                return stored
+            logger.info(f"Baixando eventos da partida {match_id}")
+            events = sort_events(sb.events(match_id=match_id))
+            StatsBombHandler._store("eventos", match_id, analytics_store.add_events, match_id, events)
+            if event_columns is not None and event_columns.save(match_id, events):
+                stored = event_columns.load(match_id)
+            return events if stored is None else stored
+
+        # As colunas mapeadas já são compartilhadas: o DataFrame não passa pelo cache em SQLite
+        return match_cache.get_or_compute("events", match_id, fetch, match_id=match_id, share=False)
+
+    @staticmethod
+    def load_lineups(match_id: int) -> Dict[str, pd.DataFrame]:
+        """
+        Retorna os lineups da partida ({nome do time: DataFrame}), com cache por partida.
+        
+        Args:
+            match_id: ID da partida na StatsBomb
+            
+        Returns:
+            Dicionário com o lineup de cada time
+        """
+        def fetch() -> Dict[str, pd.DataFrame]:
+            logger.info(f"Baixando lineups da partida {match_id}")
+            lineups = sb.lineups(match_id=match_id)
+            StatsBombHandler._store("lineups", match_id, analytics_store.add_lineups, match_id, lineups)
+            return lineups
+
+        # O índice de nomes é do processo: alimentado também quando o lineup vem do cache compartilhado
+        return match_cache.get_or_compute(
+            "lineups", match_id, fetch, match_id=match_id,
+            on_load=lambda lineups: name_index.add_lineups(match_id, lineups)
+        )
+
+    @staticmethod
+    def evict_http_cache(match_id: Optional[int] = None, competition_id: Optional[int] = None,
+                         season_id: Optional[int] = None, competitions: bool = False) -> None:
+        """
+        Remove do cache HTTP do statsbombpy (requests_cache, 10 minutos) as respostas
+        de uma partida, da lista de partidas de uma temporada e/ou da lista de
+        competições, para que a próxima busca traga os dados atualizados.
+        """
+        cache = requests_cache.get_cache()
+        if cache is None:
+            return
+        urls = []
+        if competitions:
+            urls += [OPEN_DATA_PATHS["competitions"], f"{HOSTNAME}/api/{VERSIONS['competitions']}/competitions"]
+        if competition_id is not None and season_id is not None:
+            urls += [
+                OPEN_DATA_PATHS["matches"].format(competition_id=competition_id, season_id=season_id),
+                f"{HOSTNAME}/api/{VERSIONS['matches']}/competitions/{competition_id}/seasons/{season_id}/matches"
+            ]
+        if match_id is not None:
+            for resource in ("events", "lineups"):
+                urls += [
+                    OPEN_DATA_PATHS[resource].format(match_id=match_id),
+                    f"{HOSTNAME}/api/{VERSIONS[resource]}/{resource}/{match_id}"
+                ]
+        try:
+            # Busca pela URL das respostas gravadas: a chave do cache também depende dos cabeçalhos da sessão
+            urls = set(urls)
+            keys = [response.cache_key for response in cache.filter(expired=True) if response.url in urls]
+            if keys:
+                cache.delete(*keys)
+        except Exception as e:
+            logger.error(f"Erro ao limpar o cache HTTP: {str(e)}")
+
+    @staticmethod
+    def _store(kind: str, match_id: Any, write: Callable[..., Any], *args: Any) -> None:
+        # A base analítica é secundária: uma falha ao gravar não impede o carregamento
+        try:
+            write(*args)
+        except Exception as e:
+            logger.error(f"Erro ao gravar {kind} de {match_id} na base analítica: {str(e)}")
+
+    @staticmethod
+    def _store_missing_events(match_id: int, events: pd.DataFrame) -> None:
+        if not analytics_store.has_events(match_id):
+            analytics_store.add_events(match_id, events)
+
+    @staticmethod
+    def load_event_records(match_id: int) -> List[Dict[str, Any]]:
+        """
+        Retorna os eventos da partida como registros JSON, validados contra `MatchEvent`.
+        
+        A conversão e a validação acontecem uma única vez, na ingestão; o resultado
+        fica no cache e é servido sem nova validação. A lista retornada é
+        compartilhada e não deve ser modificada.
+        
+        Args:
+            match_id: ID da partida na StatsBomb
+            
+        Returns:
+            Lista de eventos em ordem cronológica
+            
+        Raises:
+            pydantic.ValidationError: Se os eventos não seguirem o esquema esperado
+        """
+        def convert() -> List[Dict[str, Any]]:
+            records = StatsBombHandler.to_records(nested_locations(StatsBombHandler.load_events(match_id)))
+            MATCH_EVENTS_ADAPTER.validate_python(records)
+            return records
+
+        return match_cache.get_or_compute("event_records", match_id, convert, match_id=match_id)
+
+    @staticmethod
+    def to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Converte um DataFrame em lista de dicionários serializável em JSON (NaN -> None).
+        
+        Args:
+            frame: DataFrame a converter
+            
+        Returns:
+            Lista de registros
+        """
+        if frame.empty:
+            return []
+        return frame.astype(object).where(frame.notna(), None).to_dict('records')
     
     @staticmethod
     def get_match_data(match_id: int) -> Dict[str, Any]:
@@ -29,12 +179,11 @@ class StatsBombHandler:
         """
         try:
             logger.info(f"Buscando dados da partida {match_id}")
-            events = sb.events(match_id=match_id)
-            lineup = sb.lineups(match_id=match_id)
+            events_dict = StatsBombHandler.load_event_records(match_id)
+            lineup = StatsBombHandler.load_lineups(match_id)
             
             # Converte DataFrames para dicionários
-            events_dict = events.to_dict('records') if not events.empty else []
-            lineup_dict = {team: players.to_dict('records') 
+            lineup_dict = {team: StatsBombHandler.to_records(players)
                          for team, players in lineup.items()}
             
             return {
@@ -61,7 +210,7 @@ class StatsBombHandler:
         """
         try:
             logger.info(f"Calculando estatísticas do jogador {player_id} na partida {match_id}")
-            events = sb.events(match_id=match_id)
+            events = StatsBombHandler.load_events(match_id)
             
             # Filtra eventos do jogador
             player_events = events[events['player_id'] == player_id]
@@ -112,6 +261,12 @@ class StatsBombHandler:
             
             # Converter DataFrame para lista de dicionários
             matches_list = matches.to_dict('records') if not matches.empty else []
+            match_index.add_matches(matches_list, competition_id, season_id)
+            name_index.add_matches(matches_list)
+            StatsBombHandler._store(
+                "partidas", f"{competition_id}/{season_id}",
+                analytics_store.add_matches, matches_list, competition_id, season_id
+            )
             
             return matches_list
             
@@ -132,7 +287,7 @@ class StatsBombHandler:
         """
         try:
             logger.info(f"Buscando eventos da partida {match_id}")
-            events = sb.events(match_id=match_id)
+            events = nested_locations(StatsBombHandler.load_events(match_id))
             
             # Converter DataFrame para lista de dicionários
             events_list = events.to_dict('records') if not events.empty else []
@@ -158,17 +313,18 @@ class StatsBombHandler:
         """
         try:
             logger.info(f"Buscando lineup da partida {match_id} para o time {team}")
-            lineup = sb.lineups(match_id=match_id)
+            lineup = StatsBombHandler.load_lineups(match_id)
             
-            if team not in lineup:
+            resolved = name_index.resolve_team(team, lineup.keys())
+            if resolved is None:
                 raise Exception(f"Time {team} não encontrado na partida {match_id}")
             
-            team_lineup = lineup[team]
+            team_lineup = lineup[resolved]
             players_list = team_lineup.to_dict('records') if not team_lineup.empty else []
             
             if include_stats:
                 # Adicionar estatísticas para cada jogador
-                events = sb.events(match_id=match_id)
+                events = StatsBombHandler.load_events(match_id)
                 for player in players_list:
                     player_events = events[events['player_id'] == player['player_id']]
                     player['statistics'] = StatsBombHandler._calculate_player_stats(player_events)
@@ -180,7 +336,7 @@ class StatsBombHandler:
             raise Exception(f"Falha ao recuperar lineup: {str(e)}")
     
     @staticmethod
-    def _calculate_player_stats(player_events: pd.DataFrame) -> Dict[str, int]:
+    def _calculate_player_stats(player_events: pd.DataFrame) -> Dict[str, Any]:
         """
         Calcula estatísticas básicas de um jogador a partir de seus eventos.
         
@@ -190,16 +346,19 @@ class StatsBombHandler:
         Returns:
             Dicionário com estatísticas calculadas
         """
+        # Passes completos não têm `pass_outcome`; desarmes são duelos do tipo 'Tackle'
+        shots = player_events[player_events['type'] == 'Shot']
         return {
             "passes_completed": len(player_events[
                 (player_events['type'] == 'Pass') & 
-                (player_events['outcome'] == 'Complete')
+                (column(player_events, 'pass_outcome').isna())
             ]),
-            "shots": len(player_events[player_events['type'] == 'Shot']),
-            "goals": len(player_events[
-                (player_events['type'] == 'Shot') & 
-                (player_events['outcome'] == 'Goal')
+            "shots": len(shots),
+            "goals": len(shots[column(shots, 'shot_outcome') == 'Goal']),
+            "xg": round(float(column(shots, 'shot_statsbomb_xg').fillna(0).sum()), 4),
+            "tackles": len(player_events[
+                (player_events['type'] == 'Duel') & 
+                (column(player_events, 'duel_type') == 'Tackle')
             ]),
-            "tackles": len(player_events[player_events['type'] == 'Tackle']),
             "interceptions": len(player_events[player_events['type'] == 'Interception'])
         }
@@ -0,0 +1,25 @@
+import os
+import sqlite3
+
+# Diretório dos arquivos persistentes da API (índices e caches em SQLite)
+DATA_DIR = os.getenv("API_DATA_DIR", "data")
+
+
+def data_path(filename: str) -> str:
+    """
+    Caminho de um arquivo dentro do diretório de dados, criando o diretório se necessário.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Abre uma conexão SQLite compartilhável entre threads, em modo WAL.
+
+    O acesso concorrente deve ser serializado pelo chamador (ex.: com um Lock).
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
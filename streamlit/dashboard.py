@@ -6,6 +6,8 @@ import os
 from dotenv import load_dotenv
 from openai import OpenAI
 import json
+from utils.chat_memory import ConversationMemory
+from utils.retrieval import MatchRetriever
 
 # Configuração
 load_dotenv()
@@ -20,13 +22,34 @@ st.set_page_config(
 API_BASE_URL = "http://localhost:8000/api/v1"
 MATCH_ID = 3788741  # Turquia vs Itália
 PLAYER_ID = 11086.0  # Burak Yilmaz
+CHAT_CONTEXT_TOKENS = 1500  # Orçamento de tokens dos eventos enviados ao chat
+CHAT_HISTORY_TURNS = 6  # Trocas recentes mantidas literalmente no histórico
+CHAT_SESSION_MAX_BYTES = 32_000  # Limite de memória do chat por sessão
 
 # Cliente OpenAI
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
-# Estado do chat
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
+def summarize_chat_history(previous_summary: str, messages: List[Dict]) -> str:
+    """Incorpora trocas antigas do chat ao resumo acumulado da conversa"""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "Resuma conversas sobre futebol de forma concisa, preservando fatos, nomes e números citados."},
+            {"role": "user", "content": f"Resumo atual:\n{previous_summary or '(vazio)'}\n\nNovas mensagens:\n{transcript}\n\nEscreva o resumo atualizado."}
+        ],
+        temperature=0.2,
+        max_tokens=300
+    )
+    return response.choices[0].message.content
+
+# Estado do chat: últimas trocas literais + resumo das antigas, com limite de bytes por sessão
+if 'memory' not in st.session_state:
+    st.session_state.memory = ConversationMemory(
+        max_turns=CHAT_HISTORY_TURNS,
+        max_bytes=CHAT_SESSION_MAX_BYTES,
+        summarizer=summarize_chat_history
+    )
 
 def get_match_data() -> Dict:
     """Função genérica para chamadas à API"""
@@ -38,6 +61,26 @@ def get_match_data() -> Dict:
         st.error(f"Erro na API: {str(e)}")
         return {}
 
+def get_timeline_events(match_data: Dict) -> List[Dict]:
+    """Converte os eventos-chave da partida (gols, cartões e substituições) em eventos da timeline"""
+    key_events = match_data.get('key_events', {})
+    timeline = [
+        {"type": "Goal", "minute": g['minute'], "team": g['team'], "player": g['scorer'],
+         "assist": g.get('assist'), "description": "Gol contra" if g.get('own_goal') else None}
+        for g in key_events.get('goals', [])
+    ]
+    timeline += [
+        {"type": "Card", "minute": c['minute'], "team": c['team'], "player": c['player'],
+         "card_type": c['card_type']}
+        for c in key_events.get('cards', [])
+    ]
+    timeline += [
+        {"type": "Substitution", "minute": sub['minute'], "team": sub['team'],
+         "player_out": sub['player_out'], "player_in": sub['player_in']}
+        for sub in key_events.get('substitutions', [])
+    ]
+    return sorted(timeline, key=lambda e: e['minute'])
+
 def get_match_summary() -> Dict:
     """Obtém resumo da partida via API"""
     try:
@@ -98,7 +141,7 @@ def get_match_analysis(style: str) -> str:
         - Data: {match_data['date']}
 
         Eventos importantes:
-        {', '.join([f"{e['minute']}' - {e['type']} por {e['player']}" for e in match_data['events']])}
+        {', '.join([f"{e['minute']}' - {e['type']} por {e.get('player', e.get('player_out'))}" for e in get_timeline_events(match_data)])}
 
         {prompts[style]}
         
@@ -124,8 +167,8 @@ def generate_llm_summary(match_data: Dict) -> str:
     """Gera um resumo personalizado usando GPT-4"""
     try:
         events_text = "\n".join([
-            f"{event['minute']}' - {event['type']} - {event['player']} ({event['team']})"
-            for event in match_data['events']
+            f"{event['minute']}' - {event['type']} - {event.get('player', event.get('player_out'))} ({event['team']})"
+            for event in get_timeline_events(match_data)
         ])
         
         prompt = f"""
@@ -346,16 +389,22 @@ def show_player_stats(player: Dict):
                 "Desarmes realizados"
             )
 
+@st.cache_resource(show_spinner=False)
+def get_match_retriever(match_id: int, _match_data: Dict) -> MatchRetriever:
+    """Índice de recuperação da partida, construído uma única vez por partida"""
+    return MatchRetriever(_match_data)
+
 def chat_with_context(prompt: str, match_data: Dict) -> str:
     """Chat interativo com contexto da partida"""
     try:
-        if not hasattr(st.session_state, 'messages'):
-            st.session_state.messages = []
-
         system_prompt = """Você é um assistente especializado em futebol, com conhecimento profundo sobre o esporte.
         Responda às perguntas sobre a partida de forma clara e precisa, usando os dados fornecidos.
         Se necessário, faça análises táticas e técnicas, mas mantenha a linguagem acessível."""
 
+        # Apenas os eventos relevantes para a pergunta, dentro de um orçamento fixo de tokens
+        retriever = get_match_retriever(match_data.get('match_id', MATCH_ID), match_data)
+        relevant_events = retriever.build_context(prompt, token_budget=CHAT_CONTEXT_TOKENS)
+
         context = f"""
         Contexto da Partida:
         - Placar: {match_data['score']}
@@ -363,13 +412,8 @@ def chat_with_context(prompt: str, match_data: Dict) -> str:
         - Estádio: {match_data['stadium']}
         - Data: {match_data['date']}
 
-        Eventos da Partida:
-        {', '.join([
-            f"{e['minute']}' - " + (
-                f"🔄 {e['player_out']} ➡ {e['player_in']}" if e['type'] == 'Substitution'
-                else f"{e['type']} por {e.get('player', 'Desconhecido')}"
-            ) for e in match_data['events']
-        ])}
+        Eventos relevantes da Partida:
+        {relevant_events}
         """
 
         response = client.chat.completions.create(
@@ -377,6 +421,7 @@ def chat_with_context(prompt: str, match_data: Dict) -> str:
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": context},
+                *st.session_state.memory.prompt_messages(),
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
@@ -484,7 +529,8 @@ def main():
     # Tab 1: Timeline e Eventos
     with tab1:
         # Configurando o tema escuro para o gráfico
-        fig = create_timeline(match_data['events'])
+        timeline_events = get_timeline_events(match_data)
+        fig = create_timeline(timeline_events)
         fig.update_layout(
             plot_bgcolor='#1a1a1a',
             paper_bgcolor='#1a1a1a',
@@ -493,7 +539,7 @@ def main():
             yaxis=dict(gridcolor='#404040')
         )
         st.plotly_chart(fig, use_container_width=True)
-        show_event_details(match_data['events'])
+        show_event_details(timeline_events)
     
     # Tab 2: Resumo (mantido como estava)
     with tab2:
@@ -542,7 +588,11 @@ def main():
     st.header(" Chat Interativo")
     
     # Histórico
-    for message in st.session_state.messages:
+    memory = st.session_state.memory
+    if memory.summary:
+        with st.expander("Resumo das mensagens anteriores"):
+            st.write(memory.summary)
+    for message in memory.messages:
         with st.chat_message(message["role"]):
             st.write(message["content"])
     
@@ -551,13 +601,13 @@ def main():
         "Digite sua pergunta sobre a partida...",
         key="chat_input"
     ):
-        st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.write(prompt)
         
         # Resposta
         response = chat_with_context(prompt, match_data)
-        st.session_state.messages.append({"role": "assistant", "content": response})
+        memory.add("user", prompt)
+        memory.add("assistant", response)
         with st.chat_message("assistant"):
             st.write(response)
 
@@ -0,0 +1,112 @@
+from typing import Callable, Dict, List, Optional
+
+# (resumo anterior, mensagens a incorporar) -> novo resumo
+Summarizer = Callable[[str, List[Dict[str, str]]], str]
+
+
+def extractive_summary(previous: str, messages: List[Dict[str, str]], line_chars: int = 160) -> str:
+    """
+    Resumo barato, sem LLM: uma linha curta por mensagem incorporada.
+    """
+    labels = {"user": "Usuário", "assistant": "Assistente"}
+    lines = [previous] if previous else []
+    for message in messages:
+        content = " ".join(message["content"].split())
+        if len(content) > line_chars:
+            content = content[:line_chars].rstrip() + "..."
+        lines.append(f"{labels.get(message['role'], message['role'])}: {content}")
+    return "\n".join(lines)
+
+
+class ConversationMemory:
+    """
+    Memória de conversa limitada para o chat do dashboard.
+
+    Mantém as últimas `max_turns` trocas (pergunta + resposta) literalmente e
+    incorpora as mais antigas em um resumo acumulado. O resumo só é recalculado
+    quando `fold_turns` trocas antigas se acumulam, e o total da sessão nunca
+    passa de `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 6,
+        max_bytes: int = 32_000,
+        fold_turns: int = 2,
+        summary_max_bytes: int = 4_000,
+        summarizer: Optional[Summarizer] = None
+    ):
+        self.max_turns = max_turns
+        self.max_bytes = max_bytes
+        self.fold_turns = fold_turns
+        self.summary_max_bytes = summary_max_bytes
+        self.summarizer = summarizer or extractive_summary
+
+        self.messages: List[Dict[str, str]] = []
+        self.summary: str = ""
+        self._pending: List[Dict[str, str]] = []
+
+    @staticmethod
+    def _bytes(text: str) -> int:
+        return len(text.encode("utf-8"))
+
+    def size_bytes(self) -> int:
+        """
+        Tamanho atual da memória da sessão (mensagens, pendentes e resumo).
+        """
+        texts = [m["content"] for m in self.messages + self._pending] + [self.summary]
+        return sum(self._bytes(text) for text in texts)
+
+    def add(self, role: str, content: str) -> None:
+        """
+        Registra uma mensagem e aplica os limites de trocas e de bytes.
+        """
+        # Uma única mensagem nunca pode ocupar a memória inteira
+        limit = self.max_bytes // 2
+        if self._bytes(content) > limit:
+            content = content.encode("utf-8")[:limit].decode("utf-8", errors="ignore") + "..."
+        self.messages.append({"role": role, "content": content})
+
+        while len(self.messages) > 2 * self.max_turns:
+            self._pending.extend(self.messages[:2])
+            del self.messages[:2]
+        if len(self._pending) >= 2 * self.fold_turns:
+            self._fold()
+
+        while self.size_bytes() > self.max_bytes and len(self.messages) > 1:
+            self._pending.extend(self.messages[:2])
+            del self.messages[:2]
+            self._fold()
+
+    def _fold(self) -> None:
+        """
+        Incorpora as mensagens pendentes ao resumo acumulado.
+        """
+        if not self._pending:
+            return
+        try:
+            summary = self.summarizer(self.summary, self._pending)
+        except Exception:
+            summary = extractive_summary(self.summary, self._pending)
+        self._pending = []
+
+        # Mantém o trecho mais recente do resumo se ele crescer demais
+        encoded = summary.encode("utf-8")
+        if len(encoded) > self.summary_max_bytes:
+            summary = encoded[-self.summary_max_bytes:].decode("utf-8", errors="ignore")
+        self.summary = summary
+
+    def prompt_messages(self) -> List[Dict[str, str]]:
+        """
+        Histórico a enviar ao modelo: resumo das trocas antigas seguido das recentes.
+        """
+        history = []
+        earlier = self.summary
+        if self._pending:
+            earlier = extractive_summary(earlier, self._pending)
+        if earlier:
+            history.append({
+                "role": "system",
+                "content": f"Resumo da conversa anterior:\n{earlier}"
+            })
+        return history + list(self.messages)
@@ -0,0 +1,230 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+# Palavras muito frequentes em perguntas que não ajudam na busca
+STOPWORDS = {
+    "a", "o", "as", "os", "um", "uma", "uns", "umas", "de", "da", "do", "das", "dos",
+    "e", "em", "no", "na", "nos", "nas", "por", "para", "com", "que", "qual", "quais",
+    "quem", "como", "quando", "onde", "quanto", "quantos", "quantas", "foi", "foram",
+    "ser", "se", "ao", "aos", "the", "of", "in", "on", "partida", "jogo", "time",
+}
+
+# Termos em português usados nas perguntas -> termos presentes nos eventos StatsBomb
+QUERY_EXPANSIONS = {
+    "gol": ["goal"],
+    "gols": ["goal"],
+    "marcou": ["goal"],
+    "marcaram": ["goal"],
+    "assistencia": ["assist", "assistencia"],
+    "assistencias": ["assist", "assistencia"],
+    "cartao": ["card"],
+    "cartoes": ["card"],
+    "amarelo": ["card", "yellow"],
+    "vermelho": ["card", "red"],
+    "expulso": ["card", "red"],
+    "substituicao": ["substitution"],
+    "substituicoes": ["substitution"],
+    "entrou": ["substitution"],
+    "saiu": ["substitution"],
+    "passe": ["pass"],
+    "passes": ["pass"],
+    "chute": ["shot"],
+    "chutes": ["shot"],
+    "finalizacao": ["shot"],
+    "finalizacoes": ["shot"],
+    "falta": ["foul"],
+    "faltas": ["foul"],
+    "desarme": ["tackle", "duel"],
+    "desarmes": ["tackle", "duel"],
+    "interceptacao": ["interception"],
+    "interceptacoes": ["interception"],
+    "impedimento": ["offside"],
+    "defesa": ["save", "keeper"],
+    "defesas": ["save", "keeper"],
+}
+
+# Tipos de evento priorizados quando a pergunta não tem termos em comum com o índice
+KEY_EVENT_TYPES = ("Goal", "Own Goal Against", "Card", "Substitution", "Shot")
+
+# Campos de detalhe (mock e StatsBomb achatado) incluídos no texto do evento
+DETAIL_FIELDS = {
+    "assist": "Assistência",
+    "card_type": "Cartão",
+    "description": "Descrição",
+    "pass_recipient": "Para",
+    "pass_outcome": "Resultado",
+    "shot_outcome": "Resultado",
+    "shot_statsbomb_xg": "xG",
+    "foul_committed_card": "Cartão",
+    "bad_behaviour_card": "Cartão",
+    "substitution_replacement": "Entrou",
+    "duel_type": "Duelo",
+    "duel_outcome": "Resultado",
+}
+
+
+def _is_missing(value: Any) -> bool:
+    """
+    Indica se um valor vindo do DataFrame/JSON deve ser tratado como ausente.
+    """
+    if value is None or value == "":
+        return True
+    return isinstance(value, float) and math.isnan(value)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Normaliza (minúsculas, sem acentos) e quebra o texto em termos.
+    """
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return [t for t in re.findall(r"\w+", normalized) if t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa barata de tokens do modelo (~4 caracteres por token).
+    """
+    return len(text) // 4 + 1
+
+
+def describe_event(event: Dict[str, Any]) -> str:
+    """
+    Converte um evento (mock ou StatsBomb) em uma linha de texto indexável.
+    """
+    minute = event.get("minute", "?")
+    event_type = event.get("type", "Evento")
+
+    if event_type == "Substitution" and not _is_missing(event.get("player_out")):
+        text = f"{minute}' - Substitution {event.get('team', '')}: saiu {event['player_out']}, entrou {event.get('player_in', '')}"
+        return text.strip()
+
+    text = f"{minute}' - {event_type}"
+    if not _is_missing(event.get("player")):
+        text += f" por {event['player']}"
+    if not _is_missing(event.get("team")):
+        text += f" ({event['team']})"
+
+    details = [
+        f"{label}: {event[field]}"
+        for field, label in DETAIL_FIELDS.items()
+        if not _is_missing(event.get(field))
+    ]
+    if details:
+        text += " - " + ", ".join(details)
+    return text
+
+
+def derive_facts(events: List[Dict[str, Any]]) -> List[str]:
+    """
+    Gera fatos agregados (contagens por time e por jogador) a partir dos eventos.
+    """
+    team_counts: Dict[str, Counter] = defaultdict(Counter)
+    player_counts: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+
+    for event in events:
+        event_type = event.get("type")
+        team = event.get("team")
+        if _is_missing(event_type) or _is_missing(team):
+            continue
+        team_counts[team][event_type] += 1
+        player = event.get("player")
+        if not _is_missing(player):
+            player_counts[(player, team)][event_type] += 1
+
+    facts = []
+    for team, counts in team_counts.items():
+        totals = ", ".join(f"{count} {event_type}" for event_type, count in counts.most_common())
+        facts.append(f"Totais de {team}: {totals}")
+    for (player, team), counts in player_counts.items():
+        totals = ", ".join(f"{count} {event_type}" for event_type, count in counts.most_common())
+        facts.append(f"Totais de {player} ({team}): {totals}")
+    return facts
+
+
+class MatchRetriever:
+    """
+    Índice BM25 local sobre os eventos e fatos derivados de uma partida.
+
+    Construído uma vez por partida; cada pergunta do chat recupera apenas os
+    trechos mais relevantes, limitados a um orçamento fixo de tokens.
+    """
+
+    def __init__(self, match_data: Dict[str, Any], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        events = match_data.get("events", [])
+        event_docs = [describe_event(event) for event in events]
+        fact_docs = derive_facts(events)
+        self.documents: List[str] = event_docs + fact_docs
+        self.priority: List[int] = [
+            i for i, event in enumerate(events) if event.get("type") in KEY_EVENT_TYPES
+        ]
+
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for doc_id, doc in enumerate(self.documents):
+            terms = Counter(tokenize(doc))
+            self.doc_lengths.append(sum(terms.values()))
+            for term, freq in terms.items():
+                self.postings[term].append((doc_id, freq))
+
+        total_docs = len(self.documents)
+        self.avg_length = (sum(self.doc_lengths) / total_docs) if total_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def _query_terms(self, query: str) -> List[str]:
+        """
+        Tokeniza a pergunta e expande termos em português para o vocabulário dos eventos.
+        """
+        terms = []
+        for term in tokenize(query):
+            terms.append(term)
+            terms.extend(QUERY_EXPANSIONS.get(term, []))
+        return terms
+
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Retorna os `top_k` documentos mais relevantes como pares (doc_id, score).
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(self._query_terms(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, freq in self.postings[term]:
+                norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_length or 1.0)
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+    def build_context(self, query: str, token_budget: int = 1500, top_k: int = 60) -> str:
+        """
+        Monta o contexto do prompt com os trechos mais relevantes dentro do orçamento de tokens.
+
+        Sem termos em comum com o índice, usa os eventos-chave (gols, cartões, substituições).
+        """
+        candidates = [doc_id for doc_id, _ in self.search(query, top_k=top_k)]
+        if not candidates:
+            candidates = self.priority[:top_k]
+
+        selected = []
+        used = 0
+        for doc_id in candidates:
+            cost = estimate_tokens(self.documents[doc_id])
+            if used + cost > token_budget:
+                continue
+            selected.append(doc_id)
+            used += cost
+
+        # Ordem original: eventos em ordem cronológica, fatos agregados ao final
+        return "\n".join(self.documents[doc_id] for doc_id in sorted(selected))
+
@@ -9,6 +9,8 @@ logger = logging.getLogger(__name__)
 BASE_URL = "http://localhost:8000/api/v1"
 TEST_MATCH_ID = 3788741  # Turquia vs Itália
 TEST_PLAYER_ID = 11086.0  # Burak Yilmaz
+TEST_COMPETITION_ID = 55  # Eurocopa
+TEST_SEASON_ID = 43  # 2020
 
 def test_match_data_endpoint():
     """Testa o endpoint de dados brutos da partida"""
@@ -59,6 +61,9 @@ def test_player_profile_endpoint():
     assert response.status_code == 200
     data = response.json()
     assert 'analysis' in data
+    # A análise do LLM não é versionada pelos dados: sem ETag nem cache público
+    assert 'ETag' not in response.headers
+    assert 'max-age' not in response.headers.get('Cache-Control', '')
     
     logger.info("Análise LLM gerada com sucesso")
     return data
@@ -116,12 +121,420 @@ def test_match_analysis_endpoint():
         logger.info(f"Tamanho da narrativa: {len(analysis['narrative'])} caracteres")
         results[style] = analysis
     
+    # A narrativa em cache é da própria partida, não da última analisada
+    other_match_id = 3788742
+    response = requests.get(
+        f"{BASE_URL}/matches/{other_match_id}/analysis?style=tecnico", headers={"Cache-Control": "no-cache"}
+    )
+    assert response.status_code == 200
+    assert response.json()['analysis']['match_id'] == other_match_id
+    
     # Testar erro com estilo inválido
     response = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/analysis?style=invalido")
     assert response.status_code == 400
     
     return results
 
+def test_match_heatmap_endpoint():
+    """Testa o endpoint de mapa de calor da partida"""
+    logger.info("\n=== Testando endpoint de mapa de calor ===")
+    
+    response = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/heatmap", params={"bins": 12})
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data['bins'] == [12, 8]
+    assert len(data['grid']) == 8
+    assert all(len(row) == 12 for row in data['grid'])
+    assert round(sum(map(sum, data['grid']))) == data['events']
+    
+    # Filtro por jogador e tipo de evento, com suavização
+    response = requests.get(
+        f"{BASE_URL}/matches/{TEST_MATCH_ID}/heatmap",
+        params={"player": int(TEST_PLAYER_ID), "types": "Pass,Carry", "smooth": 1}
+    )
+    assert response.status_code == 200
+    assert response.json()['types'] == ['Carry', 'Pass']
+    
+    # Time inexistente
+    response = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/heatmap", params={"team": "Time Inexistente"})
+    assert response.status_code == 404
+    
+    logger.info(f"Eventos no mapa de calor: {data['events']}")
+    return data
+
+def test_pass_network_endpoint():
+    """Testa o endpoint de rede de passes"""
+    logger.info("\n=== Testando endpoint de rede de passes ===")
+    
+    response = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/pass-network", params={"team": "Turkey"})
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data['window']['index'] == 0
+    assert data['windows'][0]['start_minute'] == 0
+    assert data['nodes'] and data['edges']
+    
+    players = {node['player'] for node in data['nodes']}
+    for edge in data['edges']:
+        assert edge['passer'] in players
+        assert edge['recipient'] in players
+        assert edge['count'] > 0
+    assert sum(edge['count'] for edge in data['edges']) == data['window']['passes']
+    
+    logger.info(f"Janelas entre substituições: {len(data['windows'])}")
+    return data
+
+def test_match_shots_endpoint():
+    """Testa o endpoint de mapa de chutes e xG"""
+    logger.info("\n=== Testando endpoint de chutes e xG ===")
+    
+    response = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/shots")
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert all(k in data for k in ['shots', 'totals', 'xg_curves'])
+    if data['shots']:
+        shot = data['shots'][0]
+        assert all(k in shot for k in ['location', 'end_location', 'xg', 'body_part', 'outcome', 'freeze_frame'])
+    
+    # A curva acumulada de cada time termina no xG total do time
+    for team, totals in data['totals']['teams'].items():
+        curve = data['xg_curves']['teams'][team]
+        assert [p['xg'] for p in curve] == sorted(p['xg'] for p in curve)
+        assert abs(curve[-1]['xg'] - totals['xg']) < 1e-3
+    
+    logger.info(f"xG por time: {data['totals']['teams']}")
+    return data
+
+def test_match_possessions_endpoint():
+    """Testa o endpoint de cadeias de posse"""
+    logger.info("\n=== Testando endpoint de cadeias de posse ===")
+    
+    response = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/possessions")
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data['chains']
+    chain = data['chains'][0]
+    assert all(k in chain for k in [
+        'possession', 'team', 'start_time', 'end_time', 'duration',
+        'start_x', 'start_y', 'end_x', 'end_y', 'passes', 'ended_in_shot', 'xg'
+    ])
+    
+    # Cadeias em ordem e sem sobreposição de números de posse
+    numbers = [c['possession'] for c in data['chains']]
+    assert numbers == sorted(set(numbers))
+    assert abs(sum(team['share'] for team in data['summary'].values()) - 1) < 1e-3
+    
+    logger.info(f"Cadeias de posse: {len(data['chains'])}")
+    return data
+
+def test_match_momentum_endpoint():
+    """Testa o endpoint de momentum da partida"""
+    logger.info("\n=== Testando endpoint de momentum ===")
+    
+    response = requests.get(
+        f"{BASE_URL}/matches/{TEST_MATCH_ID}/momentum",
+        params={"window": 1, "rolling": 5, "max_points": 40}
+    )
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert len(data['teams']) == 2
+    for series in data['teams'].values():
+        assert all(k in series for k in ['xg', 'shots', 'final_third_entries', 'possession_share'])
+        # Downsampling limita o número de pontos e mantém a ordem temporal
+        points = series['xg']
+        assert 0 < len(points) <= 40
+        assert [(p['period'], p['minute']) for p in points] == sorted((p['period'], p['minute']) for p in points)
+    
+    logger.info(f"Janelas de momentum: {data['bins']}")
+    return data
+
+def test_match_summaries_endpoint():
+    """Testa o endpoint de resumos em lote"""
+    logger.info("\n=== Testando endpoint de resumos em lote ===")
+    
+    response = requests.get(f"{BASE_URL}/matches/summaries", params={"ids": f"{TEST_MATCH_ID},0"})
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert [s['match_id'] for s in data['summaries']] == [TEST_MATCH_ID]
+    assert [e['match_id'] for e in data['errors']] == [0]
+    
+    # Variante POST com os IDs no corpo
+    response = requests.post(f"{BASE_URL}/matches/summaries", json={"ids": [TEST_MATCH_ID]})
+    assert response.status_code == 200
+    assert response.json()['summaries'][0]['score'] == data['summaries'][0]['score']
+    
+    logger.info(f"Resumos: {len(data['summaries'])}, erros: {len(data['errors'])}")
+    return data
+
+def test_match_players_endpoint():
+    """Testa o endpoint com o perfil de todos os jogadores da partida"""
+    logger.info("\n=== Testando endpoint de jogadores da partida ===")
+    
+    response = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/players")
+    assert response.status_code == 200
+    
+    data = response.json()
+    players = {p['player_id']: p for p in data['players']}
+    assert TEST_PLAYER_ID in players
+    
+    player = players[TEST_PLAYER_ID]
+    assert player['team'] == 'Turkey'
+    assert all(k in player for k in ['jersey_number', 'positions', 'cards', 'minutes_played', 'statistics'])
+    assert all(k in player['statistics'] for k in [
+        'passes_completed', 'shots', 'goals', 'tackles', 'interceptions'
+    ])
+    assert 0 < player['minutes_played'] <= 130
+    
+    # O perfil individual usa os mesmos dados
+    profile = requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/player/{TEST_PLAYER_ID}").json()
+    assert profile['statistics']['passes']['successful'] == player['statistics']['passes_completed']
+    
+    logger.info(f"Jogadores na partida: {len(players)}")
+    return data
+
+def test_player_season_endpoint():
+    """Testa o endpoint de estatísticas do jogador na temporada"""
+    logger.info("\n=== Testando endpoint de temporada do jogador ===")
+    
+    response = requests.get(
+        f"{BASE_URL}/players/{int(TEST_PLAYER_ID)}/season",
+        params={"competition_id": TEST_COMPETITION_ID, "season_id": TEST_SEASON_ID}
+    )
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data['matches'] == len(data['match_log']) > 0
+    assert TEST_MATCH_ID in [m['match_id'] for m in data['match_log']]
+    assert data['totals']['goals'] == sum(m['goals'] for m in data['match_log'])
+    
+    # Taxas por 90 minutos consistentes com os totais
+    expected = data['totals']['shots'] * 90 / data['minutes_played']
+    assert abs(data['per90']['shots'] - expected) < 1e-2
+    
+    logger.info(f"Temporada de {data['player_name']}: {data['totals']}")
+    return data
+
+def test_leaderboard_endpoint():
+    """Testa o endpoint de ranking da temporada"""
+    logger.info("\n=== Testando endpoint de ranking ===")
+    
+    url = f"{BASE_URL}/competitions/{TEST_COMPETITION_ID}/seasons/{TEST_SEASON_ID}/leaderboard"
+    response = requests.get(url, params={"metric": "xg", "top": 5})
+    assert response.status_code == 200
+    
+    data = response.json()
+    values = [entry['value'] for entry in data['leaderboard']]
+    assert 0 < len(values) <= 5
+    assert values == sorted(values, reverse=True)
+    
+    # Métrica inválida
+    response = requests.get(url, params={"metric": "invalida"})
+    assert response.status_code == 400
+    
+    logger.info(f"Líder em xG: {data['leaderboard'][0]}")
+    return data
+
+def test_list_players_endpoint():
+    """Testa a listagem dos jogadores de uma partida"""
+    logger.info("\n=== Testando listagem de jogadores ===")
+    
+    response = requests.get(f"{BASE_URL}/players/", params={"match_id": TEST_MATCH_ID})
+    assert response.status_code == 200
+    
+    players = response.json()
+    assert {p['team'] for p in players} == {'Turkey', 'Italy'}
+    assert len({p['player_id'] for p in players}) == len(players)
+    
+    logger.info(f"Jogadores listados: {len(players)}")
+    return players
+
+def test_player_search_endpoint():
+    """Testa a busca de jogadores por nome"""
+    logger.info("\n=== Testando busca de jogadores ===")
+    
+    # Garante que o lineup da partida de teste foi carregado
+    requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/players")
+    
+    # Sem acento, por prefixo e com erro de digitação
+    for query in ["burak yilmaz", "Yılm", "burak yilmas"]:
+        response = requests.get(f"{BASE_URL}/players/search", params={"q": query})
+        assert response.status_code == 200
+        results = response.json()
+        assert results and results[0]['player_id'] == int(TEST_PLAYER_ID)
+        assert TEST_MATCH_ID in results[0]['matches']
+    
+    logger.info(f"Busca de jogadores: {results[0]['player_name']}")
+    return results
+
+def test_conditional_get():
+    """Testa ETag e respostas 304 para dados de partida"""
+    logger.info("\n=== Testando GET condicional ===")
+    
+    # no-cache força a ida ao servidor em caches HTTP no caminho (ex.: requests_cache)
+    url = f"{BASE_URL}/matches/{TEST_MATCH_ID}/summary"
+    response = requests.get(url, headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert 'max-age' in response.headers['Cache-Control']
+    
+    response = requests.get(url, headers={"Cache-Control": "no-cache", "If-None-Match": etag})
+    assert response.status_code == 304
+    # Com compressão o ETag do corpo pode vir fraco (W/); a validação é a mesma
+    assert response.headers['ETag'].removeprefix('W/') == etag.removeprefix('W/')
+    
+    # Parâmetros diferentes geram outro ETag
+    response = requests.get(
+        f"{BASE_URL}/matches/{TEST_MATCH_ID}/heatmap",
+        params={"bins": 10},
+        headers={"Cache-Control": "no-cache", "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    
+    logger.info(f"ETag da sumarização: {etag}")
+    return etag
+
+def test_response_compression():
+    """Testa a compressão negociada das respostas"""
+    logger.info("\n=== Testando compressão das respostas ===")
+    
+    url = f"{BASE_URL}/matches/{TEST_MATCH_ID}"
+    response = requests.get(url, headers={"Cache-Control": "no-cache", "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.json()['match_id'] == TEST_MATCH_ID
+    compressed_size = int(response.headers['Content-Length'])
+    
+    response = requests.get(url, headers={"Cache-Control": "no-cache", "Accept-Encoding": "identity"})
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.content) > compressed_size
+    
+    logger.info(f"Dados da partida: {len(response.content)} bytes -> {compressed_size} bytes (gzip)")
+    return compressed_size
+
+def test_analysis_job():
+    """Testa a análise em segundo plano (fila de tarefas, long-poll e SSE)"""
+    logger.info("\n=== Testando tarefas de análise ===")
+    
+    response = requests.post(f"{BASE_URL}/jobs/analysis", json={"match_id": TEST_MATCH_ID, "style": "tecnico"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job['status'] in ['queued', 'running', 'done']
+    
+    headers = {"Cache-Control": "no-cache"}
+    response = requests.get(f"{BASE_URL}/jobs/{job['job_id']}", params={"wait": 20}, headers=headers)
+    assert response.status_code == 200
+    job = response.json()
+    assert job['status'] == 'done'
+    assert job['result']['analysis']['style'] == 'tecnico'
+    assert job['result']['analysis']['narrative']
+    
+    response = requests.get(f"{BASE_URL}/jobs/{job['job_id']}/events", headers=headers, timeout=20)
+    assert response.headers['Content-Type'].startswith('text/event-stream')
+    assert 'event: status' in response.text and '"done"' in response.text
+    
+    response = requests.get(f"{BASE_URL}/jobs/inexistente")
+    assert response.status_code == 404
+    
+    logger.info(f"Tarefa {job['job_id']} concluída em {job['finished_at']}")
+    return job
+
+def test_health_and_readiness():
+    """Testa as verificações de vida e de prontidão (aquecimento do cache)"""
+    logger.info("\n=== Testando health e ready ===")
+    
+    root_url = BASE_URL.removesuffix("/api/v1")
+    response = requests.get(f"{root_url}/health", headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+    assert response.json()['status'] == 'ok'
+    
+    response = requests.get(f"{root_url}/ready", headers={"Cache-Control": "no-cache"})
+    assert response.status_code in [200, 503]
+    progress = response.json()
+    assert progress['ready'] == (response.status_code == 200)
+    assert progress['completed'] <= progress['total']
+    
+    logger.info(f"Aquecimento: {progress['status']} ({progress['completed']}/{progress['total']})")
+    return progress
+
+def test_analytics_query():
+    """Testa as consultas por template à base analítica"""
+    logger.info("\n=== Testando consultas analíticas ===")
+    
+    # Garante que os eventos da partida de teste foram carregados
+    requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/players")
+    
+    response = requests.get(f"{BASE_URL}/query")
+    assert response.status_code == 200
+    assert 'event_counts' in response.json()
+    
+    response = requests.post(f"{BASE_URL}/query", json={
+        "template": "event_counts", "params": {"match_id": TEST_MATCH_ID}
+    })
+    assert response.status_code == 200
+    result = response.json()
+    assert result['columns'] == ['type', 'team', 'events']
+    assert any(row['type'] == 'Pass' for row in result['rows'])
+    
+    response = requests.post(f"{BASE_URL}/query", json={
+        "template": "pass_completion", "params": {"min_passes": 1}, "limit": 3
+    })
+    assert response.status_code == 200
+    assert len(response.json()['rows']) <= 3
+    
+    response = requests.post(f"{BASE_URL}/query", json={"template": "DROP TABLE events"})
+    assert response.status_code == 400
+    response = requests.post(f"{BASE_URL}/query", json={"template": "event_counts", "params": {}})
+    assert response.status_code == 400
+    
+    logger.info(f"Tipos de evento na partida: {len(result['rows'])}")
+    return result
+
+def test_refresh_endpoint():
+    """Testa a atualização incremental pelas datas de atualização da StatsBomb"""
+    logger.info("\n=== Testando atualização incremental ===")
+    
+    # Garante que a temporada de teste está indexada
+    requests.get(f"{BASE_URL}/competitions/{TEST_COMPETITION_ID}/seasons/{TEST_SEASON_ID}/leaderboard")
+    
+    response = requests.post(f"{BASE_URL}/competitions/refresh")
+    assert response.status_code == 200
+    report = response.json()
+    assert report['checked_seasons'] >= 1
+    assert isinstance(report['changed_matches'], list)
+    
+    # Sem mudanças na StatsBomb, a segunda verificação não reprocessa nada
+    response = requests.post(f"{BASE_URL}/competitions/refresh")
+    assert response.json()['changed_matches'] == []
+    
+    logger.info(f"Temporadas verificadas: {report['checked_seasons']}, partidas alteradas: {report['changed_matches']}")
+    return report
+
+def test_admission_metrics():
+    """Testa as métricas do controle de admissão"""
+    logger.info("\n=== Testando métricas de admissão ===")
+    
+    requests.get(f"{BASE_URL}/matches/{TEST_MATCH_ID}/analysis", params={"style": "formal"})
+    
+    root_url = BASE_URL.removesuffix("/api/v1")
+    response = requests.get(f"{root_url}/metrics", headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain')
+    metrics = response.text
+    for lane in ['llm', 'heavy', 'default']:
+        assert f'api_admission_admitted_total{{lane="{lane}"}}' in metrics
+    assert 'api_admission_shed_total{lane="llm"}' in metrics
+    assert 'api_admission_queue_depth{lane="llm"}' in metrics
+    
+    logger.info(f"Métricas: {len(metrics.splitlines())} linhas")
+    return metrics
+
 def run_all_tests():
     """Executa todos os testes em sequência"""
     logger.info("Iniciando testes de integração da API...")
@@ -139,6 +552,60 @@ def run_all_tests():
         analysis_results = test_match_analysis_endpoint()
         logger.info("✅ Teste de análise narrativa passou")
         
+        heatmap = test_match_heatmap_endpoint()
+        logger.info("✅ Teste de mapa de calor passou")
+        
+        pass_network = test_pass_network_endpoint()
+        logger.info("✅ Teste de rede de passes passou")
+        
+        shots = test_match_shots_endpoint()
+        logger.info("✅ Teste de chutes e xG passou")
+        
+        possessions = test_match_possessions_endpoint()
+        logger.info("✅ Teste de cadeias de posse passou")
+        
+        momentum = test_match_momentum_endpoint()
+        logger.info("✅ Teste de momentum passou")
+        
+        summaries = test_match_summaries_endpoint()
+        logger.info("✅ Teste de resumos em lote passou")
+        
+        players = test_match_players_endpoint()
+        logger.info("✅ Teste de jogadores da partida passou")
+        
+        season = test_player_season_endpoint()
+        logger.info("✅ Teste de temporada do jogador passou")
+        
+        leaderboard = test_leaderboard_endpoint()
+        logger.info("✅ Teste de ranking passou")
+        
+        players_list = test_list_players_endpoint()
+        logger.info("✅ Teste de listagem de jogadores passou")
+        
+        search = test_player_search_endpoint()
+        logger.info("✅ Teste de busca de jogadores passou")
+        
+        etag = test_conditional_get()
+        logger.info("✅ Teste de GET condicional passou")
+        
+        compressed_size = test_response_compression()
+        logger.info("✅ Teste de compressão passou")
+        
+        job = test_analysis_job()
+        logger.info("✅ Teste de tarefas de análise passou")
+        
+        readiness = test_health_and_readiness()
+        logger.info("✅ Teste de health e ready passou")
+        
+        query = test_analytics_query()
+        logger.info("✅ Teste de consultas analíticas passou")
+        
+        refresh = test_refresh_endpoint()
+        logger.info("✅ Teste de atualização incremental passou")
+        
+        metrics = test_admission_metrics()
+        logger.info("✅ Teste de métricas de admissão passou")
+        
         logger.info("\n🎉 Todos os testes passaram com sucesso!")
         
     except Exception as e:
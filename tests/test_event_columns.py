@@ -0,0 +1,49 @@
+import logging
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from api.utils.event_columns import EventColumnStore
+from api.utils.event_frame import location_xy, nested_locations
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _events() -> pd.DataFrame:
+    return pd.DataFrame({
+        "index": [1, 2, 3],
+        "type": ["Pass", "Shot", np.nan],
+        "pass_shot_assist": [True, np.nan, np.nan],
+        "location": [[60.0, 40.0], [100, 30], np.nan],
+        "shot_end_location": [np.nan, [120.0, 38.0, 1.5], np.nan],
+        "shot_freeze_frame": [np.nan, [{"location": [110.0, 40.0], "teammate": False}], np.nan]
+    })
+
+
+def test_event_columns_round_trip(tmp_path):
+    """Testa a gravação em colunas: texto categórico, coordenadas planas e só campos aninhados no pickle"""
+    logger.info("\n=== Testando colunas de eventos mapeadas ===")
+
+    store = EventColumnStore(str(tmp_path))
+    events = _events()
+    assert store.save(1, events)
+    loaded = store.load(1)
+
+    assert isinstance(loaded['type'].dtype, pd.CategoricalDtype)
+    assert list(loaded['type'].isna()) == [False, False, True]
+    assert list(loaded['pass_shot_assist'].eq(True)) == [True, False, False]
+    assert loaded['location_x'].dtype == np.float64
+    for name in ("location", "shot_end_location"):
+        np.testing.assert_array_equal(location_xy(loaded, name), location_xy(events, name))
+
+    # Só os campos aninhados ficam no pickle; o formato do statsbombpy é remontado para serializar
+    with open(os.path.join(tmp_path, "1", "objects.pkl"), "rb") as file:
+        assert list(pickle.load(file)) == ["shot_freeze_frame"]
+    restored = nested_locations(loaded)
+    assert list(restored.columns) == list(events.columns)
+    assert restored.at[1, 'location'] == [100.0, 30.0]
+    assert restored.at[1, 'shot_end_location'] == [120.0, 38.0, 1.5]
+
+    logger.info(f"Colunas: {list(loaded.columns)}")
+    return loaded
@@ -0,0 +1,82 @@
+import logging
+import numpy as np
+import pandas as pd
+from api.services.pass_network import PassNetwork
+from api.services.shot_analysis import ShotAnalysis
+from api.utils.event_frame import elapsed_seconds
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TEAM = "Turkey"
+
+
+def _event(index, event_type, period, minute, second, player=None, **fields):
+    return {
+        "id": f"e{index}", "index": index, "type": event_type, "team": TEAM, "player": player,
+        "player_id": None, "period": period, "minute": minute, "second": second,
+        "location": [60.0, 40.0], **fields
+    }
+
+
+def _pass(index, period, minute, passer, recipient):
+    return _event(
+        index, "Pass", period, minute, 0, passer,
+        pass_recipient=recipient, pass_outcome=np.nan, pass_end_location=[70.0, 40.0]
+    )
+
+
+def _shot(index, period, minute, xg):
+    return _event(
+        index, "Shot", period, minute, 0, "Titular",
+        shot_statsbomb_xg=xg, shot_outcome="Saved", shot_end_location=[120.0, 40.0, 1.0]
+    )
+
+
+def _stoppage_events() -> pd.DataFrame:
+    """Passe nos acréscimos do 1º tempo (46') e substituição no intervalo (2º tempo, 45:00)."""
+    return pd.DataFrame([
+        _pass(1, 1, 10, "Titular", "Zagueiro"),
+        _pass(2, 1, 46, "Titular", "Zagueiro"),
+        _event(3, "Substitution", 2, 45, 0, "Titular", substitution_replacement="Reserva"),
+        _pass(4, 2, 50, "Reserva", "Zagueiro")
+    ])
+
+
+def test_pass_network_half_time_substitution():
+    """Testa as janelas da rede de passes com passe nos acréscimos e substituição no intervalo"""
+    logger.info("\n=== Testando rede de passes com substituição no intervalo ===")
+
+    network = PassNetwork.build(_stoppage_events(), TEAM)
+    assert network is not None
+    first, second = network["windows"]
+
+    # O passe dos acréscimos é do titular, antes da substituição
+    assert first["passes"] == 2
+    assert {node["player"] for node in second["nodes"]} == {"Reserva", "Zagueiro"}
+    assert second["start_minute"] == 45.0
+
+    logger.info(f"Janelas: {[(w['start_minute'], w['passes']) for w in network['windows']]}")
+    return network
+
+
+def test_elapsed_seconds_across_periods():
+    """Testa o tempo jogado contínuo e a ordem dos chutes com acréscimos no 1º tempo"""
+    logger.info("\n=== Testando tempo jogado entre os períodos ===")
+
+    events = pd.concat([_stoppage_events(), pd.DataFrame([
+        _shot(5, 1, 47, 0.3),
+        _shot(6, 2, 46, 0.1)
+    ])], ignore_index=True)
+
+    # O 1º tempo durou 47 minutos: o 2º tempo começa aos 47 de tempo jogado
+    elapsed = elapsed_seconds(events) / 60
+    assert list(elapsed[[1, 2, 3, 4, 5]]) == [46.0, 47.0, 52.0, 47.0, 48.0]
+
+    # O chute dos acréscimos (47') vem antes do chute aos 46' do 2º tempo
+    shots = ShotAnalysis._shot_table(events)
+    assert list(shots['period']) == [1, 2]
+    assert list(shots['t']) == [47.0, 48.0]
+
+    logger.info(f"Chutes: {list(zip(shots['period'], shots['t']))}")
+    return shots
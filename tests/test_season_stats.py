@@ -0,0 +1,51 @@
+import logging
+import os
+import subprocess
+import sys
+import pandas as pd
+from api.services.season_stats import SeasonStats, STAT_COLUMNS
+from api.utils import cache as cache_module
+from api.utils.cache import MatchCache
+from api.utils.shared_cache import SharedCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEASON = (43, 106)
+
+
+def _rows(match_id: int) -> pd.DataFrame:
+    return pd.DataFrame([{
+        "match_id": match_id, "player_id": 1, "player_name": "Jogador", "team": "Turkey",
+        **{name: 1 for name in STAT_COLUMNS}
+    }])
+
+
+def test_season_table_follows_other_process_invalidation(tmp_path, monkeypatch):
+    """Testa que uma partida invalidada por outro processo sai da tabela da temporada deste"""
+    logger.info("\n=== Testando invalidação da temporada entre processos ===")
+
+    path = str(tmp_path / "shared.sqlite3")
+    monkeypatch.setattr(cache_module, "SHARED_SYNC_SECONDS", 0)
+    stats = SeasonStats(cache=MatchCache(shared=SharedCache(path=path, version="test")))
+    monkeypatch.setattr(stats, "refresh", lambda *args, **kwargs: 0)
+    stats.ingest(*SEASON, 7, _rows(7))
+    stats.ingest(*SEASON, 8, _rows(8))
+    stats.cache.sync_invalidations()
+
+    # Outro worker atualiza a partida 7 e registra a invalidação no log compartilhado
+    subprocess.run([
+        sys.executable, "-c",
+        "import sys; from api.utils.shared_cache import SharedCache; "
+        "SharedCache(path=sys.argv[1], version='test').invalidate_match(7)",
+        path
+    ], cwd=ROOT, check=True)
+
+    stats.cache.sync_invalidations()
+    rows, totals = stats.get_table(*SEASON)
+    assert list(rows['match_id']) == [8]
+    assert int(totals.loc[1, 'matches']) == 1
+
+    logger.info(f"Partidas na tabela: {list(rows['match_id'])}")
+    return rows